@@ -2,7 +2,21 @@
 AI package initialization
 """
 
+import importlib
+
 from ai.env import BTD6Env
-from ai.train import train, evaluate
 
-__all__ = ["BTD6Env", "train", "evaluate"]
+__all__ = ["BTD6Env", "train_model", "evaluate", "evaluate_model"]
+
+# Exported name -> function in ai.train. train() is exported as train_model:
+# "ai.train" is the submodule once anything has imported it
+_TRAIN_EXPORTS = {"train_model": "train", "evaluate": "evaluate", "evaluate_model": "evaluate_model"}
+
+
+def __getattr__(name):
+    # Training pulls in Stable Baselines3 and torch; only import it when asked
+    if name in _TRAIN_EXPORTS:
+        value = getattr(importlib.import_module("ai.train"), _TRAIN_EXPORTS[name])
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,396 @@
+"""
+Training callbacks for Stable Baselines3
+"""
+
+import copy
+import csv
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import save_to_zip_file
+
+
+class TelemetryCallback(BaseCallback):
+    """
+    Record training throughput once per rollout/update cycle.
+
+    Each row covers one PPO iteration: environment steps per second, time spent
+    collecting the rollout, time spent in the update, per-phase engine time
+    reported by BTD6Env and the lengths of episodes that finished. Rows are
+    appended to a CSV file and the latest totals are written to a
+    Prometheus-style text file that can be scraped or tailed during long runs.
+    """
+
+    PHASES = ("place", "simulate", "observe", "reward")
+
+    def __init__(self, log_dir: str, name: str = "telemetry", verbose: int = 0):
+        super().__init__(verbose)
+        self.csv_path = os.path.join(log_dir, f"{name}.csv")
+        self.prom_path = os.path.join(log_dir, f"{name}.prom")
+
+        self.iteration = 0
+        self.rollout_seconds_total = 0.0
+        self.update_seconds_total = 0.0
+        self.episodes_total = 0
+
+        self._training_start = 0.0
+        self._rollout_start = 0.0
+        self._rollout_end = None
+        self._rollout_steps = 0
+        self._rollout_time = 0.0
+        self._episode_steps: np.ndarray = None
+        self._episode_lengths: List[int] = []
+        self._phase_totals: Dict[str, float] = {}
+        self._phase_last: Dict[str, float] = {}
+
+    def _on_training_start(self):
+        os.makedirs(os.path.dirname(self.csv_path) or ".", exist_ok=True)
+        self._training_start = time.perf_counter()
+        self._episode_steps = np.zeros(self.training_env.num_envs, dtype=np.int64)
+        self._phase_last = self._read_phase_times()
+
+        with open(self.csv_path, "w", newline="") as f:
+            csv.writer(f).writerow(
+                [
+                    "iteration",
+                    "timesteps",
+                    "wall_time",
+                    "sps",
+                    "rollout_time",
+                    "update_time",
+                    *[f"{phase}_time" for phase in self.PHASES],
+                    "episodes",
+                    "episode_length_mean",
+                    "episode_length_min",
+                    "episode_length_max",
+                ]
+            )
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._rollout_end is not None:
+            self._write_iteration(update_time=now - self._rollout_end)
+        self._rollout_start = now
+        self._rollout_steps = 0
+
+    def _on_step(self) -> bool:
+        n_envs = self.training_env.num_envs
+        self._rollout_steps += n_envs
+        self._episode_steps += 1
+
+        for i, done in enumerate(self.locals["dones"]):
+            if done:
+                self._episode_lengths.append(int(self._episode_steps[i]))
+                self._episode_steps[i] = 0
+
+        return True
+
+    def _on_rollout_end(self):
+        self._rollout_end = time.perf_counter()
+        self._rollout_time = self._rollout_end - self._rollout_start
+
+    def _on_training_end(self):
+        if self._rollout_end is not None:
+            self._write_iteration(update_time=time.perf_counter() - self._rollout_end)
+            self._rollout_end = None
+
+    def _read_phase_times(self) -> Dict[str, float]:
+        """Sum the per-phase engine timers of every sub-environment"""
+        totals = dict.fromkeys(self.PHASES, 0.0)
+        try:
+            per_env = self.training_env.get_attr("phase_times")
+        except AttributeError:
+            return totals
+        for phase_times in per_env:
+            for phase in self.PHASES:
+                totals[phase] += phase_times.get(phase, 0.0)
+        return totals
+
+    def _write_iteration(self, update_time: float):
+        self.iteration += 1
+        self.rollout_seconds_total += self._rollout_time
+        self.update_seconds_total += update_time
+
+        phase_now = self._read_phase_times()
+        phase_delta = {p: phase_now[p] - self._phase_last.get(p, 0.0) for p in self.PHASES}
+        self._phase_last = phase_now
+        self._phase_totals = phase_now
+
+        lengths = self._episode_lengths
+        self._episode_lengths = []
+        self.episodes_total += len(lengths)
+
+        iteration_time = self._rollout_time + update_time
+        sps = self._rollout_steps / iteration_time if iteration_time > 0 else 0.0
+
+        with open(self.csv_path, "a", newline="") as f:
+            csv.writer(f).writerow(
+                [
+                    self.iteration,
+                    self.num_timesteps,
+                    f"{time.perf_counter() - self._training_start:.3f}",
+                    f"{sps:.1f}",
+                    f"{self._rollout_time:.4f}",
+                    f"{update_time:.4f}",
+                    *[f"{phase_delta[p]:.4f}" for p in self.PHASES],
+                    len(lengths),
+                    f"{np.mean(lengths):.1f}" if lengths else "",
+                    min(lengths) if lengths else "",
+                    max(lengths) if lengths else "",
+                ]
+            )
+
+        self._write_prometheus(sps, lengths)
+
+        if self.verbose > 0:
+            print(
+                f"[telemetry] iter={self.iteration} sps={sps:.0f} "
+                f"rollout={self._rollout_time:.2f}s update={update_time:.2f}s"
+            )
+
+    def _write_prometheus(self, sps: float, lengths: List[int]):
+        """Rewrite the text-format metrics file atomically"""
+        lines = [
+            "# HELP btd6_env_steps_total Environment steps collected.",
+            "# TYPE btd6_env_steps_total counter",
+            f"btd6_env_steps_total {self.num_timesteps}",
+            "# HELP btd6_steps_per_second Steps per second over the last iteration.",
+            "# TYPE btd6_steps_per_second gauge",
+            f"btd6_steps_per_second {sps:.3f}",
+            "# HELP btd6_rollout_seconds_total Time spent collecting rollouts.",
+            "# TYPE btd6_rollout_seconds_total counter",
+            f"btd6_rollout_seconds_total {self.rollout_seconds_total:.6f}",
+            "# HELP btd6_update_seconds_total Time spent in policy updates.",
+            "# TYPE btd6_update_seconds_total counter",
+            f"btd6_update_seconds_total {self.update_seconds_total:.6f}",
+            "# HELP btd6_env_phase_seconds_total Engine time per environment step phase.",
+            "# TYPE btd6_env_phase_seconds_total counter",
+            *[
+                f'btd6_env_phase_seconds_total{{phase="{p}"}} {self._phase_totals.get(p, 0.0):.6f}'
+                for p in self.PHASES
+            ],
+            "# HELP btd6_episodes_total Episodes finished.",
+            "# TYPE btd6_episodes_total counter",
+            f"btd6_episodes_total {self.episodes_total}",
+        ]
+        if lengths:
+            lines += [
+                "# HELP btd6_episode_length Episode length over the last iteration.",
+                "# TYPE btd6_episode_length summary",
+                *[
+                    f'btd6_episode_length{{quantile="{q}"}} {np.quantile(lengths, q):.1f}'
+                    for q in (0.1, 0.5, 0.9)
+                ],
+                f"btd6_episode_length_sum {sum(lengths)}",
+                f"btd6_episode_length_count {len(lengths)}",
+            ]
+
+        tmp_path = self.prom_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prom_path)
+
+
+def _evaluator_main(checkpoints: "mp.Queue", results_path: str, episodes: int):
+    """
+    Evaluator process: evaluate every checkpoint put on the queue and append
+    its win rate and mean reward to a CSV file. A None item stops the loop.
+    """
+    import torch
+
+    from ai.train import _load_model, _run_episodes
+
+    torch.set_num_threads(1)
+
+    if not os.path.exists(results_path):
+        with open(results_path, "w", newline="") as f:
+            csv.writer(f).writerow(
+                ["timesteps", "checkpoint", "episodes", "win_rate", "mean_reward", "eval_time"]
+            )
+
+    while True:
+        item = checkpoints.get()
+        if item is None:
+            break
+        timesteps, checkpoint = item
+
+        start = time.perf_counter()
+        results = _run_episodes(_load_model(checkpoint), episodes)
+        eval_time = time.perf_counter() - start
+
+        win_rate = sum(1 for r in results if r["won"]) / len(results)
+        mean_reward = sum(r["reward"] for r in results) / len(results)
+
+        with open(results_path, "a", newline="") as f:
+            csv.writer(f).writerow(
+                [timesteps, checkpoint, episodes, f"{win_rate:.3f}", f"{mean_reward:.3f}", f"{eval_time:.3f}"]
+            )
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    Save checkpoints without blocking training, and evaluate them concurrently.
+
+    Every save_freq calls the model parameters are copied on the training
+    thread (a fast in-memory clone) and handed to a background writer thread
+    that serializes them to <save_path>/<name_prefix>_<timesteps>_steps.zip in
+    the regular SB3 format. Each written checkpoint is then queued to a
+    separate evaluator process, which appends win rate and mean reward to
+    eval_log. Pending writes and evaluations are finished when training ends.
+
+    At most max_pending copies wait for the writer; beyond that training waits
+    for it. If a write fails (e.g. a full disk), training stops at the next
+    step and the error is raised from learn().
+
+    The copy follows BaseAlgorithm.save() through SB3's private
+    _excluded_save_params and _get_torch_save_params, which is why
+    requirements.txt bounds the stable-baselines3 version.
+    """
+
+    def __init__(
+        self,
+        save_freq: int,
+        save_path: str,
+        name_prefix: str = "rl_model",
+        eval_episodes: int = 5,
+        eval_log: Optional[str] = None,
+        max_pending: int = 2,
+        verbose: int = 0,
+    ):
+        super().__init__(verbose)
+        self.save_freq = save_freq
+        self.save_path = save_path
+        self.name_prefix = name_prefix
+        self.eval_episodes = eval_episodes
+        self.eval_log = eval_log or os.path.join(save_path, f"{name_prefix}_eval.csv")
+
+        self._write_queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._writer: Optional[threading.Thread] = None
+        self._write_error: Optional[BaseException] = None
+        self._eval_queue = None
+        self._evaluator = None
+
+    def _on_training_start(self):
+        os.makedirs(self.save_path, exist_ok=True)
+
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+        if self.eval_episodes > 0:
+            ctx = mp.get_context("spawn")
+            self._eval_queue = ctx.Queue()
+            self._evaluator = ctx.Process(
+                target=_evaluator_main,
+                args=(self._eval_queue, self.eval_log, self.eval_episodes),
+                name="checkpoint-evaluator",
+                daemon=True,
+            )
+            self._evaluator.start()
+
+    def _on_step(self) -> bool:
+        # Stop training once the writer has failed; the error is raised on exit
+        if self._write_error is not None or not self._writer.is_alive():
+            return False
+        if self.n_calls % self.save_freq == 0:
+            path = os.path.join(self.save_path, f"{self.name_prefix}_{self.num_timesteps}_steps.zip")
+            self._write_queue.put((self.num_timesteps, path, self._snapshot()))
+        return True
+
+    def _on_training_end(self):
+        # The writer outlives failed writes, so a dead one here never got the sentinel
+        writer_died = not self._writer.is_alive()
+        if not writer_died:
+            self._write_queue.put(None)
+            self._writer.join()
+
+        if self._evaluator is not None:
+            self._eval_queue.put(None)
+            self._evaluator.join()
+
+        if self._write_error is not None:
+            raise RuntimeError("Checkpoint writer failed") from self._write_error
+        if writer_died:
+            raise RuntimeError("Checkpoint writer stopped before training ended")
+
+    def _snapshot(self) -> tuple:
+        """
+        Copy everything BaseAlgorithm.save() would write, so the writer thread
+        never reads state that training is still mutating.
+        """
+        model = self.model
+        exclude = set(model._excluded_save_params())
+        state_dicts_names, torch_variable_names = model._get_torch_save_params()
+        for name in state_dicts_names + torch_variable_names:
+            exclude.add(name.split(".")[0])
+
+        data = {}
+        for key, value in model.__dict__.items():
+            if key in exclude:
+                continue
+            if isinstance(value, (list, dict, deque, np.ndarray)):
+                value = copy.copy(value)
+            data[key] = value
+
+        pytorch_variables = {
+            name: copy.deepcopy(_recursive_getattr(model, name)) for name in torch_variable_names
+        }
+        params = copy.deepcopy(model.get_parameters())
+        return data, params, pytorch_variables or None
+
+    def _write_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            if self._write_error is not None:
+                continue  # Keep draining so the training thread never blocks on a full queue
+            timesteps, path, (data, params, pytorch_variables) = item
+
+            try:
+                save_to_zip_file(path, data=data, params=params, pytorch_variables=pytorch_variables)
+            except BaseException as error:
+                self._write_error = error
+                continue
+            if self.verbose > 0:
+                print(f"Saving model checkpoint to {path}")
+
+            if self._eval_queue is not None:
+                self._eval_queue.put((timesteps, path))
+
+
+def _recursive_getattr(obj, attr: str):
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+class TrajectoryRecorderCallback(BaseCallback):
+    """
+    Stream every transition PPO collects to an ai.trajectory_store.TrajectoryWriter.
+
+    The observation recorded is the one the action was taken from; the writer
+    is closed (flushing its last chunk) when training ends.
+    """
+
+    def __init__(self, writer, verbose: int = 0):
+        super().__init__(verbose)
+        self.writer = writer
+
+    def _on_step(self) -> bool:
+        self.writer.append_batch(
+            self.model._last_obs,
+            self.locals["actions"],
+            self.locals["rewards"],
+            self.locals["dones"],
+        )
+        return True
+
+    def _on_training_end(self):
+        self.writer.close()
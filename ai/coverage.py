@@ -0,0 +1,217 @@
+"""
+Precomputed tower coverage over every placement tile
+
+CoverageMap holds, for every env tile (tile centers, as in
+BTD6Env.action_to_position), the length of track inside a tower's range, how
+long a balloon stays exposed to it and how early on the track it is first
+reached, plus whether a tower may legally be placed there. It is built in one
+vectorized pass over tiles x path segments and cached per map and tower range,
+in process and optionally as .npz files under cache_dir, so planners and reward
+shaping can look a tile up instead of placing a tower and simulating.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game.game import BTD6Game
+
+cache_dir = os.path.join("cache", "coverage")
+
+PATH_SAMPLE_SPACING = 5.0  # Pixels between path samples
+
+_maps: Dict[str, "CoverageMap"] = {}
+
+
+def path_coverage(positions: np.ndarray, ranges: np.ndarray, path: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Analytic overlap between tower range circles and a polyline.
+
+    Args:
+        positions: (n, 2) tower positions
+        ranges: (n,) tower ranges
+        path: (m, 2) polyline waypoints
+
+    Returns:
+        (entry, exit) arrays of shape (n, m - 1): the distance along the whole
+        path at which each tower's circle starts and stops covering each
+        segment (entry == exit where it does not cover it).
+    """
+    a, b = path[:-1], path[1:]
+    d = b - a
+    seg_len = np.linalg.norm(d, axis=1)
+    offsets = np.concatenate([[0.0], np.cumsum(seg_len)])[:-1]
+
+    # |a + t d - c|^2 = r^2, solved for t in [0, 1]
+    f = a[None, :, :] - positions[:, None, :]
+    qa = np.maximum((d * d).sum(axis=1), 1e-12)[None, :]
+    qb = 2 * (f * d[None, :, :]).sum(axis=2)
+    qc = (f * f).sum(axis=2) - ranges[:, None] ** 2
+    disc = qb * qb - 4 * qa * qc
+    root = np.sqrt(np.maximum(disc, 0))
+    t0 = np.clip((-qb - root) / (2 * qa), 0, 1)
+    t1 = np.clip((-qb + root) / (2 * qa), 0, 1)
+    t1 = np.where(disc > 0, t1, t0)
+
+    entry = offsets[None, :] + t0 * seg_len[None, :]
+    exit = offsets[None, :] + t1 * seg_len[None, :]
+    return entry, exit
+
+
+def path_samples(path: np.ndarray, spacing: float = PATH_SAMPLE_SPACING) -> np.ndarray:
+    """Evenly spaced points along a polyline of (x, y) waypoints"""
+    points = []
+    for a, b in zip(path[:-1], path[1:]):
+        steps = max(1, int(np.linalg.norm(b - a) / spacing))
+        t = (np.arange(steps) / steps)[:, None]
+        points.append(a + (b - a) * t)
+    return np.concatenate(points)
+
+
+def _map_key(path, width, height, grid_resolution, tower_range, balloon_speed, min_track_distance) -> str:
+    parts = {
+        "path": np.asarray(path, dtype=np.float64).round(3).tolist(),
+        "size": [width, height, grid_resolution],
+        "range": tower_range,
+        "speed": balloon_speed,
+        "min_track_distance": min_track_distance,
+    }
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+class CoverageMap:
+    """
+    Per-tile coverage of one map for one tower range.
+
+    Arrays have shape (tiles_y, tiles_x); tile i of the flattened arrays is
+    env action i.
+    """
+
+    def __init__(
+        self,
+        path: Sequence[Tuple[float, float]],
+        width: int = 800,
+        height: int = 600,
+        grid_resolution: int = 10,
+        tower_range: float = 150,
+        balloon_speed: float = 50,
+        min_track_distance: float = BTD6Game.MIN_TRACK_DISTANCE,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.path = np.asarray(path, dtype=np.float64)
+        self.width = width
+        self.height = height
+        self.grid_resolution = grid_resolution
+        self.tower_range = tower_range
+        self.balloon_speed = balloon_speed
+        self.min_track_distance = min_track_distance
+        self.tiles_x = width // grid_resolution
+        self.tiles_y = height // grid_resolution
+        self.track_length = float(np.linalg.norm(np.diff(self.path, axis=0), axis=1).sum())
+
+        if arrays is None:
+            arrays = self._build()
+        self.length = arrays["length"]
+        self.first_contact = arrays["first_contact"]
+        self.legal = arrays["legal"]
+        # Seconds a balloon spends inside the range of a tower on the tile
+        self.exposure = self.length / balloon_speed
+
+    def key(self) -> str:
+        return _map_key(
+            self.path, self.width, self.height, self.grid_resolution, self.tower_range, self.balloon_speed,
+            self.min_track_distance,
+        )
+
+    def tile_positions(self) -> np.ndarray:
+        """(tiles, 2) tile center positions in action order"""
+        half = self.grid_resolution // 2
+        ys, xs = np.divmod(np.arange(self.tiles_x * self.tiles_y), self.tiles_x)
+        return np.column_stack([xs * self.grid_resolution + half, ys * self.grid_resolution + half]).astype(np.float64)
+
+    def _build(self) -> Dict[str, np.ndarray]:
+        positions = self.tile_positions()
+        ranges = np.full(len(positions), float(self.tower_range))
+        entry, exit = path_coverage(positions, ranges, self.path)
+        length = (exit - entry).sum(axis=1)
+        first_contact = np.where(exit > entry, entry, np.inf).min(axis=1)
+
+        # Same rule as BTD6Game.place_tower: keep clear of path waypoints
+        waypoint_distance = np.linalg.norm(positions[:, None, :] - self.path[None, :, :], axis=2)
+        legal = (waypoint_distance >= self.min_track_distance).all(axis=1)
+
+        shape = (self.tiles_y, self.tiles_x)
+        return {
+            "length": length.reshape(shape).astype(np.float32),
+            "first_contact": first_contact.reshape(shape).astype(np.float32),
+            "legal": legal.reshape(shape),
+        }
+
+    def tile(self, x: float, y: float) -> Tuple[int, int]:
+        """(row, column) of the tile containing a pixel position"""
+        column = min(max(int(x) // self.grid_resolution, 0), self.tiles_x - 1)
+        row = min(max(int(y) // self.grid_resolution, 0), self.tiles_y - 1)
+        return row, column
+
+    def length_at(self, x: float, y: float) -> float:
+        """Track length in range of a tower at (x, y)"""
+        return float(self.length[self.tile(x, y)])
+
+    def exposure_at(self, x: float, y: float) -> float:
+        """Seconds each balloon spends in range of a tower at (x, y)"""
+        return float(self.exposure[self.tile(x, y)])
+
+    def action_length(self, action: int) -> float:
+        """Track length in range of the tile placed by an env action"""
+        return float(self.length.flat[action])
+
+    def action_exposure(self, action: int) -> float:
+        return float(self.exposure.flat[action])
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, length=self.length, first_contact=self.first_contact, legal=self.legal)
+        os.replace(tmp_path, path)
+
+
+def coverage_map(
+    game: Optional[BTD6Game] = None,
+    grid_resolution: int = 10,
+    tower_range: float = 150,
+    balloon_speed: float = 50,
+    use_disk: bool = False,
+) -> CoverageMap:
+    """
+    Cached CoverageMap for a game's map (default: a fresh BTD6Game).
+
+    Maps are kept for the life of the process; with use_disk they are also
+    written to and read from cache_dir.
+    """
+    game = game or BTD6Game()
+    path = [(p.x, p.y) for p in game.balloon_path]
+    settings = dict(
+        width=game.width,
+        height=game.height,
+        grid_resolution=grid_resolution,
+        tower_range=tower_range,
+        balloon_speed=balloon_speed,
+    )
+    key = _map_key(path, min_track_distance=BTD6Game.MIN_TRACK_DISTANCE, **settings)
+    if key in _maps:
+        return _maps[key]
+
+    disk_path = os.path.join(cache_dir, f"{key}.npz")
+    arrays = None
+    if use_disk and os.path.exists(disk_path):
+        with np.load(disk_path) as data:
+            arrays = {name: data[name] for name in ("length", "first_contact", "legal")}
+
+    result = CoverageMap(path, arrays=arrays, **settings)
+    if use_disk and arrays is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        result.save(disk_path)
+    _maps[key] = result
+    return result
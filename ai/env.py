@@ -3,10 +3,11 @@ Gymnasium environment wrapper for BTD6 game
 Converts the game into an RL environment
 """
 
+import time
 import gymnasium as gym
 import numpy as np
 from gymnasium import spaces
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 
 from game import BTD6Game, GameState
 
@@ -23,7 +24,19 @@ class BTD6Env(gym.Env):
 
     metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 60}
 
-    def __init__(self, width: int = 800, height: int = 600, render_mode: str = None):
+    # The simulator has no randomness: the same start state and actions always
+    # produce the same episode
+    deterministic = True
+
+    def __init__(
+        self,
+        width: int = 800,
+        height: int = 600,
+        render_mode: str = None,
+        scenario_bank: Optional[str] = None,
+        trajectory_writer=None,
+        coverage_reward_scale: float = 0.0,
+    ):
         super().__init__()
 
         self.width = width
@@ -68,16 +81,74 @@ class BTD6Env(gym.Env):
         self.step_count = 0
         self.max_steps = 1000
 
+        # Cumulative engine time per step phase, read by training telemetry (ai.callbacks)
+        self.phase_times = {"place": 0.0, "simulate": 0.0, "observe": 0.0, "reward": 0.0}
+
+        # Named mid-game states usable via reset(options={"scenario": name})
+        self.scenarios: Dict[str, Dict[str, Any]] = {}
+
+        # Optional memory-mapped scenario bank (ai/scenario_bank.py) sampled on
+        # every reset; opened on first reset so each worker maps it itself
+        self.scenario_bank_path = scenario_bank
+        self.scenario_bank = None
+
+        # Optional ai.trajectory_store.TrajectoryWriter fed every transition
+        self.trajectory_writer = trajectory_writer
+        self._last_obs = None
+
+        # Optional shaping: on each successful placement, add this scale times
+        # the fraction of the track the new tower covers (ai/coverage.py)
+        self.coverage_reward_scale = coverage_reward_scale
+        self.coverage = None
+        if coverage_reward_scale:
+            from ai.coverage import coverage_map
+
+            self.coverage = coverage_map(self.game, self.grid_resolution)
+
+    def register_scenario(self, name: str, scenario: Dict[str, Any]):
+        """
+        Register a prebuilt game state (from BTD6Game.snapshot()) under a name
+        so that reset(options={"scenario": name}) can start from it.
+        """
+        self.scenarios[name] = scenario
+
     def reset(
         self, seed: int = None, options: Dict[str, Any] = None
     ) -> Tuple[np.ndarray, Dict[str, Any]]:
-        """Reset environment"""
+        """
+        Reset environment.
+
+        The game is reset in place. Pass options={"scenario": ...} with either a
+        BTD6Game.snapshot() dictionary or the name of a registered scenario to
+        start the episode from that state. With a scenario bank, episodes start
+        from a sampled bank scenario, or from options={"scenario_index": i}.
+        """
         super().reset(seed=seed)
+        options = options or {}
+
+        if self.scenario_bank_path and self.scenario_bank is None:
+            from ai.scenario_bank import ScenarioBank
 
-        self.game = BTD6Game(width=self.width, height=self.height)
+            self.scenario_bank = ScenarioBank(self.scenario_bank_path)
+
+        scenario = options.get("scenario")
+        if isinstance(scenario, str):
+            scenario = self.scenarios[scenario]
+        elif scenario is None and self.scenario_bank is not None:
+            if "scenario_index" in options:
+                scenario = self.scenario_bank.scenario(options["scenario_index"])
+            else:
+                scenario = self.scenario_bank.sample(self.np_random)
+
+        self.game.reset(scenario=scenario)
         self.step_count = 0
 
-        return self._get_observation(), {}
+        start = time.perf_counter()
+        obs = self._get_observation()
+        self.phase_times["observe"] += time.perf_counter() - start
+
+        self._last_obs = obs
+        return obs, {}
 
     def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
         """
@@ -90,17 +161,15 @@ class BTD6Env(gym.Env):
             observation, reward, terminated, truncated, info
         """
         self.step_count += 1
+        t0 = time.perf_counter()
 
         # Decode action to (x, y)
-        if action < self.num_actions - 1:  # Not "do nothing"
-            tile_x = action % self.tiles_x
-            tile_y = action // self.tiles_x
-
-            # Convert tile to pixel position (center of tile)
-            x = tile_x * self.grid_resolution + self.grid_resolution // 2
-            y = tile_y * self.grid_resolution + self.grid_resolution // 2
+        position = self.action_to_position(action)
+        placed = False
+        if position is not None:  # Not "do nothing"
+            placed = self.game.place_tower(*position)
 
-            self.game.place_tower(x, y)
+        t1 = time.perf_counter()
 
         # Simulate game for a few frames
         dt = 1.0 / 60.0  # 60 FPS
@@ -110,24 +179,56 @@ class BTD6Env(gym.Env):
             if self.game.state != GameState.RUNNING:
                 break
 
+        t2 = time.perf_counter()
+
         # Calculate reward
         reward = self._calculate_reward()
+        if placed and self.coverage is not None:
+            reward += self.coverage_reward_scale * self.coverage.action_length(action) / self.coverage.track_length
 
         # Check if done
         terminated = self.game.state in [GameState.WON, GameState.LOST]
         truncated = self.step_count >= self.max_steps
 
+        t3 = time.perf_counter()
+        obs = self._get_observation()
+        t4 = time.perf_counter()
+
+        self.phase_times["place"] += t1 - t0
+        self.phase_times["simulate"] += t2 - t1
+        self.phase_times["reward"] += t3 - t2
+        self.phase_times["observe"] += t4 - t3
+
+        if self.trajectory_writer is not None:
+            self.trajectory_writer.append(self._last_obs, action, reward, terminated or truncated)
+        self._last_obs = obs
+
         if self.render_mode == "human":
             self.render()
 
         return (
-            self._get_observation(),
+            obs,
             reward,
             terminated,
             truncated,
             {"state": self.game.state.name},
         )
 
+    def action_to_position(self, action: int) -> Optional[Tuple[int, int]]:
+        """
+        Convert an action to the pixel position (center of tile) it places a
+        tower at, or None for the "do nothing" action.
+        """
+        action = int(action)
+        if action >= self.num_actions - 1:
+            return None
+
+        tile_x = action % self.tiles_x
+        tile_y = action // self.tiles_x
+        x = tile_x * self.grid_resolution + self.grid_resolution // 2
+        y = tile_y * self.grid_resolution + self.grid_resolution // 2
+        return x, y
+
     def render(self):
         """Render current game state"""
         if self.renderer:
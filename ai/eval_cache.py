@@ -0,0 +1,120 @@
+"""
+On-disk cache of model evaluation results
+
+evaluate_model() results are stored as JSON files keyed by a content hash of
+the model file, the environment configuration, the episode settings, the
+source of the simulator rules and the versions of the libraries that run the
+policy. A changed model, env setting, game rule or library gives a new key, so
+stale results are never returned.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+from importlib import metadata
+from typing import Dict, Optional
+
+from ai.env import BTD6Env
+
+cache_dir = os.path.join("cache", "eval")
+
+# Modules whose source defines the outcome of an evaluation: the simulator and
+# env, the NumPy policy that plays exported .npz models, and ai.train's episode
+# loop (win detection, placement recording, duplicate skipping). Named rather
+# than imported: ai.train imports this module and loads torch
+RULE_MODULES = ("game.game", "game.entities", "ai.env", "ai.numpy_policy", "ai.train")
+
+# Distributions whose versions can change a .zip model's actions
+POLICY_LIBRARIES = ("numpy", "stable-baselines3", "torch")
+
+_rules_digest = None
+_env_config = None
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def rules_fingerprint() -> str:
+    """Hash of the simulator and environment source code"""
+    global _rules_digest
+    if _rules_digest is None:
+        digest = hashlib.sha256()
+        for name in RULE_MODULES:
+            with open(importlib.util.find_spec(name).origin, "rb") as f:
+                digest.update(f.read())
+        _rules_digest = digest.hexdigest()
+    return _rules_digest
+
+
+def env_config() -> dict:
+    """Settings of the default evaluation environment (read from one env, once)"""
+    global _env_config
+    if _env_config is None:
+        env = BTD6Env()
+        _env_config = {
+            "width": env.width,
+            "height": env.height,
+            "grid_resolution": env.grid_resolution,
+            "max_steps": env.max_steps,
+            "max_balloons": env.max_balloons,
+            "max_towers": env.max_towers,
+            "starting_lives": env.game.starting_lives,
+            "starting_cash": env.game.starting_cash,
+        }
+        env.close()
+    return _env_config
+
+
+def library_versions(model_path: str) -> Dict[str, Optional[str]]:
+    """Installed versions of the libraries that run the model (NumPy only for .npz)"""
+    names = ("numpy",) if model_path.endswith(".npz") else POLICY_LIBRARIES
+    versions = {}
+    for name in names:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def cache_key(model_path: str, episodes: int, deterministic: bool) -> str:
+    """Key identifying one evaluation of one model under the current rules"""
+    parts = {
+        "model": _file_digest(model_path),
+        "env": env_config(),
+        "episodes": episodes,
+        "deterministic": deterministic,
+        "rules": rules_fingerprint(),
+        "libraries": library_versions(model_path),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def load(key: str) -> Optional[dict]:
+    """Return the stored evaluate_model() result for key, or None"""
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path) as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # JSON has no tuples; restore the (x, y) placement pairs
+    result["placements"] = [[tuple(p) for p in episode] for episode in result["placements"]]
+    return result
+
+
+def store(key: str, result: dict):
+    """Write an evaluate_model() result for key"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
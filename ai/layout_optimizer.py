@@ -0,0 +1,221 @@
+"""
+Gradient-free tower layout optimizer
+
+For a fixed map and wave set, choosing where to put the towers is a static
+optimization problem. optimize_layout() runs a genetic algorithm over whole
+layouts (lists of tower positions): every candidate is played to the end in
+BTD6Game across a process pool, and the best layouts found within a wall-clock
+budget are returned. to_hotkey_actions() turns a layout into the action dicts
+accepted by BTD6Integration.place_towers_hotkeys.
+
+Usage:
+    python -m ai.layout_optimizer [n_towers] [time_budget_seconds]
+"""
+
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from game.game import BTD6Game, GameState
+from game.transposition import TranspositionTable, play_to_end
+
+Layout = List[Tuple[float, float]]
+
+WIN_BONUS = 1000.0
+LIFE_VALUE = 10.0
+
+# Per-process table shared by every layout a worker evaluates
+_worker_table: Optional[TranspositionTable] = None
+
+
+def evaluate_layout(
+    layout: Layout,
+    starting_cash: Optional[int] = None,
+    width: int = 800,
+    height: int = 600,
+    table: Optional[TranspositionTable] = None,
+) -> dict:
+    """
+    Place the layout's towers (in order, skipping illegal ones) and play the
+    game to the end. With a table, waves already played from the same start
+    state are looked up instead of simulated.
+
+    Returns:
+        {"fitness": float, "won": bool, "lives": int, "towers": int,
+         "layout": the positions actually placed (illegal ones stripped)}
+    """
+    if starting_cash is None:
+        starting_cash = len(layout) * BTD6Game.TOWER_COST
+    game = BTD6Game(width=width, height=height, starting_cash=starting_cash)
+    placed = [(float(x), float(y)) for x, y in layout if game.place_tower(float(x), float(y))]
+    if table is None:
+        game.simulate()
+    else:
+        play_to_end(game, table)
+
+    won = game.state == GameState.WON
+    # Lives dominate; among equal outcomes prefer fewer towers (cheaper layouts)
+    fitness = WIN_BONUS * won + LIFE_VALUE * game.lives - len(game.towers)
+    return {"fitness": fitness, "won": won, "lives": game.lives, "towers": len(game.towers), "layout": placed}
+
+
+def _evaluate_genome(args) -> dict:
+    global _worker_table
+    genome, starting_cash, width, height, use_table = args
+    if use_table and _worker_table is None:
+        _worker_table = TranspositionTable()
+    table = _worker_table if use_table else None
+    return evaluate_layout([tuple(p) for p in genome], starting_cash, width, height, table)
+
+
+def _random_genome(rng: np.random.Generator, n_towers: int, path: np.ndarray, spread: float) -> np.ndarray:
+    """Towers scattered around random points of the balloon path"""
+    anchors = path[rng.integers(len(path), size=n_towers)]
+    return anchors + rng.normal(0, spread, size=(n_towers, 2))
+
+
+def optimize_layout(
+    n_towers: int = 3,
+    starting_cash: Optional[int] = None,
+    time_budget: float = 30.0,
+    population_size: int = 32,
+    elite: int = 2,
+    mutation_sigma: float = 40.0,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    width: int = 800,
+    height: int = 600,
+    surrogate=None,
+    prefilter: int = 4,
+    transposition: bool = True,
+) -> dict:
+    """
+    Genetic search for the best placement of n_towers towers.
+
+    Each generation keeps the elite layouts, fills the rest of the population
+    with tournament-selected parents combined by uniform per-tower crossover and
+    Gaussian position mutation, and evaluates everything in parallel. Search
+    stops once the wall-clock time_budget is spent.
+
+    With a surrogate (ai.surrogate.LayoutSurrogate), prefilter times more
+    offspring are bred each generation and only those the surrogate ranks
+    highest are fully simulated.
+
+    With transposition, each worker memoizes wave outcomes in a
+    game.transposition.TranspositionTable, so the elite layouts carried over
+    every generation (and duplicate children) are not simulated again.
+
+    Returns:
+        {"best_layout": Layout, "best": dict, "top_layouts": [(Layout, dict), ...],
+         "generations": int, "evaluations": int, "first_win_time": Optional[float],
+         "history": [best fitness per generation]}
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    path = np.array([(p.x, p.y) for p in BTD6Game(width=width, height=height).balloon_path])
+    bounds = np.array([width, height], dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+
+    population = [
+        np.clip(_random_genome(rng, n_towers, path, mutation_sigma * 2), 0, bounds) for _ in range(population_size)
+    ]
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) if workers > 1 else None
+    evaluate = pool.map if pool else map
+
+    results: List[Tuple[np.ndarray, dict]] = []
+    history = []
+    evaluations = 0
+    generations = 0
+    first_win_time = None
+    try:
+        while True:
+            jobs = [(g, starting_cash, width, height, transposition) for g in population]
+            scores = list(evaluate(_evaluate_genome, jobs))
+            evaluations += len(scores)
+            generations += 1
+
+            # Elites are re-evaluated every generation: keep one entry per placed layout
+            ranked = {_layout_key(s["layout"]): (g, s) for g, s in results}
+            for genome, score in zip(population, scores):
+                ranked.setdefault(_layout_key(score["layout"]), (genome, score))
+            results = sorted(ranked.values(), key=lambda item: -item[1]["fitness"])[:population_size]
+            history.append(results[0][1]["fitness"])
+
+            if first_win_time is None and any(s["won"] for s in scores):
+                first_win_time = time.perf_counter() - start
+            if time.perf_counter() - start >= time_budget:
+                break
+
+            # Next generation
+            fitness = np.array([s["fitness"] for s in scores])
+            next_population = [genome.copy() for genome, _ in results[:elite]]
+            n_children = population_size - len(next_population)
+            children = []
+            while len(children) < n_children * (prefilter if surrogate else 1):
+                a = population[_tournament(rng, fitness)]
+                b = population[_tournament(rng, fitness)]
+                child = np.where(rng.random((n_towers, 1)) < 0.5, a, b)
+                child = child + rng.normal(0, mutation_sigma, size=child.shape) * (rng.random((n_towers, 1)) < 0.5)
+                children.append(np.clip(child, 0, bounds))
+            if surrogate:
+                order = surrogate.rank([[tuple(p) for p in c] for c in children], starting_cash)
+                children = [children[i] for i in order[:n_children]]
+            population = next_population + children
+    finally:
+        if pool:
+            pool.shutdown()
+
+    # Only positions that were placed: rejected genes never reach the real game
+    top_layouts = [(score["layout"], score) for _, score in results]
+    return {
+        "best_layout": top_layouts[0][0],
+        "best": top_layouts[0][1],
+        "top_layouts": top_layouts,
+        "generations": generations,
+        "evaluations": evaluations,
+        "first_win_time": first_win_time,
+        "history": history,
+    }
+
+
+def _layout_key(layout: Layout) -> Tuple[Tuple[float, float], ...]:
+    return tuple((round(x, 1), round(y, 1)) for x, y in layout)
+
+
+def _tournament(rng: np.random.Generator, fitness: np.ndarray, size: int = 3) -> int:
+    contestants = rng.integers(len(fitness), size=size)
+    return int(contestants[np.argmax(fitness[contestants])])
+
+
+def to_hotkey_actions(
+    layout: Layout,
+    game_region: Optional[Tuple[int, int, int, int]] = None,
+    sim_size: Tuple[int, int] = (800, 600),
+    tower_type: str = "dart_monkey",
+) -> List[dict]:
+    """
+    Convert a simulator layout into BTD6Integration.place_towers_hotkeys actions.
+    With a game_region (x, y, width, height), positions are scaled from simulator
+    pixels to the region's size.
+    """
+    scale_x = game_region[2] / sim_size[0] if game_region else 1.0
+    scale_y = game_region[3] / sim_size[1] if game_region else 1.0
+    return [{"type": tower_type, "x": int(x * scale_x), "y": int(y * scale_y)} for x, y in layout]
+
+
+if __name__ == "__main__":
+    n_towers = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    time_budget = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+
+    result = optimize_layout(n_towers=n_towers, time_budget=time_budget)
+    print(f"{result['generations']} generations, {result['evaluations']} layouts evaluated")
+    if result["first_win_time"] is not None:
+        print(f"First winning layout after {result['first_win_time']:.2f}s")
+    print(f"Best: {result['best']}")
+    print(f"Actions: {to_hotkey_actions(result['best_layout'])}")
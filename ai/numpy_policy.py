@@ -0,0 +1,136 @@
+"""
+Torch-free inference for trained policies
+
+A trained PPO MlpPolicy only needs its actor network (MLP + action head) to
+pick actions. export_policy() writes those weights to a compact .npz file and
+NumpyPolicy runs the forward pass with NumPy, so deployment scripts can act
+without importing Stable Baselines3 or torch.
+
+Usage:
+    python -m ai.numpy_policy models/btd6_test_final.zip [models/btd6_test_final.npz]
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0),
+    "Identity": lambda x: x,
+}
+
+
+def export_policy(model, output_path: str) -> str:
+    """
+    Export the actor of a trained PPO MlpPolicy with a Discrete action space.
+
+    Args:
+        model: A loaded PPO model or the path to a saved one
+        output_path: Where to write the weights (.npz)
+
+    Returns:
+        The path written
+    """
+    from torch import nn
+
+    if isinstance(model, str):
+        from stable_baselines3 import PPO
+
+        model = PPO.load(model, device="cpu")
+
+    policy = model.policy
+    layers = [m for m in policy.mlp_extractor.policy_net] + [policy.action_net]
+
+    arrays = {}
+    activations = []
+    n_linear = 0
+    for module in layers:
+        if isinstance(module, nn.Linear):
+            arrays[f"W{n_linear}"] = module.weight.detach().cpu().numpy().T.astype(np.float32)
+            arrays[f"b{n_linear}"] = module.bias.detach().cpu().numpy().astype(np.float32)
+            n_linear += 1
+        else:
+            name = type(module).__name__
+            if name not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for NumPy export: {name}")
+            # Activation applied after the most recent linear layer
+            activations.append((n_linear - 1, name))
+
+    arrays["activations"] = np.array([f"{i}:{name}" for i, name in activations])
+    arrays["obs_shape"] = np.array(policy.observation_space.shape, dtype=np.int64)
+
+    np.savez(output_path, **arrays)
+    return output_path if output_path.endswith(".npz") else output_path + ".npz"
+
+
+class NumpyPolicy:
+    """
+    NumPy forward pass of an exported MlpPolicy actor.
+
+    predict() mirrors the Stable Baselines3 signature: it accepts a single
+    observation or a batch and returns (action, None).
+    """
+
+    def __init__(self, weights: list, activations: dict, obs_shape: Tuple[int, ...], seed: Optional[int] = None):
+        self.weights = weights  # [(W, b), ...] with W of shape (in, out)
+        self.activations = activations  # layer index -> activation function
+        self.obs_shape = tuple(obs_shape)
+        self.n_actions = weights[-1][0].shape[1]
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def load(cls, path: str, seed: Optional[int] = None) -> "NumpyPolicy":
+        """Load weights written by export_policy()"""
+        with np.load(path) as data:
+            n_linear = sum(1 for key in data.files if key.startswith("W"))
+            weights = [(data[f"W{i}"], data[f"b{i}"]) for i in range(n_linear)]
+            activations = {}
+            for entry in data["activations"]:
+                index, name = str(entry).split(":")
+                activations[int(index)] = ACTIVATIONS[name]
+            obs_shape = tuple(int(n) for n in data["obs_shape"])
+        return cls(weights, activations, obs_shape, seed=seed)
+
+    def action_logits(self, obs: np.ndarray) -> np.ndarray:
+        """Action logits for a batch of observations, shape (n, n_actions)"""
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, int(np.prod(self.obs_shape)))
+        for i, (W, b) in enumerate(self.weights):
+            x = x @ W + b
+            activation = self.activations.get(i)
+            if activation is not None:
+                x = activation(x)
+        return x
+
+    def predict(self, obs: np.ndarray, deterministic: bool = True) -> Tuple[np.ndarray, None]:
+        """
+        Pick actions for one observation or a batch of observations.
+
+        Returns:
+            (action, None) where action is a scalar array for a single
+            observation, or an array of shape (n,) for a batch
+        """
+        obs = np.asarray(obs)
+        single = obs.shape == self.obs_shape
+        logits = self.action_logits(obs)
+
+        if deterministic:
+            actions = np.argmax(logits, axis=1)
+        else:
+            # Gumbel-max trick: sampling from softmax(logits) without normalizing
+            gumbel = -np.log(-np.log(self.rng.uniform(1e-12, 1.0, size=logits.shape)))
+            actions = np.argmax(logits + gumbel, axis=1)
+
+        return (actions[0] if single else actions), None
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m ai.numpy_policy <model.zip> [output.npz]")
+        sys.exit(1)
+
+    model_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else model_path.rsplit(".zip", 1)[0] + ".npz"
+    print(f"Exported policy to {export_policy(model_path, output_path)}")
@@ -0,0 +1,204 @@
+"""
+Memory-mapped bank of starting scenarios for curriculum training
+
+generate_scenario_bank() builds varied mid-game states (cash, pre-placed towers,
+spawn progress, balloons already in flight) with BTD6Game once and stores them as
+fixed-width rows of a .npy file. ScenarioBank opens the file with mmap, so all
+environments - in all worker processes - share the same read-only pages, and
+sampling a scenario only decodes the one row it needs.
+
+Usage:
+    python -m ai.scenario_bank scenarios.npy [count] [seed]
+"""
+
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+
+from game.entities import BalloonType
+from game.game import BTD6Game, GameState
+
+MAX_TOWERS = 10
+MAX_BALLOONS = 100
+MAX_PROJECTILES = 32
+
+HEADER_FIELDS = (
+    "lives",
+    "max_lives",
+    "cash",
+    "round",
+    "state",
+    "current_wave",
+    "balloons_spawned",
+    "spawn_index",
+    "spawn_timer",
+    "n_towers",
+    "n_balloons",
+    "n_projectiles",
+)
+TOWER_FIELDS = ("x", "y", "range", "fire_rate", "fire_cooldown", "damage")
+BALLOON_FIELDS = ("type", "x", "y", "health", "speed", "path_offset", "path_index", "progress_on_path")
+PROJECTILE_FIELDS = ("x", "y", "target", "speed", "damage")
+
+TOWERS_START = len(HEADER_FIELDS)
+BALLOONS_START = TOWERS_START + MAX_TOWERS * len(TOWER_FIELDS)
+PROJECTILES_START = BALLOONS_START + MAX_BALLOONS * len(BALLOON_FIELDS)
+ROW_SIZE = PROJECTILES_START + MAX_PROJECTILES * len(PROJECTILE_FIELDS)
+
+BALLOON_TYPES = list(BalloonType)
+
+
+def encode_scenario(scenario: Dict) -> np.ndarray:
+    """Pack a BTD6Game.snapshot() dictionary into one float32 row"""
+    towers = scenario["towers"][:MAX_TOWERS]
+    balloons = scenario["balloons"][:MAX_BALLOONS]
+    projectiles = [p for p in scenario["projectiles"] if p["target"] < len(balloons)][:MAX_PROJECTILES]
+
+    row = np.zeros(ROW_SIZE, dtype=np.float32)
+    header = dict(scenario)
+    header["state"] = GameState[scenario["state"]].value
+    header["n_towers"] = len(towers)
+    header["n_balloons"] = len(balloons)
+    header["n_projectiles"] = len(projectiles)
+    row[:TOWERS_START] = [header[field] for field in HEADER_FIELDS]
+
+    for i, tower in enumerate(towers):
+        start = TOWERS_START + i * len(TOWER_FIELDS)
+        row[start : start + len(TOWER_FIELDS)] = [tower[field] for field in TOWER_FIELDS]
+
+    for i, balloon in enumerate(balloons):
+        start = BALLOONS_START + i * len(BALLOON_FIELDS)
+        values = dict(balloon, type=BALLOON_TYPES.index(BalloonType[balloon["type"]]))
+        row[start : start + len(BALLOON_FIELDS)] = [values[field] for field in BALLOON_FIELDS]
+
+    for i, projectile in enumerate(projectiles):
+        start = PROJECTILES_START + i * len(PROJECTILE_FIELDS)
+        row[start : start + len(PROJECTILE_FIELDS)] = [projectile[field] for field in PROJECTILE_FIELDS]
+
+    return row
+
+
+def decode_scenario(row: np.ndarray) -> Dict:
+    """Unpack a bank row into a dictionary accepted by BTD6Game.reset(scenario=...)"""
+    header = dict(zip(HEADER_FIELDS, row[:TOWERS_START].tolist()))
+    n_towers = int(header["n_towers"])
+    n_balloons = int(header["n_balloons"])
+    n_projectiles = int(header["n_projectiles"])
+
+    towers = row[TOWERS_START : TOWERS_START + n_towers * len(TOWER_FIELDS)]
+    balloons = row[BALLOONS_START : BALLOONS_START + n_balloons * len(BALLOON_FIELDS)]
+    projectiles = row[PROJECTILES_START : PROJECTILES_START + n_projectiles * len(PROJECTILE_FIELDS)]
+
+    scenario = {
+        "lives": int(header["lives"]),
+        "max_lives": int(header["max_lives"]),
+        "cash": int(header["cash"]),
+        "round": int(header["round"]),
+        "state": GameState(int(header["state"])).name,
+        "current_wave": int(header["current_wave"]),
+        "balloons_spawned": int(header["balloons_spawned"]),
+        "spawn_index": int(header["spawn_index"]),
+        "spawn_timer": header["spawn_timer"],
+        "towers": [
+            dict(zip(TOWER_FIELDS, values))
+            for values in towers.reshape(n_towers, len(TOWER_FIELDS)).tolist()
+        ],
+        "balloons": [],
+        "projectiles": [],
+    }
+    for values in balloons.reshape(n_balloons, len(BALLOON_FIELDS)).tolist():
+        balloon = dict(zip(BALLOON_FIELDS, values))
+        balloon["type"] = BALLOON_TYPES[int(balloon["type"])].name
+        balloon["health"] = int(balloon["health"])
+        balloon["path_offset"] = int(balloon["path_offset"])
+        balloon["path_index"] = int(balloon["path_index"])
+        scenario["balloons"].append(balloon)
+    for values in projectiles.reshape(n_projectiles, len(PROJECTILE_FIELDS)).tolist():
+        projectile = dict(zip(PROJECTILE_FIELDS, values))
+        projectile["target"] = int(projectile["target"])
+        projectile["damage"] = int(projectile["damage"])
+        scenario["projectiles"].append(projectile)
+    for tower in scenario["towers"]:
+        tower["damage"] = int(tower["damage"])
+
+    return scenario
+
+
+def random_scenario(rng: np.random.Generator, width: int = 800, height: int = 600) -> Dict:
+    """
+    Build one random starting state: extra cash for up to MAX_TOWERS towers,
+    some of it spent on randomly placed towers, part of the wave counted as
+    already spawned (and popped), then up to 15 seconds of the rest played.
+
+    The simulator only has round 1's single wave, so round stays 1 and every
+    scenario is a point in that wave.
+    """
+    game = BTD6Game(width=width, height=height)
+    game.cash += int(rng.integers(0, MAX_TOWERS + 1)) * BTD6Game.TOWER_COST
+    wave = game.round_waves[game.current_wave]
+    game.spawn_index = int(rng.integers(0, len(wave)))
+    game.balloons_spawned = int(rng.integers(0, wave[game.spawn_index][1]))
+
+    for _ in range(int(rng.integers(0, MAX_TOWERS + 1))):
+        for attempt in range(20):
+            if game.place_tower(float(rng.uniform(0, width)), float(rng.uniform(0, height))):
+                break
+
+    dt = 1.0 / 60.0
+    for _ in range(int(rng.integers(0, 15 * 60))):
+        game.update(dt)
+        if game.state != GameState.RUNNING:
+            break
+
+    return game.snapshot()
+
+
+def generate_scenario_bank(path: str, count: int = 10000, seed: int = 0) -> str:
+    """
+    Generate count random scenarios and write them to a .npy file at path.
+
+    Returns:
+        The path written
+    """
+    rng = np.random.default_rng(seed)
+    bank = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(count, ROW_SIZE))
+    for i in range(count):
+        bank[i] = encode_scenario(random_scenario(rng))
+    bank.flush()
+    del bank
+    return path
+
+
+class ScenarioBank:
+    """Read-only, memory-mapped view of a scenario bank file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = np.load(path, mmap_mode="r")
+        if self.rows.ndim != 2 or self.rows.shape[1] != ROW_SIZE:
+            raise ValueError(f"{path} is not a scenario bank (row size {ROW_SIZE})")
+
+    def __len__(self) -> int:
+        return self.rows.shape[0]
+
+    def scenario(self, index: int) -> Dict:
+        """Decode one scenario; only that row's pages are read"""
+        return decode_scenario(self.rows[index])
+
+    def sample(self, rng: Optional[np.random.Generator] = None) -> Dict:
+        """Decode a uniformly sampled scenario"""
+        rng = rng or np.random.default_rng()
+        return self.scenario(int(rng.integers(len(self))))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m ai.scenario_bank <output.npy> [count] [seed]")
+        sys.exit(1)
+
+    output_path = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    generate_scenario_bank(output_path, count=count, seed=seed)
+    print(f"Wrote {count} scenarios to {output_path}")
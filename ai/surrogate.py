@@ -0,0 +1,216 @@
+"""
+Surrogate outcome model for tower layouts
+
+Simulating a layout to the end is the main cost of any planner built on
+BTD6Game. LayoutSurrogate predicts the outcome instead, from cheap analytic
+layout features (track length each tower covers, how early the track is first
+covered, and the shots the layout can fire at each balloon against the wave's
+red bloon equivalent). It is a ridge regression for lives leaked plus a
+logistic regression for the win probability, trained on simulator rollouts,
+and is used to rank candidates so only the most promising get fully simulated.
+"""
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ai.coverage import path_coverage
+from ai.layout_optimizer import LIFE_VALUE, WIN_BONUS, Layout, _random_genome, evaluate_layout
+from game.entities import Balloon, Vector2
+from game.game import BTD6Game
+
+FEATURE_NAMES = (
+    "bias",
+    "towers",
+    "coverage_total",
+    "coverage_max",
+    "coverage_union",
+    "first_contact",
+    "shots_per_rbe",
+)
+
+
+def _wave_rbe(game: BTD6Game) -> float:
+    """Red bloon equivalent: hits needed to pop every balloon of every wave"""
+    total = 0
+    for wave in game.round_waves:
+        for balloon_type, count in wave:
+            hits = 0
+            balloon = Balloon(balloon_type, Vector2(0, 0), game.balloon_path)
+            while balloon is not None:
+                hits += balloon.health
+                children = balloon._split()
+                balloon = children[0] if children else None
+            total += hits * count
+    return float(total)
+
+
+def layout_features(layout: Layout, starting_cash: Optional[int] = None) -> np.ndarray:
+    """Feature vector (FEATURE_NAMES order) of the towers that can legally be placed"""
+    if starting_cash is None:
+        starting_cash = len(layout) * BTD6Game.TOWER_COST
+    game = BTD6Game(starting_cash=starting_cash)
+    for x, y in layout:
+        game.place_tower(float(x), float(y))
+
+    path = np.array([(p.x, p.y) for p in game.balloon_path])
+    total_length = np.linalg.norm(np.diff(path, axis=0), axis=1).sum()
+    if not game.towers:
+        return np.array([1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0])
+
+    positions = np.array([(t.position.x, t.position.y) for t in game.towers])
+    ranges = np.array([t.range for t in game.towers])
+    fire_rates = np.array([t.fire_rate for t in game.towers])
+    entry, exit = path_coverage(positions, ranges, path)
+    per_tower = (exit - entry).sum(axis=1)
+
+    # Union of covered intervals along the path
+    intervals = sorted((s, e) for s, e in zip(entry.ravel(), exit.ravel()) if e > s)
+    union, end = 0.0, -np.inf
+    for s, e in intervals:
+        if e > end:
+            union += e - max(s, end)
+            end = e
+    first_contact = intervals[0][0] / total_length if intervals else 1.0
+
+    # Shots the layout fires while one balloon crosses it, per hit the wave needs
+    speed = Balloon(game.round_waves[0][0][0], Vector2(0, 0), game.balloon_path).speed
+    balloons = sum(count for wave in game.round_waves for _, count in wave)
+    shots = (per_tower / speed * fire_rates).sum() * balloons
+
+    return np.array(
+        [
+            1.0,
+            len(game.towers),
+            per_tower.sum() / total_length,
+            per_tower.max() / total_length,
+            union / total_length,
+            first_contact,
+            shots / _wave_rbe(game),
+        ]
+    )
+
+
+class LayoutSurrogate:
+    """Ridge regression for leaked lives and logistic regression for winning"""
+
+    def __init__(self, ridge: float = 1e-3):
+        self.ridge = ridge
+        self.leak_weights: Optional[np.ndarray] = None
+        self.win_weights: Optional[np.ndarray] = None
+        self.constant_win: Optional[float] = None
+        self.mean = None
+        self.scale = None
+
+    def _standardize(self, features: np.ndarray) -> np.ndarray:
+        return (features - self.mean) / self.scale
+
+    def fit(self, features: np.ndarray, leaks: np.ndarray, wins: np.ndarray, iterations: int = 500) -> "LayoutSurrogate":
+        features = np.asarray(features, dtype=np.float64)
+        self.mean = features.mean(axis=0)
+        self.scale = features.std(axis=0)
+        self.mean[0], self.scale[0] = 0.0, 1.0  # Keep the bias column
+        self.scale[self.scale == 0] = 1.0
+        X = self._standardize(features)
+
+        A = X.T @ X + self.ridge * np.eye(X.shape[1])
+        self.leak_weights = np.linalg.solve(A, X.T @ np.asarray(leaks, dtype=np.float64))
+
+        wins = np.asarray(wins, dtype=np.float64)
+        if wins.min() == wins.max():
+            # Every training layout had the same result; nothing to separate
+            self.constant_win = float(wins[0])
+        else:
+            self.constant_win = None
+            w = np.zeros(X.shape[1])
+            for _ in range(iterations):
+                p = 1 / (1 + np.exp(-X @ w))
+                w -= 0.5 * (X.T @ (p - wins) / len(wins) + self.ridge * w)
+            self.win_weights = w
+        return self
+
+    def predict(self, features: np.ndarray) -> tuple:
+        """Returns (predicted leaked lives, predicted win probability)"""
+        X = self._standardize(np.atleast_2d(features))
+        leaks = np.maximum(X @ self.leak_weights, 0)
+        if self.constant_win is not None:
+            win_prob = np.full(len(X), self.constant_win)
+        else:
+            win_prob = 1 / (1 + np.exp(-X @ self.win_weights))
+        return leaks, win_prob
+
+    def score(self, layouts: Sequence[Layout], starting_cash: Optional[int] = None) -> np.ndarray:
+        """Predicted fitness on the layout optimizer's scale (higher is better)"""
+        features = np.array([layout_features(layout, starting_cash) for layout in layouts])
+        leaks, win_prob = self.predict(features)
+        return WIN_BONUS * win_prob - LIFE_VALUE * leaks
+
+    def rank(self, layouts: Sequence[Layout], starting_cash: Optional[int] = None) -> np.ndarray:
+        """Indices of layouts from most to least promising"""
+        return np.argsort(-self.score(layouts, starting_cash), kind="stable")
+
+
+def sample_layouts(count: int, n_towers: int, seed: int = 0, spread: float = 80.0) -> List[Layout]:
+    """Random layouts scattered around the balloon path"""
+    rng = np.random.default_rng(seed)
+    path = np.array([(p.x, p.y) for p in BTD6Game().balloon_path])
+    bounds = np.array([800.0, 600.0])
+    return [
+        [tuple(p) for p in np.clip(_random_genome(rng, n_towers, path, spread), 0, bounds).tolist()]
+        for _ in range(count)
+    ]
+
+
+def simulate_layouts(layouts: Sequence[Layout], workers: Optional[int] = None) -> List[dict]:
+    """Full simulation of every layout (evaluate_layout) over a process pool"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return [evaluate_layout(layout) for layout in layouts]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        return list(pool.map(evaluate_layout, layouts, chunksize=16))
+
+
+def train_surrogate(
+    samples: int = 512, max_towers: int = 3, seed: int = 0, workers: Optional[int] = None
+) -> LayoutSurrogate:
+    """Fit a LayoutSurrogate on simulator rollouts of random layouts"""
+    rng = np.random.default_rng(seed)
+    layouts = []
+    for i in range(samples):
+        layouts.extend(sample_layouts(1, int(rng.integers(1, max_towers + 1)), seed=seed * samples + i))
+    results = simulate_layouts(layouts, workers)
+
+    features = np.array([layout_features(layout) for layout in layouts])
+    max_lives = BTD6Game().max_lives
+    leaks = np.array([max_lives - r["lives"] for r in results])
+    wins = np.array([r["won"] for r in results])
+    return LayoutSurrogate().fit(features, leaks, wins)
+
+
+def precision_recall(
+    surrogate: LayoutSurrogate, layouts: Sequence[Layout], results: Sequence[dict], keep: float = 0.25
+) -> dict:
+    """
+    Compare surrogate prefiltering with full simulation.
+
+    A layout is "good" if full simulation leaks no lives. The surrogate keeps the
+    top `keep` fraction of layouts; precision is the share of kept layouts that
+    are good, recall the share of good layouts that were kept.
+    """
+    max_lives = BTD6Game().max_lives
+    good = np.array([r["lives"] == max_lives for r in results])
+    n_keep = max(1, int(round(keep * len(layouts))))
+    kept = np.zeros(len(layouts), dtype=bool)
+    kept[surrogate.rank(layouts)[:n_keep]] = True
+
+    true_positives = int((kept & good).sum())
+    return {
+        "kept": n_keep,
+        "good": int(good.sum()),
+        "precision": true_positives / n_keep,
+        "recall": true_positives / int(good.sum()) if good.any() else 1.0,
+        "base_rate": float(good.mean()),
+    }
@@ -2,24 +2,37 @@
 AI training script using Stable Baselines3
 """
 
+import hashlib
+import multiprocessing as mp
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+from ai import eval_cache
 from ai.env import BTD6Env
-from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
-from stable_baselines3.common.callbacks import CheckpointCallback, EvalCallback
+from ai.numpy_policy import NumpyPolicy, export_policy
+
+# Stable Baselines3 (and torch) are imported inside the functions that need
+# them, so evaluating an exported NumPy policy never loads them.
 
-# Create output directory
+# Output directories (created when training starts)
 models_dir = "models"
 logs_dir = "logs"
 
-os.makedirs(models_dir, exist_ok=True)
-os.makedirs(logs_dir, exist_ok=True)
+# Minimum episode count before evaluate_model spreads work over a process pool
+POOL_MIN_EPISODES = 64
 
 
 def train(
     total_timesteps: int = 100000,
     model_name: str = "btd6_ppo",
     log_interval: int = 10,
+    telemetry: bool = True,
+    eval_episodes: int = 5,
+    demonstrations: Optional[str] = None,
+    pretrain_epochs: int = 10,
+    record_trajectories: Optional[str] = None,
 ):
     """
     Train an RL agent on the BTD6 environment
@@ -28,7 +41,22 @@ def train(
         total_timesteps: Total number of environment steps to train
         model_name: Name of the model to save
         log_interval: Logging interval
+        telemetry: Write throughput metrics to logs/<model_name>_telemetry.{csv,prom}
+        eval_episodes: Episodes a separate process runs on each checkpoint, logged to
+            logs/<model_name>_eval.csv (0 disables checkpoint evaluation)
+        demonstrations: Expert (obs, action) pairs from ai/demonstrations.py used to
+            pre-train the policy by behaviour cloning before PPO starts
+        pretrain_epochs: Behaviour cloning epochs over the demonstrations
+        record_trajectories: Directory to stream every collected transition to
+            (read back with ai.trajectory_store.TrajectoryDataset)
     """
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.callbacks import CallbackList
+    from stable_baselines3.common.vec_env import DummyVecEnv
+    from ai.callbacks import AsyncCheckpointCallback, TelemetryCallback, TrajectoryRecorderCallback
+
+    os.makedirs(models_dir, exist_ok=True)
+    os.makedirs(logs_dir, exist_ok=True)
 
     # Create environment
     env = DummyVecEnv([lambda: BTD6Env(render_mode=None)])
@@ -48,19 +76,35 @@ def train(
         tensorboard_log=None,  # Disable tensorboard for now
     )
 
-    # Callbacks
-    checkpoint_callback = CheckpointCallback(
+    # Warm start from expert demonstrations
+    if demonstrations:
+        from ai.demonstrations import load_demonstrations, pretrain_policy
+
+        observations, actions = load_demonstrations(demonstrations)
+        losses = pretrain_policy(model, observations, actions, epochs=pretrain_epochs)
+        print(f"Pre-trained on {len(actions)} expert pairs (loss {losses[0]:.3f} -> {losses[-1]:.3f})")
+
+    # Callbacks: checkpoints are written and evaluated off the training thread
+    checkpoint_callback = AsyncCheckpointCallback(
         save_freq=10000,
         save_path=models_dir,
         name_prefix=model_name,
-        save_replay_buffer=False,
+        eval_episodes=eval_episodes,
+        eval_log=os.path.join(logs_dir, f"{model_name}_eval.csv"),
     )
+    callbacks = [checkpoint_callback]
+    if telemetry:
+        callbacks.append(TelemetryCallback(logs_dir, name=f"{model_name}_telemetry"))
+    if record_trajectories:
+        from ai.trajectory_store import TrajectoryWriter
+
+        callbacks.append(TrajectoryRecorderCallback(TrajectoryWriter(record_trajectories)))
 
     # Train
     print(f"Training for {total_timesteps} timesteps...")
     model.learn(
         total_timesteps=total_timesteps,
-        callback=checkpoint_callback,
+        callback=CallbackList(callbacks),
         log_interval=log_interval,
         tb_log_name=model_name,
     )
@@ -69,10 +113,158 @@ def train(
     model.save(os.path.join(models_dir, f"{model_name}_final"))
     print(f"Model saved to {models_dir}/{model_name}_final.zip")
 
+    # Torch-free copy of the policy for deployment (see ai/numpy_policy.py)
+    export_policy(model, os.path.join(models_dir, f"{model_name}_final.npz"))
+    print(f"NumPy policy exported to {models_dir}/{model_name}_final.npz")
+
     env.close()
 
 
-def evaluate(model_path: str, episodes: int = 10, render: bool = True):
+def _load_model(model_path: str):
+    """Load a trained policy for evaluation (.npz files use the NumPy policy)"""
+    if model_path.endswith(".npz"):
+        return NumpyPolicy.load(model_path)
+
+    from stable_baselines3 import PPO
+
+    return PPO.load(model_path)
+
+
+def _episode_key(env: BTD6Env) -> str:
+    """Hash of the full start state of the env's current episode"""
+    return hashlib.sha1(repr(env.game.snapshot()).encode()).hexdigest()
+
+
+def _run_episodes(
+    model,
+    episodes: int,
+    n_envs: int = 8,
+    deterministic: bool = True,
+    render: bool = False,
+    skip_duplicates: bool = True,
+) -> List[dict]:
+    """
+    Run evaluation episodes on up to n_envs environments stepped in lockstep,
+    with one batched predict() call per step across all active envs.
+
+    When the policy is deterministic and the env is too, an episode whose start
+    state matches one already run is not simulated again; its result is copied.
+
+    Returns one dict per episode: {"reward": float, "won": bool, "placements": List[Tuple[x,y]]}
+    """
+    if episodes <= 0:
+        return []
+
+    n_envs = 1 if render else max(1, min(n_envs, episodes))
+    envs = [BTD6Env(render_mode="human" if render else None) for _ in range(n_envs)]
+    skip_duplicates = skip_duplicates and deterministic and not render and BTD6Env.deterministic
+
+    results: List[Optional[dict]] = [None] * episodes
+    duplicates: Dict[int, str] = {}  # episode -> key of the episode it repeats
+    results_by_key: Dict[str, dict] = {}
+    seen_keys = set()
+
+    slots: List[Optional[dict]] = [None] * n_envs  # per-env running episode
+    obs: List[Optional[np.ndarray]] = [None] * n_envs
+    next_episode = 0
+
+    def start_episode(i: int):
+        nonlocal next_episode
+        while next_episode < episodes:
+            episode = next_episode
+            next_episode += 1
+            obs[i], _ = envs[i].reset()
+            key = _episode_key(envs[i]) if skip_duplicates else None
+            if key is not None and key in seen_keys:
+                duplicates[episode] = key
+                continue
+            if key is not None:
+                seen_keys.add(key)
+            slots[i] = {"episode": episode, "key": key, "reward": 0.0, "placements": []}
+            return
+        slots[i] = None
+
+    for i in range(n_envs):
+        start_episode(i)
+
+    while any(slot is not None for slot in slots):
+        active = [i for i, slot in enumerate(slots) if slot is not None]
+        actions, _ = model.predict(np.stack([obs[i] for i in active]), deterministic=deterministic)
+
+        for i, action in zip(active, np.asarray(actions).reshape(-1)):
+            env, slot = envs[i], slots[i]
+            position = env.action_to_position(action)
+            if position is not None:
+                slot["placements"].append(position)
+
+            obs[i], reward, terminated, truncated, info = env.step(int(action))
+            slot["reward"] += reward
+
+            if terminated or truncated:
+                result = {
+                    "reward": slot["reward"],
+                    "won": info.get("state") == "WON",
+                    "placements": slot["placements"],
+                }
+                results[slot["episode"]] = result
+                if slot["key"] is not None:
+                    results_by_key[slot["key"]] = result
+                start_episode(i)
+
+    for env in envs:
+        env.close()
+
+    for episode, key in duplicates.items():
+        original = results_by_key[key]
+        results[episode] = {**original, "placements": list(original["placements"])}
+
+    return results
+
+
+def _evaluate_chunk(model_path: str, episodes: int, n_envs: int, deterministic: bool) -> List[dict]:
+    """Process pool worker: load the model and run a share of the episodes"""
+    if not model_path.endswith(".npz"):
+        import torch
+
+        torch.set_num_threads(1)
+    model = _load_model(model_path)
+    return _run_episodes(model, episodes, n_envs=n_envs, deterministic=deterministic)
+
+
+def _evaluate_episodes(
+    model_path: str,
+    episodes: int,
+    render: bool = False,
+    n_envs: int = 8,
+    n_workers: Optional[int] = None,
+    deterministic: bool = True,
+) -> List[dict]:
+    """
+    Evaluate a saved model, spreading episodes over a process pool when there
+    are enough of them to pay for the worker start-up.
+
+    Deterministic evaluation of the deterministic env never needs more than one
+    simulated episode per distinct start state, so it always runs in-process.
+    """
+    parallel = not render and not (deterministic and BTD6Env.deterministic)
+    if n_workers is None:
+        n_workers = (os.cpu_count() or 1) if episodes >= POOL_MIN_EPISODES else 1
+    n_workers = min(n_workers, episodes // n_envs) if parallel else 1
+
+    if n_workers <= 1:
+        return _run_episodes(
+            _load_model(model_path), episodes, n_envs=n_envs, deterministic=deterministic, render=render
+        )
+
+    chunks = [episodes // n_workers + (1 if w < episodes % n_workers else 0) for w in range(n_workers)]
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(_evaluate_chunk, model_path, chunk, n_envs, deterministic) for chunk in chunks
+        ]
+        return [result for future in futures for result in future.result()]
+
+
+def evaluate(model_path: str, episodes: int = 10, render: bool = True, n_envs: int = 8):
     """
     Evaluate a trained model
 
@@ -80,81 +272,74 @@ def evaluate(model_path: str, episodes: int = 10, render: bool = True):
         model_path: Path to the saved model
         episodes: Number of episodes to evaluate
         render: Whether to render the environment
+        n_envs: Number of environments stepped in lockstep (ignored when rendering)
     """
 
-    env = BTD6Env(render_mode="human" if render else None)
-    model = PPO.load(model_path)
+    results = _evaluate_episodes(model_path, episodes, render=render, n_envs=n_envs)
 
     total_reward = 0
-    for episode in range(episodes):
-        obs, _ = env.reset()
-        done = False
-        episode_reward = 0
-
-        while not done:
-            action, _ = model.predict(obs, deterministic=True)
-            obs, reward, terminated, truncated, _ = env.step(action)
-            episode_reward += reward
-            done = terminated or truncated
-
-        total_reward += episode_reward
-        print(f"Episode {episode + 1}: {episode_reward}")
+    for episode, result in enumerate(results):
+        total_reward += result["reward"]
+        print(f"Episode {episode + 1}: {result['reward']}")
 
     print(f"Average reward: {total_reward / episodes}")
 
-    env.close()
-
 
-def evaluate_model(model_path: str, episodes: int = 3, render: bool = False) -> dict:
+def evaluate_model(
+    model_path: str,
+    episodes: int = 3,
+    render: bool = False,
+    n_envs: int = 8,
+    n_workers: Optional[int] = None,
+    deterministic: bool = True,
+    use_cache: bool = False,
+) -> dict:
     """
     Evaluate a trained model and return structured results useful for integration.
 
+    Episodes run on n_envs environments in lockstep with batched predictions, and
+    over n_workers processes for large stochastic evaluations (default: all CPUs
+    once episodes >= POOL_MIN_EPISODES).
+
+    With use_cache, deterministic evaluations are stored under cache/eval/ keyed by
+    the model file contents, env configuration, episode settings and simulator
+    source (see ai/eval_cache.py), and repeat calls return the stored result.
+
     Returns a dict: {"wins": int, "episodes": int, "placements": List[List[Tuple[x,y]]], "average_reward": float}
     Each inner placements list contains the (x,y) pixel placements taken in that episode.
     """
 
-    env = BTD6Env(render_mode="human" if render else None)
-    model = PPO.load(model_path)
-
-    total_reward = 0.0
-    wins = 0
-    all_placements = []
-
-    for episode in range(episodes):
-        obs, _ = env.reset()
-        done = False
-        episode_reward = 0.0
-        episode_placements = []
-
-        while not done:
-            action, _ = model.predict(obs, deterministic=True)
-
-            # Decode action to (x,y) using environment grid resolution
-            if action < env.num_actions - 1:
-                tile_x = action % env.tiles_x
-                tile_y = action // env.tiles_x
-                x = int(tile_x * env.grid_resolution + env.grid_resolution // 2)
-                y = int(tile_y * env.grid_resolution + env.grid_resolution // 2)
-                episode_placements.append((x, y))
-
-            obs, reward, terminated, truncated, info = env.step(int(action))
-            episode_reward += reward
-            done = terminated or truncated
-
-        total_reward += episode_reward
-        all_placements.append(episode_placements)
-        if info.get("state") == "WON":
-            wins += 1
+    # Only deterministic results are reproducible, and so safe to cache
+    use_cache = use_cache and deterministic and not render
+    if use_cache:
+        key = eval_cache.cache_key(model_path, episodes, deterministic)
+        cached = eval_cache.load(key)
+        if cached is not None:
+            return cached
+
+    results = _evaluate_episodes(
+        model_path,
+        episodes,
+        render=render,
+        n_envs=n_envs,
+        n_workers=n_workers,
+        deterministic=deterministic,
+    )
 
-    env.close()
+    total_reward = sum(result["reward"] for result in results)
 
-    return {
-        "wins": wins,
+    summary = {
+        "wins": sum(1 for result in results if result["won"]),
         "episodes": episodes,
-        "placements": all_placements,
+        "placements": [result["placements"] for result in results],
         "average_reward": total_reward / episodes if episodes > 0 else 0.0,
     }
 
+    if use_cache:
+        eval_cache.store(key, summary)
+
+    return summary
+
 
 if __name__ == "__main__":
     import sys
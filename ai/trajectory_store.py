@@ -0,0 +1,169 @@
+"""
+Streaming on-disk trajectory store
+
+TrajectoryWriter appends (observation, action, reward, done) transitions to a
+directory of fixed-size chunks, so rollouts can be kept for offline analysis
+and retraining without holding them in RAM. Chunks are either compressed .npz
+files (small, decompressed one chunk at a time) or raw .npy files that are
+memory-mapped on read. An index.json manifest is rewritten after every chunk,
+so a dataset can be read while it is still being written.
+
+TrajectoryDataset streams minibatches back without loading the whole dataset:
+at most one chunk plus a partial batch is in memory at a time.
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+FIELDS = ("obs", "actions", "rewards", "dones")
+INDEX_FILE = "index.json"
+
+
+class TrajectoryWriter:
+    """Append transitions to chunked files in a directory"""
+
+    def __init__(self, directory: str, chunk_size: int = 65536, compress: bool = True):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.chunks: List[dict] = []
+        self.total = 0
+
+        self._buffers: Optional[Dict[str, np.ndarray]] = None
+        self._count = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._write_index()
+
+    def append(self, obs: np.ndarray, action: int, reward: float, done: bool):
+        """Append a single transition"""
+        self.append_batch(
+            np.asarray(obs)[None],
+            np.asarray([action]),
+            np.asarray([reward]),
+            np.asarray([done]),
+        )
+
+    def append_batch(self, obs: np.ndarray, actions: np.ndarray, rewards: np.ndarray, dones: np.ndarray):
+        """Append one transition per row (e.g. one per vectorized env)"""
+        obs = np.asarray(obs, dtype=np.float32)
+        if self._buffers is None:
+            self._buffers = {
+                "obs": np.empty((self.chunk_size,) + obs.shape[1:], dtype=np.float32),
+                "actions": np.empty(self.chunk_size, dtype=np.int64),
+                "rewards": np.empty(self.chunk_size, dtype=np.float32),
+                "dones": np.empty(self.chunk_size, dtype=np.bool_),
+            }
+
+        batch = {
+            "obs": obs,
+            "actions": np.asarray(actions).reshape(-1),
+            "rewards": np.asarray(rewards).reshape(-1),
+            "dones": np.asarray(dones).reshape(-1),
+        }
+        n, start = len(obs), 0
+        while start < n:
+            take = min(n - start, self.chunk_size - self._count)
+            for field in FIELDS:
+                self._buffers[field][self._count : self._count + take] = batch[field][start : start + take]
+            self._count += take
+            start += take
+            if self._count == self.chunk_size:
+                self._flush()
+
+    def close(self):
+        """Write the last, partial chunk"""
+        if self._count > 0:
+            self._flush()
+
+    def _flush(self):
+        name = f"chunk_{len(self.chunks):06d}"
+        arrays = {field: self._buffers[field][: self._count] for field in FIELDS}
+
+        if self.compress:
+            tmp_path = os.path.join(self.directory, name + ".tmp.npz")
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, os.path.join(self.directory, name + ".npz"))
+        else:
+            for field, array in arrays.items():
+                tmp_path = os.path.join(self.directory, f"{name}.{field}.tmp.npy")
+                np.save(tmp_path, array)
+                os.replace(tmp_path, os.path.join(self.directory, f"{name}.{field}.npy"))
+
+        self.chunks.append({"name": name, "size": self._count, "compressed": self.compress})
+        self.total += self._count
+        self._count = 0
+        self._write_index()
+
+    def _write_index(self):
+        tmp_path = os.path.join(self.directory, INDEX_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"chunks": self.chunks, "total": self.total}, f)
+        os.replace(tmp_path, os.path.join(self.directory, INDEX_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryDataset:
+    """Read-only streaming view of a directory written by TrajectoryWriter"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.chunks: List[dict] = index["chunks"]
+
+    def __len__(self) -> int:
+        return sum(chunk["size"] for chunk in self.chunks)
+
+    def load_chunk(self, i: int) -> Dict[str, np.ndarray]:
+        """Arrays of one chunk (memory-mapped when stored uncompressed)"""
+        chunk = self.chunks[i]
+        base = os.path.join(self.directory, chunk["name"])
+        if chunk["compressed"]:
+            with np.load(base + ".npz") as data:
+                return {field: data[field] for field in FIELDS}
+        return {field: np.load(f"{base}.{field}.npy", mmap_mode="r") for field in FIELDS}
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        for i in range(len(self.chunks)):
+            yield self.load_chunk(i)
+
+    def iter_minibatches(
+        self, batch_size: int, shuffle: bool = True, seed: Optional[int] = None, drop_last: bool = False
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yield dicts of batch_size transitions. With shuffle, chunk order and the
+        order within each chunk are randomized; leftovers of one chunk are
+        carried into the next batch.
+        """
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self.chunks)) if shuffle else range(len(self.chunks))
+        carry: Optional[Dict[str, np.ndarray]] = None
+
+        for i in order:
+            chunk = self.load_chunk(int(i))
+            size = len(chunk["actions"])
+            rows = rng.permutation(size) if shuffle else np.arange(size)
+            # Fancy indexing copies just the selected rows out of the chunk
+            chunk = {field: chunk[field][rows] for field in FIELDS}
+            if carry is not None:
+                chunk = {field: np.concatenate([carry[field], chunk[field]]) for field in FIELDS}
+                carry = None
+
+            n = len(chunk["actions"])
+            full = n - n % batch_size
+            for start in range(0, full, batch_size):
+                yield {field: chunk[field][start : start + batch_size] for field in FIELDS}
+            if full < n:
+                carry = {field: chunk[field][full:] for field in FIELDS}
+
+        if carry is not None and not drop_last:
+            yield carry
@@ -2,29 +2,29 @@
 Game package initialization
 """
 
+import importlib.util
+
 from game.entities import Balloon, Tower, Projectile, Vector2, BalloonType
 from game.game import BTD6Game, GameState
 
-# Import renderer only if pygame is available
-try:
-    from game.renderer import BTD6Renderer
-    __all__ = [
-        "Balloon",
-        "Tower",
-        "Projectile",
-        "Vector2",
-        "BalloonType",
-        "BTD6Game",
-        "GameState",
-        "BTD6Renderer",
-    ]
-except ImportError:
-    __all__ = [
-        "Balloon",
-        "Tower",
-        "Projectile",
-        "Vector2",
-        "BalloonType",
-        "BTD6Game",
-        "GameState",
-    ]
+__all__ = [
+    "Balloon",
+    "Tower",
+    "Projectile",
+    "Vector2",
+    "BalloonType",
+    "BTD6Game",
+    "GameState",
+]
+
+# Renderer is only exported if pygame is available, and only imported on first use
+if importlib.util.find_spec("pygame") is not None:
+    __all__.append("BTD6Renderer")
+
+
+def __getattr__(name):
+    if name == "BTD6Renderer":
+        from game.renderer import BTD6Renderer
+
+        return BTD6Renderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,7 +2,7 @@
 Main game engine and state management
 """
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from enum import Enum
 from game.entities import Balloon, BalloonType, Projectile, Tower, Vector2
 
@@ -30,6 +30,8 @@ class BTD6Game:
     ):
         self.width = width
         self.height = height
+        self.starting_lives = starting_lives
+        self.starting_cash = starting_cash
         self.lives = starting_lives
         self.max_lives = starting_lives
         self.cash = starting_cash
@@ -59,6 +61,134 @@ class BTD6Game:
         self.spawn_timer = 0.0
         self.spawn_delay = 0.5  # Seconds between balloon spawns
 
+    def reset(self, scenario: Optional[Dict] = None):
+        """
+        Reset the game in place for a new episode.
+
+        The path, wave list and entity lists are reused rather than rebuilt.
+        If a scenario (as returned by snapshot()) is given, the game is
+        restored to that state instead of the starting state.
+        """
+        self.balloons.clear()
+        self.towers.clear()
+        self.projectiles.clear()
+
+        self.lives = self.starting_lives
+        self.max_lives = self.starting_lives
+        self.cash = self.starting_cash
+        self.round = 1
+        self.state = GameState.RUNNING
+
+        self.current_wave = 0
+        self.balloons_spawned = 0
+        self.spawn_index = 0
+        self.spawn_timer = 0.0
+
+        if scenario is not None:
+            self._restore(scenario)
+
+    def snapshot(self) -> Dict:
+        """
+        Capture the full game state as a plain dictionary.
+
+        The result can be passed to reset(scenario=...) to restore this state
+        later, on this game or on any other game using the same path.
+        """
+        path_length = len(self.balloon_path)
+        balloon_index = {id(b): i for i, b in enumerate(self.balloons)}
+
+        return {
+            "lives": self.lives,
+            "max_lives": self.max_lives,
+            "cash": self.cash,
+            "round": self.round,
+            "state": self.state.name,
+            "current_wave": self.current_wave,
+            "balloons_spawned": self.balloons_spawned,
+            "spawn_index": self.spawn_index,
+            "spawn_timer": self.spawn_timer,
+            "towers": [
+                {
+                    "x": t.position.x,
+                    "y": t.position.y,
+                    "range": t.range,
+                    "fire_rate": t.fire_rate,
+                    "fire_cooldown": t.fire_cooldown,
+                    "damage": t.damage,
+                }
+                for t in self.towers
+            ],
+            "balloons": [
+                {
+                    "type": b.balloon_type.name,
+                    "x": b.position.x,
+                    "y": b.position.y,
+                    "health": b.health,
+                    "speed": b.speed,
+                    "path_offset": path_length - len(b.path),
+                    "path_index": b.path_index,
+                    "progress_on_path": b.progress_on_path,
+                }
+                for b in self.balloons
+            ],
+            "projectiles": [
+                {
+                    "x": p.position.x,
+                    "y": p.position.y,
+                    "target": balloon_index.get(id(p.target_balloon), -1),
+                    "speed": p.speed,
+                    "damage": p.damage,
+                }
+                for p in self.projectiles
+            ],
+        }
+
+    def _restore(self, scenario: Dict):
+        """Load a snapshot() dictionary into the (already cleared) game"""
+        self.lives = scenario["lives"]
+        self.max_lives = scenario.get("max_lives", self.starting_lives)
+        self.cash = scenario["cash"]
+        self.round = scenario.get("round", 1)
+        self.state = GameState[scenario.get("state", GameState.RUNNING.name)]
+        self.current_wave = scenario.get("current_wave", 0)
+        self.balloons_spawned = scenario.get("balloons_spawned", 0)
+        self.spawn_index = scenario.get("spawn_index", 0)
+        self.spawn_timer = scenario.get("spawn_timer", 0.0)
+
+        for t in scenario.get("towers", []):
+            tower = Tower(
+                Vector2(t["x"], t["y"]),
+                range=t.get("range", 150),
+                fire_rate=t.get("fire_rate", 1.0),
+            )
+            tower.fire_cooldown = t.get("fire_cooldown", 0.0)
+            tower.damage = t.get("damage", tower.damage)
+            self.towers.append(tower)
+
+        for b in scenario.get("balloons", []):
+            balloon = Balloon(
+                BalloonType[b["type"]],
+                Vector2(b["x"], b["y"]),
+                self.balloon_path[b.get("path_offset", 0) :],
+                b.get("speed", 50),
+            )
+            balloon.health = b["health"]
+            balloon.path_index = b["path_index"]
+            balloon.progress_on_path = b["progress_on_path"]
+            self.balloons.append(balloon)
+
+        for p in scenario.get("projectiles", []):
+            # Projectiles whose target is gone retarget on their next update
+            target = p.get("target", -1)
+            self.projectiles.append(
+                Projectile(
+                    Vector2(p["x"], p["y"]),
+                    self.balloons[target] if 0 <= target < len(self.balloons) else None,
+                    speed=p.get("speed", 300),
+                    damage=p.get("damage", 1),
+                )
+            )
+
     def _get_round_waves(self) -> List[List[Tuple[BalloonType, int]]]:
         """
         Get balloon waves for each round.
@@ -151,6 +281,40 @@ class BTD6Game:
         ):
             self._end_wave()
 
+    def simulate(self, max_seconds: float = 120.0, dt: float = 1.0 / 60.0, until_wave_end: bool = False) -> float:
+        """
+        Run the game with a fixed time step until it is won or lost, until the
+        current wave ends (if until_wave_end), or until max_seconds have passed.
+        Returns the simulated time in seconds.
+        """
+        start_wave = self.current_wave
+        elapsed = 0.0
+        while self.state == GameState.RUNNING and elapsed < max_seconds:
+            self.update(dt)
+            elapsed += dt
+            if until_wave_end and self.current_wave != start_wave:
+                break
+        return elapsed
+
+    def evaluate_candidates(
+        self,
+        candidates: List[Optional[Tuple[float, float]]],
+        deadline: float = 1.0,
+        workers: Optional[int] = None,
+        max_seconds: float = 120.0,
+        pool=None,
+    ) -> List[Dict]:
+        """
+        Play each candidate placement ((x, y), or None for no placement) from
+        the current state to the end of the wave in forked worker processes
+        (or a persistent pool from game.whatif.create_pool). The game itself
+        is not modified. Returns the outcomes finished within deadline
+        seconds, fewest lives lost first (see game/whatif.py).
+        """
+        from game.whatif import evaluate_candidates
+
+        return evaluate_candidates(self, candidates, deadline, workers, max_seconds, pool)
+
     def _spawn_balloons(self, dt: float):
         """Spawn balloons from current wave"""
         current_wave = self.round_waves[self.current_wave]
@@ -0,0 +1,209 @@
+"""
+Transposition table for deterministic wave outcomes
+
+BTD6Game has no randomness: a game that starts a wave with the same towers,
+cash, lives and wave index always ends that wave in the same state. run_wave()
+looks the wave start up in a TranspositionTable and restores the stored
+end-of-wave snapshot on a hit, so search and evaluation code that keeps
+revisiting the same layouts only simulates each wave once.
+
+Keys include the rules (waves, path, field size and the simulator's source),
+so a table saved before a rule change misses instead of returning stale states.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import game.entities as entities
+import game.game as simulator
+from game.game import BTD6Game, GameState
+
+_source_digest = None
+
+
+def at_wave_start(game: BTD6Game) -> bool:
+    """True if nothing of the current wave has been spawned or simulated yet"""
+    return (
+        game.state == GameState.RUNNING
+        and not game.balloons
+        and not game.projectiles
+        and game.spawn_index == 0
+        and game.balloons_spawned == 0
+        and game.spawn_timer == 0.0
+    )
+
+
+def canonical_towers(game: BTD6Game) -> List[int]:
+    """
+    Sort the game's towers in place into a canonical order.
+
+    Towers update in list order, so two layouts that differ only in placement
+    order could resolve a shot differently. Putting both in the same order
+    makes them simulate identically, and so lets them share one table entry.
+
+    Returns:
+        The original index of each tower in its new position (see restore_order)
+    """
+    towers = game.towers
+    order = sorted(
+        range(len(towers)),
+        key=lambda i: (
+            towers[i].position.x,
+            towers[i].position.y,
+            towers[i].range,
+            towers[i].fire_rate,
+            towers[i].damage,
+            towers[i].fire_cooldown,
+        ),
+    )
+    game.towers[:] = [towers[i] for i in order]
+    return order
+
+
+def restore_order(game: BTD6Game, order: List[int]):
+    """Put towers sorted by canonical_towers back in the caller's order"""
+    original = [None] * len(order)
+    for position, index in enumerate(order):
+        original[index] = game.towers[position]
+    game.towers[:] = original
+
+
+def rules_fingerprint(game: BTD6Game) -> str:
+    """Hash of the rules a wave outcome depends on: waves, path, field and simulator source"""
+    global _source_digest
+    if _source_digest is None:
+        digest = hashlib.sha256()
+        for module in (simulator, entities):
+            with open(module.__file__, "rb") as f:
+                digest.update(f.read())
+        _source_digest = digest.hexdigest()
+    rules = {
+        "source": _source_digest,
+        "waves": [[(balloon_type.name, count) for balloon_type, count in wave] for wave in game.round_waves],
+        "path": [(p.x, p.y) for p in game.balloon_path],
+        "size": (game.width, game.height),
+        "spawn_delay": game.spawn_delay,
+    }
+    return hashlib.sha256(json.dumps(rules).encode()).hexdigest()
+
+
+def wave_key(game: BTD6Game, dt: float = 1.0 / 60.0) -> str:
+    """Canonical hash of a game at wave start"""
+    towers = sorted(
+        (
+            round(t.position.x, 6),
+            round(t.position.y, 6),
+            t.range,
+            t.fire_rate,
+            t.damage,
+            round(t.fire_cooldown, 6),
+        )
+        for t in game.towers
+    )
+    parts = {
+        "towers": towers,
+        "cash": game.cash,
+        "lives": game.lives,
+        "max_lives": game.max_lives,
+        "round": game.round,
+        "wave": game.current_wave,
+        "dt": dt,
+        "rules": rules_fingerprint(game),
+    }
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+class TranspositionTable:
+    """
+    LRU map from wave_key() to the end-of-wave snapshot.
+
+    With a path, entries are loaded from it on construction and written back by
+    save().
+    """
+
+    def __init__(self, max_entries: int = 4096, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                self.entries.update(pickle.load(f))
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def get(self, key: str) -> Optional[Dict]:
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, snapshot: Dict):
+        self.entries[key] = snapshot
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(dict(self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+def run_wave(
+    game: BTD6Game, table: Optional[TranspositionTable] = None, max_seconds: float = 120.0, dt: float = 1.0 / 60.0
+) -> bool:
+    """
+    Play the current wave to its end (or until the game is won or lost).
+
+    At wave start the result comes from the table when it has it; otherwise the
+    wave is simulated and, if it finished, stored. Returns True on a table hit.
+    """
+    if table is None or not at_wave_start(game):
+        game.simulate(max_seconds=max_seconds, dt=dt, until_wave_end=True)
+        return False
+
+    # Simulated (and stored) in canonical order; the caller's order (BTD6Env's
+    # tower observation slots follow it) is restored afterwards
+    order = canonical_towers(game)
+    key = wave_key(game, dt)
+    result = table.get(key)
+    if result is not None:
+        game.reset(scenario=result)
+        restore_order(game, order)
+        return True
+
+    start_wave = game.current_wave
+    game.simulate(max_seconds=max_seconds, dt=dt, until_wave_end=True)
+    if game.state != GameState.RUNNING or game.current_wave != start_wave:
+        table.put(key, game.snapshot())
+    restore_order(game, order)
+    return False
+
+
+def play_to_end(
+    game: BTD6Game, table: Optional[TranspositionTable] = None, max_seconds: float = 120.0, dt: float = 1.0 / 60.0
+):
+    """Play wave after wave until the game is won or lost (or a wave runs out of time)"""
+    while game.state == GameState.RUNNING:
+        start_wave = game.current_wave
+        run_wave(game, table, max_seconds=max_seconds, dt=dt)
+        if game.state == GameState.RUNNING and game.current_wave == start_wave:
+            break
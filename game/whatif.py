@@ -0,0 +1,173 @@
+"""
+Parallel what-if evaluation from a live game state
+
+evaluate_candidates() answers "which of these placements leaks the fewest
+lives over the rest of the wave?" from the game's current state. Workers are
+forked after the state is published in a module global, so they inherit it
+through copy-on-write memory instead of having it pickled to them, and each
+candidate is played out on a private copy. Outcomes that finish before the
+deadline are returned ranked; where fork is unavailable (Windows, macOS spawn
+default) candidates are played out sequentially in-process until the deadline.
+
+Forking a process that is running other threads can deadlock the child (it
+inherits locks held by threads that do not exist in it), and starting a pool
+costs tens of milliseconds. A multithreaded caller, like the real-game loop
+with its capture and perception threads, creates one pool with create_pool()
+before starting any thread and passes it to every call. The state is then
+pickled to the workers (under a millisecond for a mid-wave game). Without a
+pool, a multithreaded caller gets the sequential path.
+"""
+
+import copy
+import multiprocessing as mp
+import multiprocessing.pool
+import os
+import pickle
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from game.game import BTD6Game, GameState
+
+Candidate = Optional[Tuple[float, float]]  # Tower position, or None to place nothing
+
+# State inherited by forked workers
+_base_game: Optional[BTD6Game] = None
+_candidates: Sequence[Candidate] = ()
+_max_seconds = 120.0
+
+
+def play_candidate(
+    game: BTD6Game, candidate: Candidate, max_seconds: float = 120.0, deadline: Optional[float] = None
+) -> Optional[dict]:
+    """
+    Apply one candidate to a copy of game and play to the end of the wave.
+
+    Args:
+        deadline: time.monotonic() after which the play-out is abandoned
+                  (checked every simulated second)
+
+    Returns:
+        {"candidate", "legal", "lives_lost", "lives", "state"}, or None if
+        the deadline passed first
+    """
+    game = copy.deepcopy(game)
+    lives = game.lives
+    legal = candidate is None or game.place_tower(float(candidate[0]), float(candidate[1]))
+    if legal and deadline is None:
+        game.simulate(max_seconds=max_seconds, until_wave_end=True)
+    elif legal:
+        start_wave = game.current_wave
+        elapsed = 0.0
+        while game.state == GameState.RUNNING and game.current_wave == start_wave and elapsed < max_seconds:
+            elapsed += game.simulate(max_seconds=min(1.0, max_seconds - elapsed), until_wave_end=True)
+            if time.monotonic() >= deadline:
+                return None
+    return {
+        "candidate": candidate,
+        "legal": legal,
+        "lives_lost": lives - game.lives,
+        "lives": game.lives,
+        "state": game.state.name,
+    }
+
+
+def _play_index(index: int) -> Optional[dict]:
+    return play_candidate(_base_game, _candidates[index], _max_seconds)
+
+
+def _play_pickled(args) -> Optional[dict]:
+    state, candidate, max_seconds, deadline = args
+    # A job left over from an earlier call returns at once instead of
+    # holding a worker the current call is waiting for
+    if time.monotonic() >= deadline:
+        return None
+    return play_candidate(pickle.loads(state), candidate, max_seconds, deadline)
+
+
+def create_pool(workers: Optional[int] = None) -> Optional[mp.pool.Pool]:
+    """
+    Persistent forked workers for evaluate_candidates(pool=...).
+
+    Call before starting any thread. Returns None where fork is unavailable
+    (evaluate_candidates then plays candidates sequentially).
+    """
+    if "fork" not in mp.get_all_start_methods():
+        return None
+    return mp.get_context("fork").Pool(workers or os.cpu_count() or 1)
+
+
+def _collect(results, count: int, end: float) -> List[dict]:
+    """Outcomes from an imap_unordered iterator until count arrive or the deadline passes"""
+    outcomes = []
+    for _ in range(count):
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            outcome = results.next(timeout=remaining)
+        except mp.TimeoutError:
+            break
+        if outcome is not None:
+            outcomes.append(outcome)
+    return outcomes
+
+
+def _rank(outcomes: List[dict]) -> List[dict]:
+    """Legal first, then fewest lives lost; a won game beats a running one"""
+    return sorted(
+        outcomes,
+        key=lambda o: (not o["legal"], o["lives_lost"], o["state"] != GameState.WON.name),
+    )
+
+
+def evaluate_candidates(
+    game: BTD6Game,
+    candidates: Sequence[Candidate],
+    deadline: float = 1.0,
+    workers: Optional[int] = None,
+    max_seconds: float = 120.0,
+    pool: Optional[mp.pool.Pool] = None,
+) -> List[dict]:
+    """
+    Evaluate each candidate from game's current state, for at most deadline
+    seconds of wall time.
+
+    Args:
+        pool: Persistent workers from create_pool(). Each job carries the
+              deadline: a candidate still running or queued when it passes
+              is abandoned, so the next call finds the workers free.
+
+    Returns:
+        Outcomes of the candidates that finished in time, best first
+        (see play_candidate for the fields)
+    """
+    global _base_game, _candidates, _max_seconds
+    end = time.monotonic() + deadline
+    if pool is not None:
+        state = pickle.dumps(game)
+        results = pool.imap_unordered(_play_pickled, [(state, c, max_seconds, end) for c in candidates])
+        return _rank(_collect(results, len(candidates), end))
+
+    workers = min(workers or os.cpu_count() or 1, len(candidates))
+    outcomes = []
+
+    # Forking with other threads running could deadlock the workers
+    if workers <= 1 or "fork" not in mp.get_all_start_methods() or threading.active_count() > 1:
+        for candidate in candidates:
+            if time.monotonic() >= end:
+                break
+            outcome = play_candidate(game, candidate, max_seconds, end)
+            if outcome is not None:
+                outcomes.append(outcome)
+        return _rank(outcomes)
+
+    _base_game, _candidates, _max_seconds = game, list(candidates), max_seconds
+    pool = mp.get_context("fork").Pool(workers)
+    try:
+        outcomes = _collect(pool.imap_unordered(_play_index, range(len(_candidates))), len(_candidates), end)
+    finally:
+        # Unfinished candidates are abandoned, not waited for
+        pool.terminate()
+        _base_game, _candidates = None, ()
+    return _rank(outcomes)
@@ -0,0 +1,248 @@
+"""
+Single-pass multi-colour balloon classifier
+
+A 32x32x32 lookup table maps every 5-bit quantized BGR colour straight to a
+balloon class, so the whole frame is labelled in one table lookup instead of
+an HSV conversion plus two inRange passes per colour. Pixels at colour
+changes are dropped with one dilate/erode pair so touching blobs of different
+colours come apart; contours pick out the balloon-sized blobs, one
+connectedComponentsWithStats call over them gives the centroid, area and
+bounding box of each, and one bincount gives each blob the majority class of
+its pixels.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Label 0 is background; ZEBRA is never a pixel label, it is assigned to blobs
+# that mix black and white pixels
+BALLOON_CLASSES = ("background", "red", "blue", "green", "yellow", "pink", "black", "white", "ceramic", "zebra")
+CLASS_INDEX = {name: i for i, name in enumerate(BALLOON_CLASSES)}
+
+Rect = Tuple[int, int, int, int]  # x, y, width, height
+
+# Pixel classes that can be part of the same balloon: black and white make zebras
+_GROUPS = np.array([0, 1, 2, 3, 4, 5, 6, 6, 8, 6], dtype=np.uint8)
+
+
+def _hsv_rules(h: np.ndarray, s: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Balloon class of each HSV colour (OpenCV ranges: H 0-180, S and V 0-255)"""
+    labels = np.zeros(h.shape, dtype=np.uint8)
+    saturated = (s >= 100) & (v >= 100)
+    rules = [
+        # Pink is a light, less saturated red; checked first so it is not taken as red
+        ("pink", (h >= 140) & (h <= 175) & (s >= 60) & (s < 190) & (v >= 180)),
+        # The red range detect_balloons has always used
+        ("red", ((h <= 10) | (h >= 160)) & saturated),
+        ("ceramic", (h > 10) & (h < 20) & (s >= 100) & (v >= 60) & (v < 200)),
+        ("yellow", (h >= 20) & (h < 36) & (s >= 100) & (v >= 150)),
+        ("green", (h >= 36) & (h < 86) & (s >= 100) & (v >= 80)),
+        ("blue", (h >= 90) & (h < 131) & (s >= 100) & (v >= 80)),
+        ("black", v < 40),
+        ("white", (s < 30) & (v > 220)),
+    ]
+    for name, match in rules:
+        labels[(labels == 0) & match] = CLASS_INDEX[name]
+    return labels
+
+
+def build_color_lut(bits: int = 5) -> np.ndarray:
+    """
+    Class label of every quantized colour, indexed by (b << 2*bits) | (g << bits) | r
+    of the top `bits` bits of each channel.
+    """
+    levels = 1 << bits
+    q = np.arange(levels, dtype=np.uint16)
+    # Classify the centre colour of each quantization bin
+    centres = ((q << (8 - bits)) + (1 << (7 - bits))).astype(np.uint8)
+    b, g, r = np.meshgrid(centres, centres, centres, indexing="ij")
+    bgr = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3)
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).reshape(-1, 3)
+    return _hsv_rules(hsv[:, 0], hsv[:, 1], hsv[:, 2])
+
+
+_GROUP_LUT = np.zeros(256, dtype=np.uint8)
+_GROUP_LUT[: len(_GROUPS)] = _GROUPS
+_NEIGHBOURS = np.ones((3, 3), dtype=np.uint8)
+
+
+def split_groups(labels: np.ndarray) -> np.ndarray:
+    """
+    Balloon pixels whose 8 neighbours are background or in the same colour
+    group, as a boolean mask.
+
+    Dropping the pixels on either side of every colour change leaves no
+    connected pixels of different groups, so a balloon touching grass or a
+    differently coloured balloon stays a separate component.
+    """
+    groups = cv2.LUT(labels, _GROUP_LUT)
+    # Background is 0 in groups and wraps to 255 in lowered, so it never wins
+    # the largest or smallest group around a pixel
+    lowered = groups - np.uint8(1)
+    largest = cv2.dilate(groups, _NEIGHBOURS)
+    smallest = cv2.erode(lowered, _NEIGHBOURS)
+    return (largest == groups) & (smallest == lowered) & (groups > 0)
+
+
+class BalloonClassifier:
+    """
+    Label frames with a colour LUT and group the labels into balloons.
+
+    Args:
+        min_area, max_area: Blob size limits in pixels (noise, track and scenery)
+        min_fill: Minimum blob area / bounding box area (balloons are round)
+        bits: Bits kept per colour channel (LUT has 2**(3*bits) entries)
+    """
+
+    def __init__(self, min_area: int = 100, max_area: int = 5000, min_fill: float = 0.4, bits: int = 5):
+        self.min_area = min_area
+        self.max_area = max_area
+        self.min_fill = min_fill
+        self.bits = bits
+        self.lut = build_color_lut(bits)
+        # Index of a quantized pixel: (b << 2*bits) | (g << bits) | r
+        self._weights = np.array([[1 << 2 * bits, 1 << bits, 1]], dtype=np.float32)
+        self._buffers = None
+
+    def _buffers_for(self, shape):
+        # Flat buffers sized for the largest image so far, reshaped per call:
+        # window crops and full frames alternate without reallocating
+        size = shape[0] * shape[1]
+        if self._buffers is None or self._buffers[2].size < size:
+            self._buffers = (
+                np.empty(size * 3, dtype=np.uint16),
+                np.empty(size, dtype=np.uint16),
+                np.empty(size, dtype=np.uint8),
+                np.empty(size, dtype=bool),
+            )
+        quantized, index, labels, mask = self._buffers
+        return (
+            quantized[: size * 3].reshape(shape + (3,)),
+            index[:size].reshape(shape),
+            labels[:size].reshape(shape),
+            mask[:size].reshape(shape),
+        )
+
+    def _label_into(self, screen: np.ndarray, quantized, index, labels):
+        np.right_shift(screen, 8 - self.bits, out=quantized, casting="unsafe")
+        if index.flags.c_contiguous:
+            cv2.transform(quantized, self._weights, dst=index)
+        else:
+            index[...] = cv2.transform(quantized, self._weights)
+        np.take(self.lut, index, out=labels)
+
+    def label(self, screen: np.ndarray, rects: Optional[Sequence[Rect]] = None) -> np.ndarray:
+        """
+        Per-pixel class labels (indices into BALLOON_CLASSES) of a BGR frame.
+        The result is reused by the next call.
+
+        Args:
+            rects: Only label these (x, y, width, height) regions (e.g.
+                   TrackROI.rects); everything else is background
+        """
+        quantized, index, labels, _ = self._buffers_for(screen.shape[:2])
+        if rects is None:
+            self._label_into(screen, quantized, index, labels)
+            return labels
+        labels.fill(0)
+        for x, y, w, h in rects:
+            window = (slice(y, y + h), slice(x, x + w))
+            self._label_into(screen[window], quantized[window], index[window], labels[window])
+        return labels
+
+    def detect(
+        self,
+        screen: np.ndarray,
+        labels: Optional[np.ndarray] = None,
+        rects: Optional[Sequence[Rect]] = None,
+        edge_pixels: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> List[dict]:
+        """
+        Detect balloons of every colour.
+
+        Args:
+            labels: Precomputed label() output for this frame
+            rects: Only look inside these (x, y, width, height) regions
+            edge_pixels: (rows, cols) of the region edge; blobs touching it
+                         are cut off by the region and are dropped
+
+        Returns:
+            List of {"x", "y", "type", "area"} with the blob centroid in pixels
+        """
+        if labels is None:
+            labels = self.label(screen, rects)
+        if rects is None:
+            mask = split_groups(labels)
+        else:
+            mask = self._buffers_for(labels.shape)[3]
+            mask.fill(0)
+            for x, y, w, h in rects:
+                # One pixel of margin: neighbours are read from the full
+                # frame, so blobs spanning two rectangles split as without rects
+                top, left = max(y - 1, 0), max(x - 1, 0)
+                split = split_groups(labels[top : y + h + 1, left : x + w + 1])
+                mask[y : y + h, x : x + w] = split[y - top : y - top + h, x - left : x - left + w]
+
+        # Grass and scenery are huge blobs; labelling them with stats costs
+        # more than everything else. Contours are cheap, so keep only the
+        # blobs whose bounding box could hold a balloon. The top level of
+        # RETR_CCOMP is the outer boundary of every blob, including a balloon
+        # on grass, which sits in a hole of the grass blob
+        contours, hierarchy = cv2.findContours(mask.view(np.uint8), cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return []
+        outer = [contour for contour, parent in zip(contours, hierarchy[0, :, 3]) if parent < 0]
+        candidates = [
+            (contour, box) for contour, box in zip(outer, map(cv2.boundingRect, outer)) if self._could_be_balloon(*box[2:])
+        ]
+        if not candidates:
+            return []
+        boxes = np.array([box for _, box in candidates])
+        x0, y0 = boxes[:, :2].min(axis=0)
+        x1, y1 = (boxes[:, :2] + boxes[:, 2:]).max(axis=0)
+        blobs = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        for contour, _ in candidates:
+            # One at a time: a single call fills nested contours even-odd
+            cv2.drawContours(blobs, [contour], 0, 1, cv2.FILLED, offset=(-int(x0), -int(y0)))
+        blobs &= mask[y0:y1, x0:x1]
+
+        # One labelling pass over the candidates' bounding box (BBDT gives the
+        # same components as the default algorithm, faster on sparse masks)
+        n, components, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+            blobs, 8, cv2.CV_16U, cv2.CCL_BBDT
+        )
+
+        # Pixel count of every class in every component, in one bincount
+        pixels = np.flatnonzero(blobs.view(bool))
+        classes = len(BALLOON_CLASSES)
+        counts = np.bincount(
+            components.ravel()[pixels].astype(np.intp) * classes + labels[y0:y1, x0:x1].ravel()[pixels],
+            minlength=n * classes,
+        ).reshape(n, classes)
+        kinds = counts.argmax(axis=1)
+        zebras = np.minimum(counts[:, CLASS_INDEX["black"]], counts[:, CLASS_INDEX["white"]])
+        kinds[zebras >= 0.2 * stats[:, cv2.CC_STAT_AREA]] = CLASS_INDEX["zebra"]
+
+        width, height, area = (stats[:, k] for k in (cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT, cv2.CC_STAT_AREA))
+        keep = (area >= self.min_area) & (area <= self.max_area) & (area >= self.min_fill * width * height)
+        keep[0] = False
+        if edge_pixels is not None and len(edge_pixels[0]):
+            rows, cols = edge_pixels
+            inside = (rows >= y0) & (rows < y1) & (cols >= x0) & (cols < x1)
+            keep[components[rows[inside] - y0, cols[inside] - x0]] = False
+
+        return [
+            {
+                "x": int(round(centroids[i][0] + x0)),
+                "y": int(round(centroids[i][1] + y0)),
+                "type": BALLOON_CLASSES[kinds[i]],
+                "area": int(area[i]),
+            }
+            for i in np.flatnonzero(keep)
+        ]
+
+    def _could_be_balloon(self, width: int, height: int) -> bool:
+        """Whether a blob with this bounding box can pass the size and fill limits"""
+        return width * height >= self.min_area and self.min_fill * width * height <= self.max_area
@@ -3,46 +3,91 @@ BTD6 Game Integration Layer
 Captures screen and controls the real BTD6 game
 """
 
-import pyautogui
 import cv2
 import numpy as np
-from PIL import ImageGrab
 import time
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List, Sequence
+
+from integration.balloon_classifier import BalloonClassifier
+from integration.capture import CaptureBackend, create_capture
+from integration.frame import Screen, as_frame
+from integration.hud import FIELDS, HUDReader, Region, find_hud_regions
+from integration.skeleton import simplify_path, thin, trace_path
+from integration.track_cache import TrackCache, TrackGeometry, placement_mask
+from integration.track_roi import TrackROI, bounding_rect, clip_windows, overlapping_groups, windows_region
+
+
+_pyautogui_module = None
+
+
+def _pyautogui():
+    """
+    Import and configure pyautogui on first use. It needs a display and is slow
+    to import, so perception-only code (e.g. analysing saved screenshots) never
+    loads it.
+    """
+    global _pyautogui_module
+    if _pyautogui_module is None:
+        import pyautogui
+
+        pyautogui.PAUSE = 0.01  # Small pause between actions
+        pyautogui.FAILSAFE = True  # Move mouse to corner to abort
+        _pyautogui_module = pyautogui
+    return _pyautogui_module
 
 
 class BTD6Integration:
     """Integration with real BTD6 game"""
 
-    def __init__(self, game_window_region: Optional[Tuple[int, int, int, int]] = None):
+    def __init__(
+        self,
+        game_window_region: Optional[Tuple[int, int, int, int]] = None,
+        capture_backend="auto",
+        track_cache: Optional[TrackCache] = None,
+        detection_scale: float = 1.0,
+    ):
         """
         Initialize BTD6 integration
 
         Args:
             game_window_region: (x, y, width, height) of game window.
                                If None, will try to auto-detect
+            capture_backend: "auto", "xshm", "pil" or a CaptureBackend instance
+                             (see integration/capture.py)
+            track_cache: Map geometry cache (default: TrackCache() in cache/tracks)
+            detection_scale: Pyramid level the balloon, start button and track
+                             detectors search (default 1.0: full resolution; 0.5
+                             is faster on 1080p captures). Balloon and button
+                             candidates are refined at full resolution.
         """
         self.game_region = game_window_region
-        pyautogui.PAUSE = 0.01  # Small pause between actions
-        pyautogui.FAILSAFE = True  # Move mouse to corner to abort
+        self.capture_backend = capture_backend
+        self.capture: Optional[CaptureBackend] = capture_backend if isinstance(capture_backend, CaptureBackend) else None
+        self.balloon_classifier: Optional[BalloonClassifier] = None  # Built on first detection
+        self.track_roi: Optional[TrackROI] = None  # Set by calibrate_track_roi
+        self.track_cache = track_cache if track_cache is not None else TrackCache()
+        self.track_geometry: Optional[TrackGeometry] = None  # Set by load_track_geometry
+        self.detection_scale = detection_scale
+        self.hud: Optional[HUDReader] = None  # Created by locate_hud
+        self._coarse = {}  # Classifier and ROI for the detection scale, built on first use
 
     def capture_screen(self) -> np.ndarray:
         """
         Capture game screen
 
         Returns:
-            numpy array of screen (BGR format)
+            numpy array of screen (BGR format). The array is reused by the next
+            capture; copy it to keep a frame.
         """
-        if self.game_region:
-            screenshot = ImageGrab.grab(bbox=self.game_region)
-        else:
-            screenshot = ImageGrab.grab()
-
-        # Convert PIL Image to numpy array
-        img = np.array(screenshot)
-        # Convert RGB to BGR for OpenCV
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        return img
+        if self.capture is None or (
+            not isinstance(self.capture_backend, CaptureBackend) and self.capture.region != self.game_region
+        ):
+            # (Re)open the backend for the current game region
+            if self.capture is not None:
+                self.capture.close()
+            self.capture = create_capture(self.game_region, self.capture_backend)
+            self.game_region = self.game_region or self.capture.region
+        return self.capture.grab()
 
     def click_at_position(self, x: int, y: int):
         """
@@ -56,7 +101,7 @@ class BTD6Integration:
             x += self.game_region[0]
             y += self.game_region[1]
 
-        pyautogui.click(x, y)
+        _pyautogui().click(x, y)
 
     def place_tower(self, tower_type: str, x: int, y: int):
         """
@@ -68,9 +113,9 @@ class BTD6Integration:
         """
         # Open tower menu (for Dart Monkey, press 'Z' or click icon)
         if tower_type == "dart_monkey":
-            pyautogui.press('z')
+            _pyautogui().press('z')
         else:
-            pyautogui.press('z')
+            _pyautogui().press('z')
         time.sleep(0.1)
 
         # Click position to place
@@ -79,7 +124,7 @@ class BTD6Integration:
 
     def start_round(self):
         """Start the next round (fallback to space)"""
-        pyautogui.press('space')
+        _pyautogui().press('space')
 
     def start_round_auto(self, screen: Optional[np.ndarray] = None) -> bool:
         """
@@ -100,43 +145,70 @@ class BTD6Integration:
         self.start_round()
         return False
 
-    def detect_start_round_button(self, screen: np.ndarray) -> Optional[Tuple[int, int]]:
+    def detect_start_round_button(self, screen: Screen) -> Optional[Tuple[int, int]]:
         """
         Detect the green Start Round button.
 
+        Searched at detection_scale; the chosen region is then re-measured at
+        full resolution inside its (slightly enlarged) box.
+
+        Args:
+            screen: Screen capture (BGR) or its FrameContext
+
         Returns:
             (x, y) position of the button center relative to the game region, or None.
         """
-        hsv = cv2.cvtColor(screen, cv2.COLOR_BGR2HSV)
-
+        frame = as_frame(screen)
+        scale = min(self.detection_scale, 1.0)
+        best = self._find_start_button(frame.hsv(scale), min_area=200 * scale * scale, area_scale=1 / (scale * scale))
+        if best is None:
+            return None
+        if scale == 1.0:
+            return best[0]
+
+        # Refine: same detector on the full-resolution box around the candidate
+        _, (x, y, cw, ch) = best
+        pad = int(np.ceil(2 / scale)) + 2
+        height, width = frame.shape[:2]
+        x0, y0 = max(int(x / scale) - pad, 0), max(int(y / scale) - pad, 0)
+        x1 = min(int(np.ceil((x + cw) / scale)) + pad, width)
+        y1 = min(int(np.ceil((y + ch) / scale)) + pad, height)
+        refined = self._find_start_button(frame.hsv(1.0, (x0, y0, x1 - x0, y1 - y0)), min_area=200, area_scale=1.0)
+        if refined is None:
+            return int((x + cw / 2) / scale), int((y + ch / 2) / scale)
+        cx, cy = refined[0]
+        return x0 + cx, y0 + cy
+
+    def _find_start_button(self, hsv: np.ndarray, min_area: float, area_scale: float):
+        """Best green region of an HSV image: ((cx, cy), bounding box) or None"""
         # Green button range (tuned for typical BTD6 start button)
         lower_green = np.array([40, 80, 80])
         upper_green = np.array([85, 255, 255])
 
         mask = cv2.inRange(hsv, lower_green, upper_green)
-        mask = cv2.medianBlur(mask, 5)
+        mask = cv2.medianBlur(mask, 5 if area_scale <= 1.0 else 3)
 
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         if not contours:
             return None
 
         # Choose largest green region near bottom-right
-        h, w = screen.shape[:2]
+        h, w = hsv.shape[:2]
         best = None
         best_score = -1
         for cnt in contours:
             area = cv2.contourArea(cnt)
-            if area < 200:
+            if area < min_area:
                 continue
             x, y, cw, ch = cv2.boundingRect(cnt)
             cx = x + cw // 2
             cy = y + ch // 2
 
-            # Score: larger area + closer to bottom-right
-            score = area + (cx / w) * 1000 + (cy / h) * 1000
+            # Score: larger area (in full-resolution pixels) + closer to bottom-right
+            score = area * area_scale + (cx / w) * 1000 + (cy / h) * 1000
             if score > best_score:
                 best_score = score
-                best = (cx, cy)
+                best = ((cx, cy), (x, y, cw, ch))
 
         return best
 
@@ -145,6 +217,8 @@ class BTD6Integration:
         Detect (or assume) the game window region. For MVP we capture the full primary screen
         and set that as the game region. Returns (x, y, width, height).
         """
+        from PIL import ImageGrab
+
         # Capture full screen via PIL
         screenshot = ImageGrab.grab()
         width, height = screenshot.size
@@ -169,9 +243,9 @@ class BTD6Integration:
 
             # Press tower hotkey (MVP: dart monkey -> 'z')
             if tower_type == "dart_monkey":
-                pyautogui.press("z")
+                _pyautogui().press("z")
             else:
-                pyautogui.press("z")
+                _pyautogui().press("z")
 
             # Wait for tower selection menu to appear (0.2s delay as specified)
             time.sleep(0.2)
@@ -187,21 +261,46 @@ class BTD6Integration:
             self.click_at_position(abs_x, abs_y)
             time.sleep(0.15)
 
-    def detect_track_path(self, screen: np.ndarray) -> List[Tuple[int, int]]:
+    def detect_track_path(self, screen: Screen, epsilon: float = 2.0) -> List[Tuple[int, int]]:
         """
         Detect track path from screenshot and return ordered polyline.
 
+        The track is masked, thinned and traced at detection_scale (thinning
+        time grows with the track width in pixels) and the polyline is scaled
+        back to full-resolution coordinates.
+
+        Args:
+            screen: Screen capture (BGR) or its FrameContext
+            epsilon: Maximum distance in pixels between the polyline and the
+                     traced centreline (Douglas-Peucker tolerance)
+
         Returns:
             List of (x, y) points along the path.
         """
-        mask = self._get_track_mask(screen)
+        frame = as_frame(screen)
+        scale = min(self.detection_scale, 1.0)
+        mask = self._get_track_mask(frame, scale)
         skeleton = self._skeletonize(mask)
-        path = self._trace_skeleton_path(skeleton)
-        return path
-
-    def _get_track_mask(self, screen: np.ndarray) -> np.ndarray:
+        # At least 1.5 coarse pixels, or the one-pixel staircase of a slanted
+        # line at the coarse level survives simplification as extra points
+        path = self._trace_skeleton_path(skeleton, epsilon if scale == 1.0 else max(epsilon * scale, 1.5))
+        if scale == 1.0:
+            return path
+        # Map the coarse pixel grid onto the full one corner to corner, so a
+        # path that leaves the screen still ends on the frame border
+        height, width = frame.shape[:2]
+        coarse_height, coarse_width = skeleton.shape[:2]
+        sx = (width - 1) / max(coarse_width - 1, 1)
+        sy = (height - 1) / max(coarse_height - 1, 1)
+        return [(int(round(x * sx)), int(round(y * sy))) for x, y in path]
+
+    def _get_track_mask(self, screen: Screen, scale: float = 1.0) -> np.ndarray:
+        """Mask of the track on a pyramid level, computed once per frame (see integration/frame.py)."""
+        frame = as_frame(screen)
+        return frame.mask(("track", min(scale, 1.0)), lambda: self._track_mask_from_hsv(frame.hsv(scale)))
+
+    def _track_mask_from_hsv(self, hsv: np.ndarray) -> np.ndarray:
         """Create a mask for the track based on color heuristics."""
-        hsv = cv2.cvtColor(screen, cv2.COLOR_BGR2HSV)
 
         # Brown-ish path
         lower_brown = np.array([10, 40, 50])
@@ -223,135 +322,228 @@ class BTD6Integration:
         return mask
 
     def _skeletonize(self, mask: np.ndarray) -> np.ndarray:
-        """Skeletonize a binary mask using morphological thinning."""
-        skel = np.zeros(mask.shape, np.uint8)
-        element = cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
-        temp_mask = mask.copy()
-
-        while True:
-            eroded = cv2.erode(temp_mask, element)
-            temp = cv2.dilate(eroded, element)
-            temp = cv2.subtract(temp_mask, temp)
-            skel = cv2.bitwise_or(skel, temp)
-            temp_mask = eroded.copy()
-
-            if cv2.countNonZero(temp_mask) == 0:
-                break
-
-        return skel
-
-    def _trace_skeleton_path(self, skeleton: np.ndarray) -> List[Tuple[int, int]]:
-        """Trace an ordered path through skeleton pixels."""
-        coords = np.column_stack(np.where(skeleton > 0))
-        if coords.size == 0:
-            return []
-
-        # Build a set for quick lookup
-        points = {(int(x), int(y)) for y, x in coords}
-
-        # Find endpoints (pixels with 1 neighbor)
-        endpoints = []
-        for (px, py) in points:
-            neighbors = 0
-            for dx in (-1, 0, 1):
-                for dy in (-1, 0, 1):
-                    if dx == 0 and dy == 0:
-                        continue
-                    if (px + dx, py + dy) in points:
-                        neighbors += 1
-            if neighbors == 1:
-                endpoints.append((px, py))
-
-        # Fallback: choose extreme points
-        if len(endpoints) < 2:
-            pts_list = list(points)
-            pts_list.sort(key=lambda p: (p[0], p[1]))
-            endpoints = [pts_list[0], pts_list[-1]]
-
-        start = endpoints[0]
-        visited = set()
-        path = []
-        current = start
-
-        while current is not None:
-            path.append(current)
-            visited.add(current)
-            next_point = None
-
-            for dx in (-1, 0, 1):
-                for dy in (-1, 0, 1):
-                    if dx == 0 and dy == 0:
-                        continue
-                    candidate = (current[0] + dx, current[1] + dy)
-                    if candidate in points and candidate not in visited:
-                        next_point = candidate
-                        break
-                if next_point is not None:
-                    break
-
-            current = next_point
-
-        # Downsample path for usability
-        if len(path) > 0:
-            path = path[::10]
-
-        # Convert back to (x, y)
-        return [(p[0], p[1]) for p in path]
-
-    def detect_balloons(self, screen: np.ndarray) -> list:
-        """
-        Detect balloons from screen capture using computer vision
+        """Thin a binary mask to a one-pixel-wide skeleton (see integration/skeleton.py)."""
+        return thin(mask) * 255
+
+    def _trace_skeleton_path(self, skeleton: np.ndarray, epsilon: float = 2.0) -> List[Tuple[int, int]]:
+        """Trace the longest route through skeleton pixels, simplified with Douglas-Peucker."""
+        return simplify_path(trace_path(skeleton), epsilon)
+
+    def load_track_geometry(self, screen: Screen) -> TrackGeometry:
+        """
+        Track polyline, track and placement masks and HUD layout of the map on
+        screen, extracted once per map and resolution.
+
+        Looked up in the track cache by perceptual hash first; on a miss the
+        geometry is detected from this frame and stored, so later sessions on
+        the same map start instantly.
 
         Args:
-            screen: Screen capture as numpy array
+            screen: Screen capture (BGR) or its FrameContext, ideally without overlays
 
         Returns:
-            List of detected balloon positions and types
+            The TrackGeometry, also kept as self.track_geometry
+        """
+        frame = as_frame(screen)
+        geometry = self.track_cache.lookup(frame.frame, frame.perceptual_hash())
+        if geometry is None:
+            mask = self._get_track_mask(frame)
+            geometry = TrackGeometry(
+                resolution=(frame.shape[1], frame.shape[0]),
+                frame_hash=frame.perceptual_hash(),
+                path=self.detect_track_path(frame),
+                track_mask=mask,
+                placement_mask=placement_mask(mask),
+                hud=find_hud_regions(frame.frame),
+            )
+            self.track_cache.store(geometry)
+        self.track_geometry = geometry
+        return geometry
+
+    def calibrate_track_roi(
+        self,
+        screen: Screen,
+        use_path: bool = False,
+        margin: int = 24,
+        tile: int = 32,
+    ) -> TrackROI:
         """
-        # TODO: Implement balloon detection using color segmentation
-        # For MVP, this is a placeholder
-        balloons = []
+        Restrict balloon detection to the track (plus a margin) from now on.
 
-        # RED balloon detection (simple color threshold)
-        hsv = cv2.cvtColor(screen, cv2.COLOR_BGR2HSV)
+        Call once per map, on a frame without overlays. Uses the loaded track
+        geometry when there is one for this resolution. The ROI is reset when
+        the capture region changes size.
 
-        # Define red color range
-        lower_red1 = np.array([0, 100, 100])
-        upper_red1 = np.array([10, 255, 255])
-        lower_red2 = np.array([160, 100, 100])
-        upper_red2 = np.array([180, 255, 255])
+        Args:
+            screen: Screen capture (BGR) or its FrameContext
+            use_path: Build the ROI around detect_track_path's polyline instead
+                      of the raw track colour mask
+            margin: Pixels kept around the track
+            tile: Grid size of the ROI rectangles
 
-        mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        mask = mask1 + mask2
+        Returns:
+            The TrackROI; its stats() reports the fraction of pixels skipped
+        """
+        geometry = self.track_geometry
+        if geometry is not None and geometry.resolution != (screen.shape[1], screen.shape[0]):
+            geometry = None
+        if use_path:
+            path = geometry.path if geometry is not None else self.detect_track_path(screen)
+            self.track_roi = TrackROI.from_path(path, screen.shape, margin=margin, tile=tile)
+        else:
+            mask = geometry.track_mask if geometry is not None else self._get_track_mask(screen)
+            self.track_roi = TrackROI(mask, margin=margin, tile=tile)
+        return self.track_roi
+
+    def detect_balloons(
+        self,
+        screen: Screen,
+        windows: Optional[List[Tuple[int, int, int, int]]] = None,
+    ) -> list:
+        """
+        Detect balloons of every colour from a screen capture
 
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        Candidates are found at detection_scale (only on the track once
+        calibrate_track_roi has been called) and re-detected at full
+        resolution in a window around each one, so positions, colours and
+        areas are full-resolution measurements.
 
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 100:  # Filter small noise
-                M = cv2.moments(contour)
-                if M["m00"] != 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    balloons.append({"x": cx, "y": cy, "type": "red"})
+        Args:
+            screen: Screen capture (BGR) or its FrameContext
+            windows: Only search these (x, y, width, height) regions at full
+                     resolution instead (the refinement step of a coarse
+                     detection uses this)
 
-        return balloons
+        Returns:
+            List of {"x", "y", "type", "area"}: blob centroid, balloon colour
+            ("red", "blue", ..., "zebra") and size in pixels
+        """
+        frame = as_frame(screen)
+        screen = frame.frame
+        if self.balloon_classifier is None:
+            self.balloon_classifier = BalloonClassifier()
+        if windows is not None:
+            # Overlapping windows are searched together: their bounding box is
+            # labelled in one pass and everything outside the windows cleared,
+            # so contours, components and the colour vote run once per group
+            # instead of once per window. Blobs cut by the edge of a group's
+            # union are dropped
+            balloons = []
+            for group in overlapping_groups(clip_windows(windows, screen.shape)):
+                bx, by, bw, bh = bounds = bounding_rect(group)
+                crop = screen[by : by + bh, bx : bx + bw]
+                inside, edge_pixels = windows_region(group, bounds, screen.shape)
+                labels = self.balloon_classifier.label(crop)
+                labels *= inside
+                for balloon in self.balloon_classifier.detect(crop, labels=labels, edge_pixels=edge_pixels):
+                    balloon["x"] += bx
+                    balloon["y"] += by
+                    balloons.append(balloon)
+            return balloons
+        if self.track_roi is not None and self.track_roi.shape != screen.shape[:2]:
+            self.track_roi = None
+
+        scale = min(self.detection_scale, 1.0)
+        if scale == 1.0:
+            if self.track_roi is None:
+                return self.balloon_classifier.detect(screen)
+            return self.balloon_classifier.detect(
+                screen, rects=self.track_roi.rects, edge_pixels=self.track_roi.edge_pixels
+            )
+
+        classifier, roi = self._coarse_detectors(scale)
+        coarse = frame.level(scale, cv2.INTER_NEAREST)  # Unblended colours, see integration/pyramid.py
+        if roi is None:
+            candidates = classifier.detect(coarse)
+        else:
+            candidates = classifier.detect(coarse, rects=roi.rects, edge_pixels=roi.edge_pixels)
+        # Refine: a window at full resolution around each candidate, large
+        # enough for the balloon plus the rounding of the coarse level
+        windows = []
+        for c in candidates:
+            radius = int(np.sqrt(c["area"] / np.pi) / scale + 2 / scale) + 4
+            cx, cy = int((c["x"] + 0.5) / scale), int((c["y"] + 0.5) / scale)
+            windows.append((cx - radius, cy - radius, 2 * radius, 2 * radius))
+        return self.detect_balloons(frame, windows)
+
+    def _coarse_detectors(self, scale: float):
+        """Classifier (size limits scaled) and track ROI for the coarse level"""
+        # Keyed on the ROI object itself (kept alive here), not its id, which a
+        # recalibrated ROI can reuse
+        if self._coarse.get("scale") != scale or self._coarse.get("track_roi") is not self.track_roi:
+            full = self.balloon_classifier
+            classifier = BalloonClassifier(
+                min_area=full.min_area * scale * scale,
+                max_area=full.max_area * scale * scale,
+                min_fill=full.min_fill,
+                bits=full.bits,
+            )
+            roi = None
+            if self.track_roi is not None:
+                height, width = self.track_roi.shape
+                size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+                mask = cv2.resize(self.track_roi.mask, size, interpolation=cv2.INTER_NEAREST)
+                roi = TrackROI(mask, margin=1, tile=max(8, int(self.track_roi.tile * scale)))
+            self._coarse = {"scale": scale, "track_roi": self.track_roi, "classifier": classifier, "roi": roi}
+        return self._coarse["classifier"], self._coarse["roi"]
+
+    def locate_hud(self, screen: Screen) -> Dict[str, Region]:
+        """
+        Lives, cash and round regions of the HUD.
 
-    def detect_lives(self, screen: np.ndarray) -> int:
+        Taken from the loaded track geometry when it has them for this
+        resolution; otherwise found on this frame and stored with the geometry.
+
+        Returns:
+            Field name -> (x, y, width, height)
+        """
+        screen = as_frame(screen).frame
+        if self.hud is None:
+            self.hud = HUDReader()
+        geometry = self.track_geometry
+        if geometry is not None and geometry.resolution != (screen.shape[1], screen.shape[0]):
+            geometry = None
+        if geometry is not None and geometry.hud:
+            self.hud.regions = dict(geometry.hud)
+        else:
+            regions = self.hud.locate(screen)
+            if geometry is not None and regions:
+                geometry.hud = dict(regions)
+                self.track_cache.store(geometry)
+        return self.hud.regions
+
+    def read_hud(self, screen: Screen, fields: Sequence[str] = FIELDS) -> Dict[str, Optional[int]]:
+        """
+        Read HUD numbers (see integration/hud.py). Regions whose pixels did
+        not change since the last call are not read again.
+
+        Returns:
+            Field name ("lives", "cash", "round") -> value, None if never read
+        """
+        screen = as_frame(screen).frame
+        if self.hud is None or not self.hud.regions:
+            self.locate_hud(screen)
+        return self.hud.read(screen, fields)
+
+    def detect_lives(self, screen: Screen) -> Optional[int]:
         """
-        Detect remaining lives from screen (OCR or template matching)
+        Detect remaining lives from screen (template-matched HUD digits)
 
         Args:
             screen: Screen capture
 
         Returns:
-            Number of lives remaining
+            Number of lives remaining, or None if the HUD could not be read
         """
-        # TODO: Implement OCR for lives display
-        # For MVP, return placeholder
-        return 100
+        return self.read_hud(screen, ("lives",))["lives"]
+
+    def detect_cash(self, screen: Screen) -> Optional[int]:
+        """Cash shown on the HUD, or None if it could not be read"""
+        return self.read_hud(screen, ("cash",))["cash"]
+
+    def detect_round(self, screen: Screen) -> Optional[int]:
+        """Current round number shown on the HUD, or None if it could not be read"""
+        return self.read_hud(screen, ("round",))["round"]
 
     def is_game_over(self, screen: np.ndarray) -> bool:
         """
@@ -0,0 +1,346 @@
+"""
+Screen capture backends
+
+Every backend grabs only the game region (x, y, width, height) into one
+preallocated BGR buffer that is reused for every frame, so steady-state
+capture does no full-frame allocations in our code, and records how long each
+grab took:
+- XShmCapture: X11 MIT-SHM. The X server copies the region straight into a
+  shared memory segment, converted in place into the BGR buffer (Linux/X11,
+  needs only libX11/libXext through ctypes).
+- PILCapture: PIL.ImageGrab (Windows, macOS, X11 without MIT-SHM).
+- ReplayCapture: frames from saved screenshots or recordings, for offline runs.
+
+create_capture() picks XShm when it works and falls back to PIL otherwise.
+The array returned by grab() is overwritten by the next grab; copy it to keep it.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import sys
+import time
+from collections import deque
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Region = Tuple[int, int, int, int]  # x, y, width, height
+
+
+class CaptureBackend:
+    """Base class: buffer management and latency statistics"""
+
+    name = "base"
+
+    def __init__(self, region: Optional[Region] = None, history: int = 1000):
+        self.region = region
+        self.buffer: Optional[np.ndarray] = None
+        self.frames = 0
+        self.latencies = deque(maxlen=history)
+
+    def _buffer(self, height: int, width: int) -> np.ndarray:
+        if self.buffer is None or self.buffer.shape[:2] != (height, width):
+            self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        return self.buffer
+
+    def grab(self) -> np.ndarray:
+        """Capture one frame into the shared buffer and return it (BGR)"""
+        start = time.perf_counter()
+        frame = self._grab()
+        self.latencies.append(time.perf_counter() - start)
+        self.frames += 1
+        return frame
+
+    def _grab(self) -> np.ndarray:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Capture latency over the recent history, in milliseconds"""
+        if not self.latencies:
+            return {"backend": self.name, "frames": self.frames}
+        latencies = np.array(self.latencies) * 1000
+        return {
+            "backend": self.name,
+            "frames": self.frames,
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "max_ms": float(latencies.max()),
+        }
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PILCapture(CaptureBackend):
+    """PIL.ImageGrab, converted into the BGR buffer with one cvtColor call"""
+
+    name = "pil"
+
+    def __init__(self, region: Optional[Region] = None, history: int = 1000):
+        super().__init__(region, history)
+        from PIL import ImageGrab
+
+        self._image_grab = ImageGrab
+
+    def _grab(self) -> np.ndarray:
+        if self.region:
+            x, y, width, height = self.region
+            # PIL takes a (left, top, right, bottom) box
+            image = self._image_grab.grab(bbox=(x, y, x + width, y + height))
+        else:
+            image = self._image_grab.grab()
+
+        rgb = np.asarray(image)
+        buffer = self._buffer(rgb.shape[0], rgb.shape[1])
+        if rgb.shape[2] == 4:
+            cv2.cvtColor(rgb, cv2.COLOR_RGBA2BGR, dst=buffer)
+        else:
+            cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=buffer)
+        return buffer
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage; only these are read or written
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+_ZPIXMAP = 2
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+_ALL_PLANES = 0xFFFFFFFF
+
+
+class XShmCapture(CaptureBackend):
+    """X11 MIT-SHM capture of the region into a shared memory segment"""
+
+    name = "xshm"
+
+    def __init__(self, region: Optional[Region] = None, display: Optional[str] = None, history: int = 1000):
+        super().__init__(region, history)
+        x11_path = ctypes.util.find_library("X11")
+        xext_path = ctypes.util.find_library("Xext")
+        if not x11_path or not xext_path:
+            raise OSError("libX11/libXext not found")
+
+        self._x11 = x11 = ctypes.CDLL(x11_path)
+        self._xext = xext = ctypes.CDLL(xext_path)
+        self._libc = libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_void_p,
+            ctypes.POINTER(_XShmSegmentInfo),
+            ctypes.c_uint,
+            ctypes.c_uint,
+        ]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_ulong,
+            ctypes.POINTER(_XImage),
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_ulong,
+        ]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        self._display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {display or os.environ.get('DISPLAY')!r}")
+        self._image = None
+        self._info = _XShmSegmentInfo(shmid=-1)
+        self._attached = False
+        self._removed = False
+        try:
+            self._setup()
+        except Exception:
+            self.close()
+            raise
+
+    def _setup(self):
+        x11, xext, libc = self._x11, self._xext, self._libc
+        if not xext.XShmQueryExtension(self._display):
+            raise OSError("X server has no MIT-SHM extension")
+
+        screen = x11.XDefaultScreen(self._display)
+        self._root = x11.XDefaultRootWindow(self._display)
+        screen_width = x11.XDisplayWidth(self._display, screen)
+        screen_height = x11.XDisplayHeight(self._display, screen)
+        if self.region is None:
+            self.region = (0, 0, screen_width, screen_height)
+        x, y, width, height = self.region
+        # XShmGetImage fails with BadMatch outside the root window
+        if width <= 0 or height <= 0 or x < 0 or y < 0 or x + width > screen_width or y + height > screen_height:
+            raise ValueError(f"Region {self.region} is not inside the {screen_width}x{screen_height} screen")
+
+        self._image = xext.XShmCreateImage(
+            self._display,
+            x11.XDefaultVisual(self._display, screen),
+            x11.XDefaultDepth(self._display, screen),
+            _ZPIXMAP,
+            None,
+            ctypes.byref(self._info),
+            width,
+            height,
+        )
+        if not self._image:
+            raise OSError("XShmCreateImage failed")
+        image = self._image.contents
+        if image.bits_per_pixel != 32:
+            raise OSError(f"Unsupported {image.bits_per_pixel} bits per pixel")
+
+        size = image.bytes_per_line * height
+        self._info.shmid = libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if self._info.shmid < 0:
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        address = libc.shmat(self._info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        self._info.shmaddr = address
+        self._info.readOnly = 0
+        image.data = address
+
+        if not xext.XShmAttach(self._display, ctypes.byref(self._info)):
+            raise OSError("XShmAttach failed")
+        x11.XSync(self._display, 0)
+        self._attached = True
+        # Removed once both we and the X server have detached
+        libc.shmctl(self._info.shmid, _IPC_RMID, None)
+        self._removed = True
+
+        # BGRX pixels of the shared segment, viewed without copying
+        raw = (ctypes.c_ubyte * size).from_address(address)
+        self._pixels = np.ctypeslib.as_array(raw).reshape(height, image.bytes_per_line // 4, 4)[:, :width]
+        self._buffer(height, width)
+
+    def _grab(self) -> np.ndarray:
+        x, y = self.region[:2]
+        if not self._xext.XShmGetImage(self._display, self._root, self._image, x, y, _ALL_PLANES):
+            raise OSError("XShmGetImage failed")
+        cv2.cvtColor(self._pixels, cv2.COLOR_BGRA2BGR, dst=self.buffer)
+        return self.buffer
+
+    def close(self):
+        if self._display is None:
+            return
+        if self._attached:
+            self._xext.XShmDetach(self._display, ctypes.byref(self._info))
+            self._x11.XSync(self._display, 0)
+            self._attached = False
+        if self._info.shmaddr:
+            self._pixels = None
+            self._libc.shmdt(self._info.shmaddr)
+            self._info.shmaddr = None
+        if self._info.shmid >= 0 and not self._removed:
+            # _setup failed between shmget and XShmAttach
+            self._libc.shmctl(self._info.shmid, _IPC_RMID, None)
+            self._removed = True
+        if self._image:
+            # The pixel data lives in the (now detached) segment, not in Xlib's heap
+            self._image.contents.data = None
+            self._x11.XFree(self._image)
+            self._image = None
+        self._x11.XCloseDisplay(self._display)
+        self._display = None
+
+
+class ReplayCapture(CaptureBackend):
+    """Frames from a sequence of images (arrays or file paths), looping"""
+
+    name = "replay"
+
+    def __init__(self, frames: Sequence, region: Optional[Region] = None, history: int = 1000):
+        super().__init__(region, history)
+        self.sources = list(frames)
+        if not self.sources:
+            raise ValueError("ReplayCapture needs at least one frame")
+        self.index = 0
+
+    def _grab(self) -> np.ndarray:
+        source = self.sources[self.index % len(self.sources)]
+        self.index += 1
+        frame = cv2.imread(source) if isinstance(source, str) else source
+        if self.region:
+            x, y, width, height = self.region
+            frame = frame[y : y + height, x : x + width]
+        buffer = self._buffer(frame.shape[0], frame.shape[1])
+        np.copyto(buffer, frame[:, :, :3])
+        return buffer
+
+
+def create_capture(region: Optional[Region] = None, backend: str = "auto") -> CaptureBackend:
+    """
+    Create a capture backend for region.
+
+    Args:
+        region: (x, y, width, height) in screen pixels, or None for the whole screen
+        backend: "xshm", "pil" or "auto" (XShm on Linux/X11 when available, else PIL)
+    """
+    if backend == "xshm":
+        return XShmCapture(region)
+    if backend == "pil":
+        return PILCapture(region)
+    if backend != "auto":
+        raise ValueError(f"Unknown capture backend {backend!r}")
+
+    if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        try:
+            return XShmCapture(region)
+        except OSError:
+            pass
+    return PILCapture(region)
@@ -0,0 +1,87 @@
+"""
+Per-frame cache of derived images
+
+Several detectors start from the same conversions of a frame: the start
+button and the track mask both need HSV, the track geometry needs the track
+mask and the perceptual hash, every coarse detector needs the same pyramid
+level. FrameContext wraps one frame and computes each of these on first use,
+then keeps it for the frame's lifetime, so one frame costs one conversion per
+level however many detectors run on it.
+
+Detectors in BTD6Integration accept a FrameContext (or an ImagePyramid, or
+the raw array, which they wrap themselves). Build one per captured frame and
+pass it to every detector.
+"""
+
+from typing import Callable, Dict, Hashable, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from integration.pyramid import ImagePyramid
+from integration.track_cache import perceptual_hash
+
+Screen = Union[np.ndarray, ImagePyramid]
+
+
+class FrameContext(ImagePyramid):
+    """
+    One frame, its pyramid levels and everything derived from them, built lazily.
+
+    Args:
+        frame: Full-resolution BGR frame
+    """
+
+    def __init__(self, frame: np.ndarray):
+        super().__init__(frame)
+        self._hsv: Dict[float, np.ndarray] = {}
+        self._masks: Dict[Hashable, np.ndarray] = {}
+        self._hash: Optional[str] = None
+
+    def hsv(self, scale: float = 1.0, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        HSV of a pyramid level (INTER_AREA).
+
+        Args:
+            region: Only this (x, y, width, height) of the level. Cut from the
+                    whole level's HSV if that was already needed, otherwise
+                    converted on its own and not kept.
+        """
+        scale = min(scale, 1.0)
+        if region is not None and scale not in self._hsv:
+            x, y, w, h = region
+            return cv2.cvtColor(self.level(scale)[y : y + h, x : x + w], cv2.COLOR_BGR2HSV)
+        if scale not in self._hsv:
+            self._hsv[scale] = cv2.cvtColor(self.level(scale), cv2.COLOR_BGR2HSV)
+        if region is None:
+            return self._hsv[scale]
+        x, y, w, h = region
+        return self._hsv[scale][y : y + h, x : x + w]
+
+    def mask(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        A mask computed once per frame, e.g. mask(("track", 0.5), lambda: ...).
+
+        Detectors name their own masks; the same key always means the same mask.
+        """
+        if key not in self._masks:
+            self._masks[key] = compute()
+        return self._masks[key]
+
+    def perceptual_hash(self) -> str:
+        """Difference hash of the frame (see integration/track_cache.py)"""
+        if self._hash is None:
+            self._hash = perceptual_hash(self.frame)
+        return self._hash
+
+
+def as_frame(screen: Screen) -> FrameContext:
+    """Wrap a frame, or pass an existing context through so its cache is shared"""
+    if isinstance(screen, FrameContext):
+        return screen
+    if isinstance(screen, ImagePyramid):
+        # Keep the levels it already built
+        frame = FrameContext(screen.frame)
+        frame._levels = screen._levels
+        return frame
+    return FrameContext(screen)
@@ -0,0 +1,304 @@
+"""
+HUD reader for the real game: lives, cash and round number
+
+The HUD never moves within a map, so its regions are located once (white text
+in the top band of the screen: lives and cash on the left, the round on the
+right) and kept with the map geometry (TrackGeometry.hud). Digits are read by
+template matching: each glyph (a connected component of the white text mask)
+is normalised to GLYPH_SIZE x GLYPH_SIZE and correlated with every template of
+a glyph set in one matrix product.
+
+The glyph set is cached under cache_dir. Until it has been taught the game's
+font (GlyphSet.learn on a frame with known values, e.g. the start of a game),
+templates rendered with an OpenCV font are used.
+
+A region whose pixels hash the same as on the last read is not read again, so
+reading the HUD every frame costs a few hashes while the numbers are steady.
+"""
+
+import os
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+cache_dir = os.path.join("cache", "glyphs")
+
+GLYPH_SIZE = 24  # Templates are GLYPH_SIZE x GLYPH_SIZE
+CHARACTERS = "0123456789/$"
+FIELDS = ("lives", "cash", "round")
+
+Region = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def text_mask(image: np.ndarray) -> np.ndarray:
+    """HUD text pixels (white fill; the dark outline separates the glyphs)"""
+    return cv2.inRange(image, (200, 200, 200), (255, 255, 255))
+
+
+def segment_glyphs(mask: np.ndarray, min_height: int = 6) -> List[np.ndarray]:
+    """
+    Split a text mask into glyphs, left to right.
+
+    Components much shorter than the tallest one (commas, dots, noise) are dropped.
+
+    Returns:
+        Normalised glyphs (see normalise_glyph)
+    """
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if n <= 1:
+        return []
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    tallest = heights.max()
+    keep = [i for i in range(1, n) if stats[i, cv2.CC_STAT_HEIGHT] >= max(min_height, 0.5 * tallest)]
+    keep.sort(key=lambda i: stats[i, cv2.CC_STAT_LEFT])
+    glyphs = []
+    for i in keep:
+        x, y, w, h = stats[i, :4]
+        glyphs.append(normalise_glyph(labels[y : y + h, x : x + w] == i))
+    return glyphs
+
+
+def normalise_glyph(glyph: np.ndarray) -> np.ndarray:
+    """
+    Scale a glyph to GLYPH_SIZE pixels high, keeping its aspect ratio (a "1"
+    stays narrow), centre it in a GLYPH_SIZE square and make the result zero
+    mean and unit length, so a dot product is the normalised correlation.
+    """
+    h, w = glyph.shape
+    width = int(np.clip(round(w * GLYPH_SIZE / h), 1, GLYPH_SIZE))
+    scaled = cv2.resize(glyph.astype(np.float32), (width, GLYPH_SIZE), interpolation=cv2.INTER_AREA)
+    canvas = np.zeros((GLYPH_SIZE, GLYPH_SIZE), np.float32)
+    left = (GLYPH_SIZE - width) // 2
+    canvas[:, left : left + width] = scaled
+    canvas -= canvas.mean()
+    norm = np.linalg.norm(canvas)
+    return canvas / norm if norm > 0 else canvas
+
+
+class GlyphSet:
+    """
+    One template per character.
+
+    Args:
+        templates: Character -> normalised glyph (see normalise_glyph)
+        min_score: Lowest correlation accepted as a match
+    """
+
+    def __init__(self, templates: Optional[Dict[str, np.ndarray]] = None, min_score: float = 0.6):
+        self.templates = dict(templates or {})
+        self.min_score = min_score
+        self._characters: List[str] = []
+        self._matrix: Optional[np.ndarray] = None  # (characters, GLYPH_SIZE ** 2), rebuilt on change
+
+    @classmethod
+    def render(
+        cls,
+        characters: str = CHARACTERS,
+        font: int = cv2.FONT_HERSHEY_SIMPLEX,
+        scale: float = 1.0,
+        thickness: int = 2,
+    ) -> "GlyphSet":
+        """Templates drawn with an OpenCV font (the fallback before learning)"""
+        templates = {}
+        for character in characters:
+            (w, h), baseline = cv2.getTextSize(character, font, scale, thickness)
+            canvas = np.zeros((h + baseline + 8, w + 8), np.uint8)
+            cv2.putText(canvas, character, (4, h + 4), font, scale, 255, thickness)
+            glyphs = segment_glyphs(canvas)
+            if len(glyphs) == 1:
+                templates[character] = glyphs[0]
+        return cls(templates)
+
+    @classmethod
+    def default(cls, path: Optional[str] = None) -> "GlyphSet":
+        """The glyph set cached at path (default under cache_dir), or rendered templates"""
+        path = path or os.path.join(cache_dir, "hud.npz")
+        if os.path.exists(path):
+            try:
+                return cls.load(path)
+            except (OSError, ValueError, KeyError):
+                pass
+        return cls.render()
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        characters = sorted(self.templates)
+        np.savez_compressed(
+            tmp_path,
+            characters=np.array(characters),
+            templates=np.stack([self.templates[c] for c in characters]),
+            min_score=np.array(self.min_score),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "GlyphSet":
+        with np.load(path) as data:
+            templates = {str(c): t for c, t in zip(data["characters"], data["templates"])}
+            return cls(templates, min_score=float(data["min_score"]))
+
+    def learn(self, mask: np.ndarray, text: str) -> bool:
+        """
+        Take templates from a text mask showing a known string.
+
+        Returns:
+            False (and nothing learnt) if the glyph count does not match the text
+        """
+        text = text.replace(" ", "")
+        glyphs = segment_glyphs(mask)
+        if len(glyphs) != len(text):
+            return False
+        for character, glyph in zip(text, glyphs):
+            self.templates[character] = glyph
+        self._matrix = None
+        return True
+
+    def read(self, mask: np.ndarray) -> Optional[str]:
+        """
+        Text in a text mask, or None if a glyph matches no template.
+        """
+        glyphs = segment_glyphs(mask)
+        if not glyphs or not self.templates:
+            return None
+        if self._matrix is None:
+            self._characters = sorted(self.templates)
+            self._matrix = np.stack([self.templates[c].ravel() for c in self._characters])
+        scores = np.stack([g.ravel() for g in glyphs]) @ self._matrix.T
+        best = scores.argmax(axis=1)
+        if scores[np.arange(len(glyphs)), best].min() < self.min_score:
+            return None
+        return "".join(self._characters[i] for i in best)
+
+
+def parse_field(name: str, text: Optional[str]) -> Optional[int]:
+    """Number shown in a HUD field ("$650" -> 650, round "12/40" -> 12)"""
+    if not text:
+        return None
+    if name == "round":
+        text = text.split("/")[0]
+    digits = "".join(c for c in text if c.isdigit())
+    return int(digits) if digits else None
+
+
+def find_hud_regions(screen: np.ndarray, band: float = 0.12, padding: int = 4) -> Dict[str, Region]:
+    """
+    Locate the HUD numbers: blocks of white text in the top band of the
+    screen. The first two blocks on the left are lives and cash, the
+    rightmost block on the right is the round.
+
+    Regions extend to the right (numbers grow as digits are added) up to the
+    next block.
+
+    Returns:
+        Field name -> (x, y, width, height); fields not found are missing
+    """
+    height, width = screen.shape[:2]
+    top = text_mask(screen[: max(1, int(height * band))])
+    # Join the glyphs of a word, not neighbouring words
+    gap = max(3, int(width * 0.008))
+    words = cv2.dilate(top, np.ones((1, gap), np.uint8))
+    n, _, stats, _ = cv2.connectedComponentsWithStats(words, connectivity=8)
+    blocks = sorted(
+        (tuple(int(v) for v in stats[i, :4]) for i in range(1, n) if stats[i, cv2.CC_STAT_HEIGHT] >= 8),
+        key=lambda b: b[0],
+    )
+    if not blocks:
+        return {}
+
+    def region(index: int) -> Region:
+        x, y, w, h = blocks[index]
+        # The dilation widened the block by gap // 2 on each side
+        x, w = x + gap // 2, w - 2 * (gap // 2)
+        limit = blocks[index + 1][0] + gap // 2 - 1 if index + 1 < len(blocks) else width
+        right = min(x + w + 2 * h, limit)
+        x0, y0 = max(x - padding, 0), max(y - padding, 0)
+        return x0, y0, right - x0, min(y + h + padding, top.shape[0]) - y0
+
+    left = [i for i, b in enumerate(blocks) if b[0] + b[2] / 2 < width / 2]
+    right = [i for i, b in enumerate(blocks) if b[0] + b[2] / 2 >= width / 2]
+    regions = {}
+    for name, index in zip(("lives", "cash"), left):
+        regions[name] = region(index)
+    if right:
+        regions["round"] = region(right[-1])
+    return regions
+
+
+class HUDReader:
+    """
+    Read lives, cash and round from frames.
+
+    Args:
+        glyphs: Glyph set (default: GlyphSet.default())
+        regions: Field name -> (x, y, width, height); see locate()
+    """
+
+    def __init__(self, glyphs: Optional[GlyphSet] = None, regions: Optional[Dict[str, Region]] = None):
+        self.glyphs = glyphs if glyphs is not None else GlyphSet.default()
+        self.regions: Dict[str, Region] = dict(regions or {})
+        self.values: Dict[str, Optional[int]] = {}  # Last successful reading per field
+        self._hashes: Dict[str, int] = {}
+        self.counts = {"ocr": 0, "skipped": 0, "failed": 0}
+
+    def locate(self, screen: np.ndarray) -> Dict[str, Region]:
+        """Find the HUD regions on this frame (see find_hud_regions)"""
+        self.regions = find_hud_regions(screen)
+        self._hashes = {}
+        return self.regions
+
+    def _crop(self, screen: np.ndarray, name: str) -> Optional[np.ndarray]:
+        region = self.regions.get(name)
+        if region is None:
+            return None
+        x, y, w, h = region
+        return screen[y : y + h, x : x + w]
+
+    def read(self, screen: np.ndarray, fields: Sequence[str] = FIELDS) -> Dict[str, Optional[int]]:
+        """
+        Current values; a field keeps its last reading while its pixels are
+        unchanged or unreadable.
+
+        Returns:
+            Field name -> value, None if never read
+        """
+        for name in fields:
+            crop = self._crop(screen, name)
+            if crop is None:
+                continue
+            digest = zlib.crc32(np.ascontiguousarray(crop))
+            if self._hashes.get(name) == digest:
+                self.counts["skipped"] += 1
+                continue
+            self._hashes[name] = digest
+            self.counts["ocr"] += 1
+            value = parse_field(name, self.glyphs.read(text_mask(crop)))
+            if value is None:
+                self.counts["failed"] += 1
+            else:
+                self.values[name] = value
+        return {name: self.values.get(name) for name in fields}
+
+    def learn(self, screen: np.ndarray, known: Dict[str, str], path: Optional[str] = None) -> List[str]:
+        """
+        Teach the glyph set the game's font from a frame whose HUD text is
+        known (e.g. {"lives": "150", "cash": "$650", "round": "1/40"} at the
+        start of a game on medium), and cache it.
+
+        Args:
+            path: Where the glyph set is saved (default under cache_dir)
+
+        Returns:
+            Fields learnt from
+        """
+        learnt = []
+        for name, text in known.items():
+            crop = self._crop(screen, name)
+            if crop is not None and self.glyphs.learn(text_mask(crop), text):
+                learnt.append(name)
+        if learnt:
+            self.glyphs.save(path or os.path.join(cache_dir, "hud.npz"))
+        self._hashes = {}  # Re-read with the new templates
+        return learnt
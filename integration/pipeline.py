@@ -0,0 +1,248 @@
+"""
+Threaded capture -> perceive -> act pipeline for the real-game loop
+
+Running capture, detection, inference and mouse/keyboard input one after the
+other makes reaction time the sum of every stage. Pipeline runs them as three
+threads instead:
+- capture: grabs frames into a small ring of preallocated buffers
+- perceive: always takes the freshest unread frame, skipping stale ones, and
+  turns it into an action (or None)
+- act: executes actions without holding up perception; if a new action is
+  decided while one is still pending, the older one is dropped
+
+Each stage has an optional rate limit, and stats() reports throughput,
+dropped frames/actions and capture-to-action latency.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+
+class RateLimiter:
+    """Sleep so that calls to wait() happen at most hz times per second"""
+
+    def __init__(self, hz: Optional[float] = None):
+        self.period = 1.0 / hz if hz else 0.0
+        self.next_time = 0.0
+
+    def wait(self, stop: Optional[threading.Event] = None):
+        if not self.period:
+            return
+        now = time.perf_counter()
+        if self.next_time > now:
+            if stop is not None:
+                stop.wait(self.next_time - now)
+            else:
+                time.sleep(self.next_time - now)
+            now = time.perf_counter()
+        # Never bank time: a slow iteration does not cause a burst afterwards
+        self.next_time = max(self.next_time + self.period, now)
+
+
+class FrameRing:
+    """
+    Fixed ring of preallocated frame buffers shared by one writer (capture)
+    and one reader (perception).
+
+    The reader checks out the newest frame and the writer never overwrites a
+    checked-out slot, so frames are never copied on read. A frame that is
+    overwritten before anyone read it counts as dropped.
+    """
+
+    def __init__(self, size: int = 3):
+        if size < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+        self.size = size
+        self.frames = [None] * size
+        self.frame_ids = [-1] * size
+        self.timestamps = [0.0] * size
+        self.unread = [False] * size
+        self.busy = -1
+        self.next_id = 0
+        self.dropped = 0
+        self._newest = -1
+        self._cond = threading.Condition()
+
+    def put(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copy a frame into the oldest free slot; returns its frame id"""
+        with self._cond:
+            slot = min(
+                (i for i in range(self.size) if i != self.busy),
+                key=lambda i: self.frame_ids[i],
+            )
+            if self.unread[slot]:
+                self.dropped += 1
+            # Copied under the lock so a reader never checks out a half-written slot
+            if self.frames[slot] is None or self.frames[slot].shape != frame.shape:
+                self.frames[slot] = np.empty_like(frame)
+            np.copyto(self.frames[slot], frame)
+            frame_id = self.next_id
+            self.next_id += 1
+            self.frame_ids[slot] = frame_id
+            self.timestamps[slot] = time.perf_counter() if timestamp is None else timestamp
+            self.unread[slot] = True
+            self._newest = slot
+            self._cond.notify_all()
+            return frame_id
+
+    def acquire_latest(self, timeout: Optional[float] = None) -> Optional[Tuple[int, int, float, np.ndarray]]:
+        """
+        Check out the newest unread frame, waiting up to timeout for one.
+
+        Returns:
+            (slot, frame_id, timestamp, frame) or None on timeout. Older unread
+            frames are counted as dropped. Call release(slot) when done.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._newest >= 0 and self.unread[self._newest], timeout):
+                return None
+            slot = self._newest
+            for i in range(self.size):
+                if i != slot and self.unread[i]:
+                    self.unread[i] = False
+                    self.dropped += 1
+            self.unread[slot] = False
+            self.busy = slot
+            return slot, self.frame_ids[slot], self.timestamps[slot], self.frames[slot]
+
+    def release(self, slot: int):
+        with self._cond:
+            if self.busy == slot:
+                self.busy = -1
+
+
+class Pipeline:
+    """
+    Run capture, perception and action in separate threads.
+
+    Args:
+        capture: Callable returning a BGR frame (e.g. BTD6Integration.capture_screen)
+        perceive: Callable (frame, frame_id, timestamp) -> action or None. The
+                  frame is only valid during the call.
+        act: Callable (action) -> None, e.g. mouse/keyboard input
+        capture_hz, perceive_hz, act_hz: Stage rate limits (None: as fast as possible)
+        ring_size: Number of frame buffers
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], np.ndarray],
+        perceive: Callable[[np.ndarray, int, float], Any],
+        act: Callable[[Any], None],
+        capture_hz: Optional[float] = 30.0,
+        perceive_hz: Optional[float] = None,
+        act_hz: Optional[float] = 10.0,
+        ring_size: int = 3,
+    ):
+        self.capture = capture
+        self.perceive = perceive
+        self.act = act
+        self.rates = {"capture": capture_hz, "perceive": perceive_hz, "act": act_hz}
+        self.ring = FrameRing(ring_size)
+
+        self.counts = {"captured": 0, "perceived": 0, "decided": 0, "acted": 0, "dropped_actions": 0}
+        self.latencies = deque(maxlen=1000)  # Frame capture -> action executed, seconds
+        self.error: Optional[BaseException] = None
+
+        self._stop = threading.Event()
+        self._action_cond = threading.Condition()
+        self._pending: Optional[Tuple[Any, float]] = None
+        self._threads = []
+        self._start_time = 0.0
+
+    def start(self) -> "Pipeline":
+        self._stop.clear()
+        self._start_time = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._run, args=(stage,), name=f"pipeline-{stage}", daemon=True)
+            for stage in ("capture", "perceive", "act")
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        with self._action_cond:
+            self._action_cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set() and any(t.is_alive() for t in self._threads)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self, stage: str):
+        limiter = RateLimiter(self.rates[stage])
+        step = getattr(self, f"_{stage}_step")
+        try:
+            while not self._stop.is_set():
+                limiter.wait(self._stop)
+                if self._stop.is_set():
+                    break
+                step()
+        except BaseException as e:
+            # A failing stage stops the whole pipeline; the caller sees self.error
+            self.error = e
+            self._stop.set()
+            with self._action_cond:
+                self._action_cond.notify_all()
+
+    def _capture_step(self):
+        frame = self.capture()
+        self.ring.put(frame)
+        self.counts["captured"] += 1
+
+    def _perceive_step(self):
+        checked_out = self.ring.acquire_latest(timeout=0.1)
+        if checked_out is None:
+            return
+        slot, frame_id, timestamp, frame = checked_out
+        try:
+            action = self.perceive(frame, frame_id, timestamp)
+        finally:
+            self.ring.release(slot)
+        self.counts["perceived"] += 1
+        if action is None:
+            return
+
+        self.counts["decided"] += 1
+        with self._action_cond:
+            if self._pending is not None:
+                self.counts["dropped_actions"] += 1
+            self._pending = (action, timestamp)
+            self._action_cond.notify_all()
+
+    def _act_step(self):
+        with self._action_cond:
+            self._action_cond.wait_for(lambda: self._pending is not None or self._stop.is_set(), 0.1)
+            if self._pending is None:
+                return
+            action, timestamp = self._pending
+            self._pending = None
+        self.act(action)
+        self.counts["acted"] += 1
+        self.latencies.append(time.perf_counter() - timestamp)
+
+    def stats(self) -> dict:
+        elapsed = max(time.perf_counter() - self._start_time, 1e-9)
+        result = dict(self.counts)
+        result["dropped_frames"] = self.ring.dropped
+        result["capture_fps"] = self.counts["captured"] / elapsed
+        result["perceive_fps"] = self.counts["perceived"] / elapsed
+        if self.latencies:
+            latencies = np.array(self.latencies) * 1000
+            result["latency_mean_ms"] = float(latencies.mean())
+            result["latency_p95_ms"] = float(np.percentile(latencies, 95))
+        return result
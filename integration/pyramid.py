@@ -0,0 +1,52 @@
+"""
+Image pyramid for coarse-to-fine detection
+
+Balloons, the start button and the track are tens of pixels across, so finding
+them does not need every pixel of a 1080p frame. ImagePyramid wraps one frame
+and builds downscaled levels on demand, each at most once per frame. Detectors
+search a coarse level and only go back to full resolution inside the candidate
+boxes.
+
+Levels are INTER_AREA by default, so thin features average instead of
+aliasing. Colour classification asks for INTER_NEAREST levels instead: every
+sampled pixel is a real screen colour, where averaging would turn a zebra's
+black and white stripes (or any balloon's rim against the grass) into a colour
+that is on no balloon.
+"""
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+
+class ImagePyramid:
+    """
+    Downscaled levels of one frame, built lazily and kept for the frame's lifetime.
+
+    Args:
+        frame: Full-resolution BGR frame (level 1.0)
+    """
+
+    def __init__(self, frame: np.ndarray):
+        self.frame = frame
+        self._levels: Dict[Tuple[float, int], np.ndarray] = {}
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.frame.shape
+
+    def size_at(self, scale: float) -> Tuple[int, int]:
+        """(width, height) of a level"""
+        height, width = self.frame.shape[:2]
+        return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+    def level(self, scale: float, interpolation: int = cv2.INTER_AREA) -> np.ndarray:
+        """The frame downscaled by `scale` (1.0 is the frame itself)"""
+        if scale >= 1.0:
+            return self.frame
+        key = (scale, interpolation)
+        if key not in self._levels:
+            self._levels[key] = cv2.resize(self.frame, self.size_at(scale), interpolation=interpolation)
+        return self._levels[key]
+
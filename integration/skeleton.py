@@ -0,0 +1,359 @@
+"""
+Track skeleton extraction and tracing
+
+Turns a binary track mask into an ordered, simplified polyline:
+1. thin(): Zhang-Suen thinning, vectorized. Each sub-iteration computes every
+   pixel's 8-neighbour code with one filter2D and looks up "delete?" in a
+   256-entry table, instead of an erode/dilate/subtract loop. A last pass of
+   the same kind removes staircase corners, leaving a strictly 8-thin line
+2. SkeletonGraph: endpoints (1 neighbour) and junctions (3+) found with a
+   neighbour-count convolution become nodes; the chains of pixels between
+   them become edges
+3. trace_path(): the longest shortest path between two endpoints is the track;
+   short spurs and side branches left by thinning are dropped
+4. Douglas-Peucker (cv2.approxPolyDP) keeps only the points needed to stay
+   within `epsilon` pixels of the traced centreline
+"""
+
+import heapq
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+# filter2D weights giving bit i to neighbour P(i+2) of Zhang-Suen's numbering:
+# P9 P2 P3
+# P8 P1 P4
+# P7 P6 P5
+_CODE_KERNEL = np.array([[128, 1, 2], [64, 0, 4], [32, 16, 8]], dtype=np.float32)
+_COUNT_KERNEL = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=np.float32)
+
+# 4-neighbours first, so tracing walks through staircase corners instead of cutting them
+_STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def _walk(pixels: set, current: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Follow a chain of (x, y) pixels from `current`, consuming the set"""
+    ordered = []
+    while current is not None:
+        ordered.append(current)
+        pixels.discard(current)
+        x, y = current
+        current = next(((x + dx, y + dy) for dx, dy in _STEPS if (x + dx, y + dy) in pixels), None)
+    return ordered
+
+
+def _zhang_suen_luts() -> Tuple[np.ndarray, np.ndarray]:
+    """255 where a pixel with this neighbour code is deleted, per sub-iteration"""
+    first = np.zeros(256, dtype=np.uint8)
+    second = np.zeros(256, dtype=np.uint8)
+    for code in range(256):
+        p = [(code >> i) & 1 for i in range(8)]  # P2..P9
+        neighbours = sum(p)
+        transitions = sum(p[i] == 0 and p[(i + 1) % 8] == 1 for i in range(8))
+        if not (2 <= neighbours <= 6 and transitions == 1):
+            continue
+        p2, p3, p4, p5, p6, p7, p8, p9 = p
+        if p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0:
+            first[code] = 255
+        if p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0:
+            second[code] = 255
+    return first, second
+
+
+_DELETE_LUTS = _zhang_suen_luts()
+
+
+def _staircase_lut() -> np.ndarray:
+    """
+    255 where a pixel is a redundant staircase corner: it has two 4-neighbours
+    at a right angle (e.g. N and E, which touch diagonally) and its neighbours
+    stay one 8-connected group without it. Zhang-Suen leaves these on noisy
+    diagonals, where they would look like junctions (3 neighbours).
+    """
+    lut = np.zeros(256, dtype=np.uint8)
+    for code in range(256):
+        p = [(code >> i) & 1 for i in range(8)]  # P2..P9, clockwise from N
+        on = [i for i in range(8) if p[i]]
+        if len(on) < 2:
+            continue
+        # Ring neighbours touch their ring neighbours; edge neighbours (N, E,
+        # S, W at even indices) also touch the next edge neighbour diagonally
+        parent = {i: i for i in on}
+
+        def find(i):
+            while parent[i] != i:
+                i = parent[i]
+            return i
+
+        for i in on:
+            for j in ((i + 1) % 8, (i + 2) % 8 if i % 2 == 0 else None):
+                if j is not None and p[j]:
+                    parent[find(i)] = find(j)
+        if len({find(i) for i in on}) != 1:
+            continue
+        if any(p[i] and p[(i + 2) % 8] for i in (0, 2, 4, 6)):
+            lut[code] = 255
+    return lut
+
+
+_STAIRCASE_LUT = _staircase_lut()
+
+
+def thin(mask: np.ndarray, max_iterations: int = 1000) -> np.ndarray:
+    """
+    One-pixel-wide 8-connected skeleton of a binary mask (Zhang-Suen).
+
+    Only the bounding box of the mask is processed. Where the mask touches the
+    image border it is extended past it first, so lines leaving the screen
+    thin all the way to the edge instead of stopping half a width short.
+
+    Returns:
+        uint8 array of the mask's shape, 1 on the skeleton
+    """
+    height, width = mask.shape[:2]
+    skeleton = np.zeros((height, width), dtype=np.uint8)
+    binary = (mask > 0).astype(np.uint8)
+    points = cv2.findNonZero(binary)
+    if points is None:
+        return skeleton
+    x, y, w, h = cv2.boundingRect(points)
+    crop = binary[y : y + h, x : x + w]
+
+    top, bottom, left, right = 0, 0, 0, 0
+    if x == 0 or y == 0 or x + w == width or y + h == height:
+        # Half the thickest part of the mask is as far as thinning can pull an end in
+        reach = int(np.ceil(cv2.distanceTransform(crop, cv2.DIST_L2, 3).max())) + 1
+        top, bottom = reach * (y == 0), reach * (y + h == height)
+        left, right = reach * (x == 0), reach * (x + w == width)
+    image = cv2.copyMakeBorder(crop, top, bottom, left, right, cv2.BORDER_REPLICATE)
+    # One pixel of background around everything, so borders see zero neighbours
+    image = cv2.copyMakeBorder(image, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+
+    # Neighbour codes are distinct bits summing to at most 255, so uint8 is exact
+    code = np.empty(image.shape, dtype=np.uint8)
+    delete = np.empty(image.shape, dtype=np.uint8)
+    for _ in range(max_iterations):
+        changed = False
+        for lut in _DELETE_LUTS:
+            cv2.filter2D(image, cv2.CV_8U, _CODE_KERNEL, dst=code, borderType=cv2.BORDER_CONSTANT)
+            cv2.LUT(code, lut, dst=delete)
+            cv2.bitwise_and(delete, image, dst=delete)
+            if cv2.countNonZero(delete):
+                changed = True
+                cv2.subtract(image, delete, dst=image)
+        if not changed:
+            break
+
+    # Remove staircase corners one checkerboard colour at a time, so two
+    # touching corners are never both removed
+    parity = (np.indices(image.shape).sum(axis=0) % 2).astype(np.uint8)
+    for colour in (0, 1):
+        cv2.filter2D(image, cv2.CV_8U, _CODE_KERNEL, dst=code, borderType=cv2.BORDER_CONSTANT)
+        cv2.LUT(code, _STAIRCASE_LUT, dst=delete)
+        delete &= image & (parity == colour)
+        cv2.subtract(image, delete, dst=image)
+
+    skeleton[y : y + h, x : x + w] = image[1 + top : 1 + top + h, 1 + left : 1 + left + w]
+    return skeleton
+
+
+def neighbour_counts(skeleton: np.ndarray) -> np.ndarray:
+    """Number of 8-neighbours of every skeleton pixel (0 off the skeleton)"""
+    binary = (skeleton > 0).astype(np.uint8)
+    counts = cv2.filter2D(binary, -1, _COUNT_KERNEL, borderType=cv2.BORDER_CONSTANT)
+    return counts * binary
+
+
+class SkeletonGraph:
+    """
+    Skeleton as a graph: nodes are endpoint/junction pixel clusters, edges are
+    the pixel chains between them.
+
+    Attributes:
+        node_labels: int32 image, node id + 1 on node pixels
+        branch_labels: int32 image, branch id + 1 on chain pixels
+        node_centres: (x, y) of each node
+        endpoints: Ids of nodes that are line ends
+        edges: (node_a, node_b, branch_id, length in pixels)
+    """
+
+    def __init__(self, skeleton: np.ndarray):
+        binary = (skeleton > 0).astype(np.uint8)
+        counts = neighbour_counts(binary)
+        endpoint = counts == 1
+        nodes = binary.astype(bool) & ((counts == 1) | (counts >= 3))
+
+        n_nodes, node_labels, _, centroids = cv2.connectedComponentsWithStats(nodes.view(np.uint8), connectivity=8)
+        chains = (binary.astype(bool) & ~nodes).view(np.uint8)
+        _, branch_labels, branch_stats, _ = cv2.connectedComponentsWithStats(chains, connectivity=8)
+
+        self.node_labels = node_labels
+        self.branch_labels = branch_labels
+        self.node_centres = [(float(cx), float(cy)) for cx, cy in centroids[1:]]
+        self.endpoints = sorted(set((node_labels[endpoint] - 1).tolist()))
+
+        # Which nodes each branch touches: compare every chain pixel with its 8 shifted neighbours
+        height, width = binary.shape
+        padded_nodes = np.zeros((height + 2, width + 2), dtype=np.int32)
+        padded_nodes[1:-1, 1:-1] = node_labels
+        ys, xs = np.nonzero(branch_labels)
+        branch_of_pixel = branch_labels[ys, xs]
+        touches = set()
+        for dy, dx in _STEPS:
+            neighbour = padded_nodes[ys + 1 + dy, xs + 1 + dx]
+            hit = neighbour > 0
+            touches.update(zip((branch_of_pixel[hit] - 1).tolist(), (neighbour[hit] - 1).tolist()))
+        # Chain pixels grouped by branch, for branch_pixels()
+        order = np.argsort(branch_of_pixel, kind="stable")
+        splits = np.cumsum(np.bincount(branch_of_pixel, minlength=branch_stats.shape[0]))[:-1]
+        self._branch_xy = np.split(np.stack([xs[order], ys[order]], axis=1), splits)[1:]
+
+        touched: Dict[int, List[int]] = {}
+        for branch, node in sorted(touches):
+            touched.setdefault(branch, []).append(node)
+
+        self.edges: List[Tuple[int, int, int, float]] = []
+        for branch, ends in touched.items():
+            length = float(branch_stats[branch + 1, cv2.CC_STAT_AREA])
+            # A chain normally joins two nodes; one that touches more (pixels
+            # next to a junction cluster twice) is linked to all of them
+            for i in range(len(ends)):
+                for j in range(i + 1, len(ends)):
+                    self.edges.append((ends[i], ends[j], branch, length))
+
+        self.n_nodes = n_nodes - 1  # Label 0 is background
+        self._adjacency = None
+
+    def adjacency(self) -> Dict[int, List[Tuple[int, int, float]]]:
+        """node -> [(neighbour, branch_id, length)]"""
+        if self._adjacency is None:
+            self._adjacency = {i: [] for i in range(self.n_nodes)}
+            for a, b, branch, length in self.edges:
+                self._adjacency[a].append((b, branch, length))
+                self._adjacency[b].append((a, branch, length))
+        return self._adjacency
+
+    def main_component(self) -> List[int]:
+        """Nodes of the connected piece with the most skeleton length (the track, not scenery specks)"""
+        parent = list(range(self.n_nodes))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for a, b, _, _ in self.edges:
+            parent[find(a)] = find(b)
+        lengths: Dict[int, float] = {}
+        for a, _, _, length in self.edges:
+            lengths[find(a)] = lengths.get(find(a), 0.0) + length
+        if not lengths:
+            return []
+        root = max(lengths, key=lengths.get)
+        return [i for i in range(self.n_nodes) if find(i) == root]
+
+    def shortest_paths(self, source: int):
+        """Dijkstra from one node: (distance, previous (node, branch)) dicts"""
+        adjacency = self.adjacency()
+        distance = {source: 0.0}
+        previous: Dict[int, Tuple[int, int]] = {}
+        queue = [(0.0, source)]
+        while queue:
+            d, node = heapq.heappop(queue)
+            if d > distance[node]:
+                continue
+            for neighbour, branch, length in adjacency[node]:
+                nd = d + length + 1.0
+                if nd < distance.get(neighbour, float("inf")):
+                    distance[neighbour] = nd
+                    previous[neighbour] = (node, branch)
+                    heapq.heappush(queue, (nd, neighbour))
+        return distance, previous
+
+    def longest_route(self) -> Tuple[List[int], List[int]]:
+        """
+        Longest shortest path between two endpoints of the main component.
+
+        Returns:
+            (nodes, branches) with branches[i] joining nodes[i] and nodes[i + 1];
+            both empty if there are no endpoints (e.g. a closed loop)
+        """
+        component = set(self.main_component())
+        endpoints = [node for node in self.endpoints if node in component]
+        best_length, best = -1.0, None
+        for source in endpoints:
+            distance, previous = self.shortest_paths(source)
+            for target in endpoints:
+                if target != source and distance.get(target, -1.0) > best_length:
+                    best_length, best = distance[target], (source, target, previous)
+        if best is None:
+            return [], []
+        source, node, previous = best
+        nodes, branches = [node], []
+        while node != source:
+            node, branch = previous[node]
+            nodes.append(node)
+            branches.append(branch)
+        return nodes[::-1], branches[::-1]
+
+    def branch_pixels(self, branch: int, start: Tuple[float, float]) -> List[Tuple[int, int]]:
+        """Pixels of one chain as (x, y), ordered by walking from the end nearest `start`"""
+        pixels = set(map(tuple, self._branch_xy[branch].tolist()))
+        first = min(pixels, key=lambda p: (p[0] - start[0]) ** 2 + (p[1] - start[1]) ** 2)
+        return _walk(pixels, first)
+
+
+def _closed_loop(skeleton: np.ndarray) -> List[Tuple[int, int]]:
+    """Walk the largest 8-connected piece of a skeleton without endpoints"""
+    n, labels, stats, _ = cv2.connectedComponentsWithStats((skeleton > 0).view(np.uint8), connectivity=8)
+    if n < 2:
+        return []
+    largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    ys, xs = np.nonzero(labels == largest)
+    pixels = set(zip(xs.tolist(), ys.tolist()))
+    return _walk(pixels, min(pixels))
+
+
+def trace_path(skeleton: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Ordered centreline pixels (x, y) of the longest route through a skeleton.
+
+    The route starts at whichever end is nearer the image border (tracks
+    enter the screen from off-screen).
+    """
+    if not np.any(skeleton):
+        return []
+    graph = SkeletonGraph(skeleton)
+    nodes, branches = graph.longest_route()
+    if not nodes:
+        return _closed_loop(skeleton)
+
+    height, width = skeleton.shape[:2]
+
+    def border_distance(node):
+        x, y = graph.node_centres[node]
+        return min(x, y, width - 1 - x, height - 1 - y)
+
+    if border_distance(nodes[-1]) < border_distance(nodes[0]):
+        nodes, branches = nodes[::-1], branches[::-1]
+
+    def centre(node):
+        cx, cy = graph.node_centres[node]
+        return int(round(cx)), int(round(cy))
+
+    path = [centre(nodes[0])]
+    for branch, node in zip(branches, nodes[1:]):
+        path.extend(graph.branch_pixels(branch, path[-1]))
+        path.append(centre(node))
+    return path
+
+
+def simplify_path(path: List[Tuple[int, int]], epsilon: float = 2.0) -> List[Tuple[int, int]]:
+    """Douglas-Peucker simplification: fewest points within epsilon pixels of the path"""
+    if len(path) < 3:
+        return list(path)
+    points = np.array(path, dtype=np.int32).reshape(-1, 1, 2)
+    simplified = cv2.approxPolyDP(points, epsilon, False)
+    return [(int(x), int(y)) for x, y in simplified.reshape(-1, 2)]
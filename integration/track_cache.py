@@ -0,0 +1,170 @@
+"""
+On-disk cache of map geometry for the real game
+
+The track never changes within a map, so the mask -> skeleton -> trace
+pipeline only needs to run once per map and capture resolution. Results are
+stored as .npz files under cache_dir, keyed by the resolution and a
+perceptual hash (difference hash) of a downscaled frame. The hash tolerates
+balloons, towers and changing HUD numbers, so any frame of the same map finds
+the entry, while a different map or resolution does not.
+
+Each entry holds the track polyline, the track mask, a tower placement mask
+and the HUD layout (named screen regions, filled in once they are known).
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+cache_dir = os.path.join("cache", "tracks")
+
+HASH_SIZE = 16  # Hash bits = HASH_SIZE ** 2
+
+Region = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def perceptual_hash(screen: np.ndarray, size: int = HASH_SIZE) -> str:
+    """
+    Difference hash of a frame: downscale to (size + 1) x size greyscale and
+    record whether each pixel is brighter than its right neighbour.
+
+    Returns:
+        Hex string of size * size bits
+    """
+    grey = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY) if screen.ndim == 3 else screen
+    small = cv2.resize(grey, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits((small[:, 1:] > small[:, :-1]).ravel())
+    return bits.tobytes().hex()
+
+
+def hash_distance(a: str, b: str) -> int:
+    """Number of differing bits between two perceptual hashes"""
+    return int(np.unpackbits(np.frombuffer(bytes.fromhex(a), np.uint8) ^ np.frombuffer(bytes.fromhex(b), np.uint8)).sum())
+
+
+def placement_mask(track_mask: np.ndarray, clearance: Optional[float] = None) -> np.ndarray:
+    """
+    Where towers can go: pixels further than `clearance` from the track.
+
+    Args:
+        track_mask: Non-zero on the track
+        clearance: Pixels (default: the simulator's MIN_TRACK_DISTANCE of 40
+                   on an 800 px wide map, scaled to the frame width)
+    """
+    if clearance is None:
+        clearance = 40 * track_mask.shape[1] / 800
+    off_track = (track_mask == 0).astype(np.uint8)
+    distance = cv2.distanceTransform(off_track, cv2.DIST_L2, 3)
+    return (distance > clearance).astype(np.uint8)
+
+
+@dataclass
+class TrackGeometry:
+    """Everything about a map that is extracted once and reused"""
+
+    resolution: Tuple[int, int]  # width, height
+    frame_hash: str
+    path: List[Tuple[int, int]]
+    track_mask: np.ndarray
+    placement_mask: np.ndarray
+    hud: Dict[str, Region] = field(default_factory=dict)
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            resolution=np.array(self.resolution),
+            frame_hash=np.array(self.frame_hash),
+            path=np.array(self.path, dtype=np.int32).reshape(-1, 2),
+            track_mask=self.track_mask,
+            placement_mask=self.placement_mask,
+            hud=np.array(json.dumps(self.hud)),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TrackGeometry":
+        with np.load(path) as data:
+            return cls(
+                resolution=tuple(int(v) for v in data["resolution"]),
+                frame_hash=str(data["frame_hash"]),
+                path=[(int(x), int(y)) for x, y in data["path"]],
+                track_mask=data["track_mask"],
+                placement_mask=data["placement_mask"],
+                # JSON has no tuples; restore the (x, y, w, h) regions
+                hud={name: tuple(region) for name, region in json.loads(str(data["hud"])).items()},
+            )
+
+
+class TrackCache:
+    """
+    Map geometry by resolution and perceptual hash, in memory and on disk.
+
+    Args:
+        directory: Where .npz entries are kept (default cache_dir)
+        max_distance: Largest hash distance (bits out of HASH_SIZE ** 2) still
+                      counted as the same map
+        use_disk: Read and write entries under directory
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_distance: int = 20, use_disk: bool = True):
+        self.directory = directory or cache_dir
+        self.max_distance = max_distance
+        self.use_disk = use_disk
+        self._entries: Dict[Tuple[Tuple[int, int], str], TrackGeometry] = {}  # (resolution, hash) ->
+
+    def _file(self, resolution: Tuple[int, int], frame_hash: str) -> str:
+        return os.path.join(self.directory, f"{resolution[0]}x{resolution[1]}-{frame_hash}.npz")
+
+    def _candidates(self, resolution: Tuple[int, int]) -> Dict[str, str]:
+        """hash -> file of every disk entry at this resolution"""
+        if not self.use_disk or not os.path.isdir(self.directory):
+            return {}
+        prefix = f"{resolution[0]}x{resolution[1]}-"
+        return {
+            name[len(prefix) : -len(".npz")]: os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(".npz") and ".tmp" not in name
+        }
+
+    def lookup(self, screen: np.ndarray, frame_hash: Optional[str] = None) -> Optional[TrackGeometry]:
+        """
+        Cached geometry of the map shown in screen, or None
+
+        Args:
+            frame_hash: perceptual_hash(screen), if already computed
+        """
+        resolution = (screen.shape[1], screen.shape[0])
+        if frame_hash is None:
+            frame_hash = perceptual_hash(screen)
+
+        def nearest(hashes):
+            distances = {h: hash_distance(frame_hash, h) for h in hashes}
+            best = min(distances, key=distances.get, default=None)
+            return best if best is not None and distances[best] <= self.max_distance else None
+
+        in_memory = nearest(h for r, h in self._entries if r == resolution)
+        if in_memory is not None:
+            return self._entries[(resolution, in_memory)]
+
+        on_disk = self._candidates(resolution)
+        best = nearest(on_disk)
+        if best is None:
+            return None
+        try:
+            geometry = TrackGeometry.load(on_disk[best])
+        except (OSError, ValueError, KeyError):
+            return None
+        self._entries[(resolution, best)] = geometry
+        return geometry
+
+    def store(self, geometry: TrackGeometry):
+        """Keep geometry (and write it to disk when use_disk)"""
+        self._entries[(geometry.resolution, geometry.frame_hash)] = geometry
+        if self.use_disk:
+            os.makedirs(self.directory, exist_ok=True)
+            geometry.save(self._file(geometry.resolution, geometry.frame_hash))
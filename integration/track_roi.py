@@ -0,0 +1,174 @@
+"""
+Track region of interest for perception
+
+Balloons only ever appear on the track, so once the track is known the rest of
+the frame does not need to be looked at. TrackROI dilates a track mask by a
+margin (balloon radius plus slack), marks the tiles of a coarse grid that the
+dilated track touches and merges them into a few rectangles. Detection then
+only labels pixels inside those rectangles, and drops blobs touching the ROI
+edge (scenery cut into balloon-sized pieces).
+"""
+
+from typing import List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from integration.balloon_classifier import Rect
+
+
+def _tiles_to_rects(active: np.ndarray, tile: int, height: int, width: int) -> List[Rect]:
+    """Merge active tiles into rectangles: runs per tile row, stacked while identical"""
+    rects: List[Rect] = []
+    open_runs = {}  # (start, end) column run -> index in rects
+    for row in range(active.shape[0]):
+        padded = np.concatenate([[False], active[row], [False]])
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+        next_open = {}
+        y = row * tile
+        h = min(tile, height - y)
+        for start, end in sorted(runs):
+            if (start, end) in open_runs:
+                i = open_runs[(start, end)]
+                x, ry, w, rh = rects[i]
+                rects[i] = (x, ry, w, rh + h)
+            else:
+                x = start * tile
+                rects.append((x, y, min(end * tile, width) - x, h))
+                i = len(rects) - 1
+            next_open[(start, end)] = i
+        open_runs = next_open
+    return rects
+
+
+def clip_windows(rects: Sequence[Rect], shape: Tuple[int, int]) -> List[Rect]:
+    """Clip (x, y, width, height) windows to the frame, dropping empty ones"""
+    height, width = shape[:2]
+    clipped = []
+    for x, y, w, h in rects:
+        x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, width), min(y + h, height)
+        if x1 > x0 and y1 > y0:
+            clipped.append((x0, y0, x1 - x0, y1 - y0))
+    return clipped
+
+
+def bounding_rect(rects: Sequence[Rect]) -> Rect:
+    """Smallest (x, y, width, height) containing every rectangle"""
+    x0, y0 = min(x for x, _, _, _ in rects), min(y for _, y, _, _ in rects)
+    x1, y1 = max(x + w for x, _, w, _ in rects), max(y + h for _, y, _, h in rects)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def overlapping_groups(rects: Sequence[Rect]) -> List[List[Rect]]:
+    """Split rectangles into groups whose unions are disjoint (overlapping ones share a group)"""
+    groups: List[List[Rect]] = []
+    for rect in rects:
+        x, y, w, h = rect
+        merged, rest = [rect], []
+        for group in groups:
+            if any(x < gx + gw and gx < x + w and y < gy + gh and gy < y + h for gx, gy, gw, gh in group):
+                merged += group
+            else:
+                rest.append(group)
+        groups = rest + [merged]
+    return groups
+
+
+def windows_region(
+    rects: Sequence[Rect], bounds: Rect, shape: Tuple[int, int], band: int = 2
+) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Union of windows inside bounds, and the (rows, cols) of its inner
+    `band`-pixel border, leaving out the frame border; both relative to
+    bounds. Same roles as TrackROI.rects and TrackROI.edge_pixels for a
+    detection run on the bounds crop.
+
+    Returns:
+        (uint8 mask, 1 inside a window, edge pixels)
+    """
+    height, width = shape[:2]
+    bx, by, bw, bh = bounds
+    inside = np.zeros((bh + 2 * band, bw + 2 * band), dtype=np.uint8)
+    for x, y, w, h in rects:
+        inside[y - by + band : y - by + h + band, x - bx + band : x - bx + w + band] = 1
+    # Beyond the frame border counts as inside, so it is not an edge
+    if bx == 0:
+        inside[:, :band] = 1
+    if by == 0:
+        inside[:band] = 1
+    if bx + bw == width:
+        inside[:, -band:] = 1
+    if by + bh == height:
+        inside[-band:] = 1
+    edge = inside & ~cv2.erode(inside, np.ones((2 * band + 1, 2 * band + 1), np.uint8))
+    crop = (slice(band, band + bh), slice(band, band + bw))
+    return inside[crop], np.nonzero(edge[crop])
+
+
+class TrackROI:
+    """
+    Rectangles of a frame that can contain balloons.
+
+    Args:
+        track_mask: uint8 mask (non-zero on the track) of the full frame
+        margin: Dilation radius in pixels, so balloons at the track edge are kept
+        tile: Grid size in pixels used to build the rectangles
+    """
+
+    def __init__(self, track_mask: np.ndarray, margin: int = 24, tile: int = 32):
+        self.shape = track_mask.shape[:2]
+        self.margin = margin
+        self.tile = tile
+
+        height, width = self.shape
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * margin + 1, 2 * margin + 1))
+        self.mask = cv2.dilate((track_mask > 0).astype(np.uint8), kernel)
+
+        rows, cols = -(-height // tile), -(-width // tile)
+        padded = np.zeros((rows * tile, cols * tile), dtype=np.uint8)
+        padded[:height, :width] = self.mask
+        self.tiles = padded.reshape(rows, tile, cols, tile).max(axis=(1, 3)) > 0
+        self.rects = _tiles_to_rects(self.tiles, tile, height, width)
+
+        # 2-pixel band on the inner edge of the ROI (not counting the frame
+        # border; 2 pixels because detection drops the outermost pixel of a
+        # blob where the colour changes). The margin keeps balloons on the
+        # track away from it, so blobs touching it are scenery cut off by the ROI
+        inside = np.zeros(self.shape, dtype=np.uint8)
+        for x, y, w, h in self.rects:
+            inside[y : y + h, x : x + w] = 1
+        edge = inside.astype(bool) & ~cv2.erode(inside, np.ones((5, 5), np.uint8), borderValue=1).astype(bool)
+        self.edge_pixels = np.nonzero(edge)
+
+    @classmethod
+    def from_path(
+        cls,
+        path: Sequence[Tuple[int, int]],
+        frame_shape: Tuple[int, int],
+        track_width: int = 40,
+        margin: int = 24,
+        tile: int = 32,
+    ) -> "TrackROI":
+        """ROI around a polyline (e.g. from BTD6Integration.detect_track_path)"""
+        mask = np.zeros(frame_shape[:2], dtype=np.uint8)
+        if len(path) > 1:
+            points = np.array(path, dtype=np.int32).reshape(-1, 1, 2)
+            cv2.polylines(mask, [points], False, 1, thickness=track_width)
+        return cls(mask, margin, tile)
+
+    @property
+    def pixels(self) -> int:
+        """Pixels inside the rectangles"""
+        return int(sum(w * h for _, _, w, h in self.rects))
+
+    def stats(self) -> dict:
+        """How much of each frame perception no longer has to process"""
+        frame_pixels = self.shape[0] * self.shape[1]
+        return {
+            "rects": len(self.rects),
+            "roi_pixels": self.pixels,
+            "frame_pixels": frame_pixels,
+            "saved_fraction": 1.0 - self.pixels / frame_pixels,
+        }
@@ -0,0 +1,281 @@
+"""
+Multi-balloon tracker for the real-game loop
+
+detect_balloons() sees every frame in isolation. BalloonTracker keeps balloons
+between frames instead:
+- each balloon has a persistent id, its distance along the track (arc length
+  of the detected track polyline) and its speed along the track
+- positions are predicted by moving each balloon along the track at its speed
+- detections are matched to predictions with the Hungarian algorithm on the
+  along-track distance, so two balloons passing close by keep their ids
+
+Every frame gets a full (track ROI) detection; the tracker only adds the
+matching, well under a millisecond per frame.
+
+Track progress (0 at the entrance, 1 at the exit) maps a real balloon onto the
+simulator's path, which is what the trained policy's observation expects.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[float, float]
+
+
+def linear_assignment(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost assignment (Hungarian algorithm, O(n^2 m) with potentials).
+
+    Args:
+        cost: (n, m) cost matrix; every row is assigned if n <= m, every column otherwise
+
+    Returns:
+        (row, column) pairs
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return []
+    if cost.shape[0] > cost.shape[1]:
+        return [(r, c) for c, r in linear_assignment(cost.T)]
+
+    # Well-separated balloons: every row's cheapest column is a different
+    # one, and taking each row's minimum is then optimal
+    best = cost.argmin(axis=1)
+    if len(np.unique(best)) == len(best):
+        return list(enumerate(best.tolist()))
+
+    n, m = cost.shape
+    u = np.zeros(n + 1)  # Row potentials
+    v = np.zeros(m + 1)  # Column potentials
+    match = np.zeros(m + 1, dtype=int)  # Row (1-based) assigned to each column; column 0 is a sentinel
+    way = np.zeros(m + 1, dtype=int)
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = match[column]
+            # Reduced costs from the row just reached to every unused column
+            slack = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = column
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        # Flip the augmenting path
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+    return [(int(match[c]) - 1, c - 1) for c in range(1, m + 1) if match[c]]
+
+
+class TrackPath:
+    """Arc-length parametrisation of a polyline"""
+
+    def __init__(self, points: Sequence[Point]):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.segments = np.diff(self.points, axis=0)
+        self.segment_lengths = np.linalg.norm(self.segments, axis=1)
+        self.cumulative = np.concatenate([[0.0], np.cumsum(self.segment_lengths)])
+        self.length = float(self.cumulative[-1])
+
+    def project(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest point on the path for each (x, y).
+
+        Returns:
+            (arc length along the path, distance from the path) per point
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        starts = self.points[:-1]
+        squared = np.maximum(self.segment_lengths**2, 1e-12)
+        # (points, segments) parameter of the closest point on each segment
+        t = np.einsum("psk,sk->ps", points[:, None, :] - starts[None], self.segments) / squared
+        t = np.clip(t, 0.0, 1.0)
+        closest = starts[None] + t[..., None] * self.segments[None]
+        distances = np.linalg.norm(points[:, None, :] - closest, axis=2)
+        best = np.argmin(distances, axis=1)
+        rows = np.arange(len(points))
+        arc = self.cumulative[best] + t[rows, best] * self.segment_lengths[best]
+        return arc, distances[rows, best]
+
+    def point_at(self, arc) -> np.ndarray:
+        """(x, y) at the given arc length(s), clamped to the path ends"""
+        arc = np.clip(np.asarray(arc, dtype=float), 0.0, self.length)
+        return np.stack([np.interp(arc, self.cumulative, self.points[:, 0]), np.interp(arc, self.cumulative, self.points[:, 1])], axis=-1)
+
+
+@dataclass
+class TrackedBalloon:
+    """A balloon followed across frames"""
+
+    id: int
+    arc: float  # Distance along the track, pixels
+    speed: float  # Along-track pixels per second
+    type: str
+    area: int
+    x: float
+    y: float
+    last_seen: float
+    hits: int = 1
+    misses: int = 0
+
+    def progress(self, track_length: float) -> float:
+        """Fraction of the track covered, 0 at the entrance and 1 at the exit"""
+        return min(max(self.arc / track_length, 0.0), 1.0) if track_length > 0 else 0.0
+
+
+class BalloonTracker:
+    """
+    Follow balloons along a detected track.
+
+    Args:
+        path: Track polyline in screen pixels, entrance first (e.g. TrackGeometry.path)
+        detect: Callable screen -> detections (BTD6Integration.detect_balloons)
+        max_offset: Detections further than this from the track are not balloons
+        max_jump: Largest along-track distance between a prediction and its detection
+        max_misses: Frames a balloon can go undetected before it is dropped
+        type_penalty: Added matching cost when the detected colour differs
+                      (popping changes colour, so this is a preference, not a rule)
+        initial_speed: Along-track speed assumed for new balloons, pixels per second
+    """
+
+    def __init__(
+        self,
+        path: Sequence[Point],
+        detect: Callable[[np.ndarray], List[dict]],
+        max_offset: float = 40.0,
+        max_jump: float = 60.0,
+        max_misses: int = 3,
+        type_penalty: float = 15.0,
+        initial_speed: float = 0.0,
+    ):
+        self.path = TrackPath(path)
+        self.detect = detect
+        self.max_offset = max_offset
+        self.max_jump = max_jump
+        self.max_misses = max_misses
+        self.type_penalty = type_penalty
+        self.initial_speed = initial_speed
+
+        self.balloons: List[TrackedBalloon] = []
+        self.next_id = 0
+        self.last_time: Optional[float] = None
+        self.counts = {"detections": 0, "created": 0, "dropped": 0, "exited": 0}
+
+    def reset(self):
+        self.balloons = []
+        self.last_time = None
+
+    def update(self, screen: np.ndarray, timestamp: float) -> List[TrackedBalloon]:
+        """
+        Advance to a new frame.
+
+        Returns:
+            Balloons currently on the track, oldest id first
+        """
+        dt = 0.0 if self.last_time is None else max(timestamp - self.last_time, 0.0)
+        self.last_time = timestamp
+
+        # Predict: move every balloon along the track at its speed
+        predicted_arc = np.array([b.arc + b.speed * dt for b in self.balloons])
+        predicted = self.path.point_at(predicted_arc) if self.balloons else np.empty((0, 2))
+
+        detections = self.detect(screen)
+        self.counts["detections"] += 1
+
+        if detections:
+            arcs, offsets = self.path.project([(d["x"], d["y"]) for d in detections])
+            keep = offsets <= self.max_offset
+            detections = [d for d, k in zip(detections, keep) if k]
+            arcs = arcs[keep]
+        else:
+            arcs = np.empty(0)
+
+        # Match predictions to detections on along-track distance
+        matched_balloons, matched_detections = set(), set()
+        if self.balloons and detections:
+            cost = np.abs(predicted_arc[:, None] - arcs[None, :])
+            types = np.array([b.type for b in self.balloons])[:, None] != np.array([d["type"] for d in detections])[None, :]
+            cost = cost + self.type_penalty * types
+            # Pairs beyond the gate can still be assigned; they are discarded below
+            gated = np.where(cost <= self.max_jump, cost, self.max_jump * 10)
+            for i, j in linear_assignment(gated):
+                if cost[i, j] > self.max_jump:
+                    continue
+                balloon, detection = self.balloons[i], detections[j]
+                if dt > 0:
+                    measured = (arcs[j] - balloon.arc) / dt
+                    balloon.speed = measured if balloon.hits == 1 else 0.5 * balloon.speed + 0.5 * measured
+                balloon.arc = float(arcs[j])
+                balloon.x, balloon.y = float(detection["x"]), float(detection["y"])
+                balloon.type, balloon.area = detection["type"], detection["area"]
+                balloon.last_seen = timestamp
+                balloon.hits += 1
+                balloon.misses = 0
+                matched_balloons.add(i)
+                matched_detections.add(j)
+
+        # Unmatched balloons coast on their prediction until they are missed too often
+        survivors = []
+        for i, balloon in enumerate(self.balloons):
+            if i not in matched_balloons:
+                balloon.misses += 1
+                balloon.arc = float(predicted_arc[i])
+                balloon.x, balloon.y = (float(v) for v in predicted[i])
+            if balloon.arc >= self.path.length:
+                self.counts["exited"] += 1
+            elif balloon.misses > self.max_misses:
+                self.counts["dropped"] += 1
+            else:
+                survivors.append(balloon)
+        self.balloons = survivors
+
+        # Unmatched detections are new balloons
+        speeds = [b.speed for b in self.balloons if b.hits > 1]
+        speed = float(np.median(speeds)) if speeds else self.initial_speed
+        for j, detection in enumerate(detections):
+            if j in matched_detections:
+                continue
+            self.balloons.append(
+                TrackedBalloon(
+                    id=self.next_id,
+                    arc=float(arcs[j]),
+                    speed=speed,
+                    type=detection["type"],
+                    area=detection["area"],
+                    x=float(detection["x"]),
+                    y=float(detection["y"]),
+                    last_seen=timestamp,
+                )
+            )
+            self.next_id += 1
+            self.counts["created"] += 1
+
+        self.balloons.sort(key=lambda b: b.id)
+        return self.balloons
+
+    def progress(self) -> List[float]:
+        """Track progress of every tracked balloon, oldest id first"""
+        return [b.progress(self.path.length) for b in self.balloons]
+
+    def simulator_positions(self, simulator_path: Sequence[Point]) -> np.ndarray:
+        """
+        Where each tracked balloon would be on the simulator's path: the point
+        at the same fraction of its length.
+        """
+        target = TrackPath(simulator_path)
+        return target.point_at(np.array(self.progress()) * target.length).reshape(-1, 2)
@@ -6,11 +6,14 @@ then start the round.
 Usage: python run_mvp.py
 """
 
+import os
 import time
 from ai.train import evaluate_model
 from integration.btd6_integration import BTD6Integration
 
 MODEL_PATH = "models/btd6_test_final.zip"
+# Exported NumPy policy (python -m ai.numpy_policy MODEL_PATH); avoids loading torch
+NUMPY_MODEL_PATH = "models/btd6_test_final.npz"
 
 
 def main():
@@ -25,7 +28,9 @@ def main():
     # Evaluate the replica AI in the simulator
     print("Evaluating replica AI in simulation...")
     try:
-        result = evaluate_model(MODEL_PATH, episodes=3, render=False)
+        model_path = NUMPY_MODEL_PATH if os.path.exists(NUMPY_MODEL_PATH) else MODEL_PATH
+        # Cached per model file and simulator version: repeat runs skip re-simulation
+        result = evaluate_model(model_path, episodes=3, render=False, use_cache=True)
     except Exception as e:
         print(f"Failed to evaluate model: {e}")
         return
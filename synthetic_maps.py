@@ -0,0 +1,30 @@
+"""
+Synthetic maps for the integration tests: a track drawn over grass in the
+colours the detectors look for, and the distance checks used on traced paths
+"""
+
+import cv2
+import numpy as np
+
+TRACK = (120, 155, 180)  # Brown, matched by _get_track_mask
+GRASS = (60, 160, 60)
+DARK_GRASS = (30, 70, 35)  # Too dark for the start button range, not track
+
+
+def draw_map(path, size=(800, 600), thickness=40, background=GRASS) -> np.ndarray:
+    """A size[0] x size[1] BGR map with the track drawn along the path polyline"""
+    screen = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    screen[:] = background
+    cv2.polylines(screen, [np.array(path, np.int32).reshape(-1, 1, 2)], False, TRACK, thickness=thickness)
+    return screen
+
+
+def distance_to_polyline(point, polyline):
+    """Distance from a point to the nearest segment of a polyline"""
+    p = np.array(point, dtype=float)
+    best = float("inf")
+    for a, b in zip(polyline[:-1], polyline[1:]):
+        a, b = np.array(a, dtype=float), np.array(b, dtype=float)
+        t = np.clip(np.dot(p - a, b - a) / max(np.dot(b - a, b - a), 1e-9), 0, 1)
+        best = min(best, np.linalg.norm(p - (a + t * (b - a))))
+    return best
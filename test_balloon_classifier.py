@@ -0,0 +1,138 @@
+"""
+Test the LUT-based multi-colour balloon classifier
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from integration import BTD6Integration
+from integration.balloon_classifier import BalloonClassifier, build_color_lut
+
+COLOURS = {
+    "red": (0, 0, 230),
+    "blue": (230, 120, 20),
+    "green": (20, 200, 20),
+    "yellow": (0, 220, 250),
+    "pink": (180, 100, 250),
+    "black": (10, 10, 10),
+    "white": (250, 250, 250),
+    "ceramic": (20, 80, 160),
+}
+
+
+def legacy_red(screen):
+    """The HSV + inRange red detector detect_balloons used before"""
+    hsv = cv2.cvtColor(screen, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array([0, 100, 100]), np.array([10, 255, 255])) + cv2.inRange(
+        hsv, np.array([160, 100, 100]), np.array([180, 255, 255])
+    )
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    found = []
+    for contour in contours:
+        if cv2.contourArea(contour) > 100:
+            M = cv2.moments(contour)
+            found.append((int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"])))
+    return found
+
+
+# Grass, a tan track, and one balloon of each colour along the track
+screen = np.zeros((600, 800, 3), dtype=np.uint8)
+screen[:] = (60, 160, 60)
+cv2.rectangle(screen, (0, 270), (800, 330), (150, 185, 200), -1)
+expected = []
+for i, (name, colour) in enumerate(COLOURS.items()):
+    x = 50 + i * 85
+    cv2.circle(screen, (x, 300), 12, colour, -1)
+    expected.append((x, 300, name))
+
+# A zebra (black and white stripes) and a blue balloon on the grass touching a red one
+zebra = cv2.circle(np.zeros((600, 800), np.uint8), (740, 300), 12, 1, -1).astype(bool)
+stripes = (np.arange(600) // 3 % 2 == 0)[:, None]
+screen[zebra] = COLOURS["white"]
+screen[zebra & stripes] = COLOURS["black"]
+expected.append((740, 300, "zebra"))
+cv2.circle(screen, (300, 100), 12, COLOURS["blue"], -1)
+cv2.circle(screen, (323, 100), 12, COLOURS["red"], -1)
+expected += [(300, 100, "blue"), (323, 100, "red")]
+
+# Noise too small to be a balloon
+screen[500:504, 500:504] = COLOURS["red"]
+
+classifier = BalloonClassifier()
+balloons = classifier.detect(screen)
+print(f"Detected {len(balloons)} balloons:")
+for b in balloons:
+    print(f"  {b}")
+
+assert len(balloons) == len(expected), (len(balloons), len(expected))
+for x, y, name in expected:
+    match = min(balloons, key=lambda b: abs(b["x"] - x) + abs(b["y"] - y))
+    assert match["type"] == name and abs(match["x"] - x) <= 3 and abs(match["y"] - y) <= 3, (name, match)
+    assert match["area"] > 100
+
+# The integration returns the same dicts
+assert BTD6Integration().detect_balloons(screen) == balloons
+
+# On red balloons, same positions as the old HSV detector
+reds = np.zeros((600, 800, 3), dtype=np.uint8)
+for x in (100, 300, 500):
+    cv2.circle(reds, (x, 200), 10, COLOURS["red"], -1)
+old = sorted(legacy_red(reds))
+new = sorted((b["x"], b["y"]) for b in classifier.detect(reds))
+assert len(old) == len(new) == 3
+assert all(abs(a[0] - b[0]) <= 1 and abs(a[1] - b[1]) <= 1 for a, b in zip(old, new))
+
+# LUT: one entry per 5-bit colour
+lut = build_color_lut()
+assert lut.shape == (32768,) and lut.dtype == np.uint8
+
+
+# HSV ranges equivalent to the classifier's rules, one mask per colour
+HSV_RANGES = {
+    "red": [((0, 100, 100), (10, 255, 255)), ((160, 100, 100), (180, 255, 255))],
+    "pink": [((140, 60, 180), (175, 189, 255))],
+    "ceramic": [((11, 100, 60), (19, 255, 199))],
+    "yellow": [((20, 100, 150), (35, 255, 255))],
+    "green": [((36, 100, 80), (85, 255, 255))],
+    "blue": [((90, 100, 80), (130, 255, 255))],
+    "black": [((0, 0, 0), (180, 255, 39))],
+    "white": [((0, 0, 221), (180, 29, 255))],
+}
+
+
+def per_colour_hsv(screen):
+    """Extending the old detector the same way: one HSV mask + contour pass per colour"""
+    hsv = cv2.cvtColor(screen, cv2.COLOR_BGR2HSV)
+    found = []
+    for name, ranges in HSV_RANGES.items():
+        mask = sum(cv2.inRange(hsv, np.array(lo), np.array(hi)) for lo, hi in ranges)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            if 100 < cv2.contourArea(contour) < 5000:
+                M = cv2.moments(contour)
+                found.append((int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]), name))
+    return found
+
+
+# The LUT cost does not grow with the number of colours
+timings = {}
+for name, detect in [
+    ("old red-only", legacy_red),
+    ("HSV + inRange per colour", per_colour_hsv),
+    ("LUT label pass", classifier.label),
+    ("LUT + connected components, all colours", classifier.detect),
+]:
+    detect(screen)
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(20):
+            detect(screen)
+        best = min(best, (time.perf_counter() - start) / 20)
+    timings[name] = best * 1000
+    print(f"{name}: {timings[name]:.2f}ms per 800x600 frame")
+
+# Every colour in one pass is cheaper than a mask per colour
+assert timings["LUT + connected components, all colours"] < timings["HSV + inRange per colour"], timings
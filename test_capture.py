@@ -0,0 +1,89 @@
+"""
+Test the screen capture backends
+
+The XShm and PIL backends are compared on a local Xvfb display when the Xvfb
+binary is installed; the rest runs anywhere.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+
+import cv2
+import numpy as np
+
+from integration import BTD6Integration
+from integration.capture import PILCapture, ReplayCapture, XShmCapture, create_capture
+
+# Replayed frames go into one reused buffer, cropped to the region
+frames = [np.full((600, 800, 3), i * 40, dtype=np.uint8) for i in range(3)]
+frames[1][300:320, 400:420] = (0, 0, 255)
+capture = ReplayCapture(frames, region=(100, 50, 640, 480))
+first = capture.grab()
+buffer_address = first.__array_interface__["data"][0]
+assert first.shape == (480, 640, 3) and first.dtype == np.uint8
+second = capture.grab()
+assert second is first and second.__array_interface__["data"][0] == buffer_address
+assert (second[250:270, 300:320] == (0, 0, 255)).all()
+for _ in range(100):
+    capture.grab()
+stats = capture.stats()
+print(f"Replay capture: {stats}")
+assert stats["frames"] == 102 and stats["p95_ms"] >= stats["p50_ms"]
+
+# BTD6Integration captures through an injected backend
+integration = BTD6Integration(game_window_region=(0, 0, 800, 600), capture_backend=ReplayCapture(frames[1:2]))
+screen = integration.capture_screen()
+assert integration.capture_screen() is screen
+balloons = integration.detect_balloons(screen)
+assert len(balloons) == 1 and abs(balloons[0]["x"] - 410) <= 1
+print(f"Detected from replayed frame: {balloons}")
+
+try:
+    create_capture(backend="dxgi")
+    assert False, "Unknown backend accepted"
+except ValueError:
+    pass
+
+# Without an X server, XShm fails cleanly and "auto" falls back to PIL
+try:
+    XShmCapture(display=":999")
+    assert False, "Opened a display that does not exist"
+except OSError as e:
+    print(f"XShm unavailable on :999 ({e})")
+if "DISPLAY" not in os.environ:
+    assert isinstance(create_capture(), PILCapture)
+
+xvfb = shutil.which("Xvfb")
+if xvfb is None:
+    print("Xvfb not installed: skipping XShm/PIL live capture checks")
+else:
+    display = ":97"
+    server = subprocess.Popen([xvfb, display, "-screen", "0", "1024x768x24"], stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(1.0)
+        region = (100, 50, 640, 480)
+        with XShmCapture(region) as xshm, PILCapture(region) as pil:
+            shm_frame = xshm.grab().copy()
+            pil_frame = pil.grab().copy()
+            assert shm_frame.shape == pil_frame.shape == (480, 640, 3)
+            assert np.array_equal(shm_frame, pil_frame)
+            for _ in range(50):
+                xshm.grab()
+                pil.grab()
+            print(f"XShm: {xshm.stats()}")
+            print(f"PIL:  {pil.stats()}")
+        with create_capture(region) as auto:
+            assert isinstance(auto, XShmCapture)
+        # Regions outside the screen are rejected before any segment is made
+        for outside in [(900, 50, 640, 480), (-1, 0, 640, 480), (0, 0, 0, 480)]:
+            try:
+                XShmCapture(outside)
+                assert False, f"Region {outside} accepted"
+            except ValueError:
+                pass
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,110 @@
+"""
+Test asynchronous checkpointing: checkpoints are written by a background
+thread while training continues, then evaluated in a separate process
+"""
+
+import csv
+import os
+import tempfile
+import threading
+import time
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback, CallbackList
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+import ai.callbacks
+from ai.callbacks import AsyncCheckpointCallback
+from ai.env import BTD6Env
+
+SAVE_FREQ, TOTAL_STEPS, WRITE_DELAY = 64, 256, 0.5
+
+# A slow disk: every write takes at least WRITE_DELAY seconds
+writes = []  # (start, end, thread name) per checkpoint
+save_to_zip_file = ai.callbacks.save_to_zip_file
+
+
+def slow_save_to_zip_file(path, *args, **kwargs):
+    start = time.perf_counter()
+    time.sleep(WRITE_DELAY)
+    save_to_zip_file(path, *args, **kwargs)
+    writes.append((start, time.perf_counter(), threading.current_thread().name))
+
+
+def full_disk_save_to_zip_file(path, *args, **kwargs):
+    raise OSError(28, "No space left on device", path)
+
+
+class StepTimes(BaseCallback):
+    """Wall time of every training step"""
+
+    def __init__(self):
+        super().__init__()
+        self.times = []
+
+    def _on_step(self) -> bool:
+        self.times.append(time.perf_counter())
+        return True
+
+
+# Checkpoints are evaluated in a spawned process, which re-imports this file
+if __name__ == "__main__":
+    models = tempfile.mkdtemp()
+    env = DummyVecEnv([lambda: BTD6Env(render_mode=None)])
+    model = PPO("MlpPolicy", env, n_steps=64, batch_size=64, n_epochs=1, seed=0, verbose=0)
+    checkpoints = AsyncCheckpointCallback(save_freq=SAVE_FREQ, save_path=models, name_prefix="run", eval_episodes=1)
+    steps = StepTimes()
+
+    ai.callbacks.save_to_zip_file = slow_save_to_zip_file
+    try:
+        start = time.perf_counter()
+        model.learn(total_timesteps=TOTAL_STEPS, callback=CallbackList([checkpoints, steps]))
+        learn_time = time.perf_counter() - start
+    finally:
+        ai.callbacks.save_to_zip_file = save_to_zip_file
+
+    # learn() returns once the writer has finished: every checkpoint is on disk
+    expected = [os.path.join(models, f"run_{t}_steps.zip") for t in range(SAVE_FREQ, TOTAL_STEPS + 1, SAVE_FREQ)]
+    assert sorted(os.path.join(models, f) for f in os.listdir(models) if f.endswith(".zip")) == sorted(expected)
+    assert len(writes) == len(expected) and all(name == "checkpoint-writer" for _, _, name in writes)
+    for path in expected:
+        restored = PPO.load(path)
+        assert restored.num_timesteps == int(os.path.basename(path).split("_")[1])
+    print(f"✓ {len(expected)} checkpoints written by the writer thread")
+
+    # Training was not blocked: steps ran while checkpoints were being written
+    overlapping = sum(any(begin < t < end for begin, end, _ in writes) for t in steps.times)
+    assert overlapping > 0, writes
+    print(f"✓ {overlapping} of {len(steps.times)} steps ran during the {WRITE_DELAY} s writes")
+
+    # Every checkpoint was evaluated, in the order it was written
+    with open(checkpoints.eval_log, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert checkpoints.eval_log == os.path.join(models, "run_eval.csv")
+    assert [int(r["timesteps"]) for r in rows] == list(range(SAVE_FREQ, TOTAL_STEPS + 1, SAVE_FREQ))
+    assert [r["checkpoint"] for r in rows] == expected
+    for row in rows:
+        assert int(row["episodes"]) == 1
+        assert 0.0 <= float(row["win_rate"]) <= 1.0
+        assert float(row["eval_time"]) > 0
+    print(f"✓ {len(rows)} checkpoints evaluated, training took {learn_time:.1f} s")
+
+    # A failed write stops training and is raised from learn(), and the queue
+    # of parameter copies stays bounded meanwhile
+    models = tempfile.mkdtemp()
+    checkpoints = AsyncCheckpointCallback(save_freq=SAVE_FREQ, save_path=models, name_prefix="run", eval_episodes=0)
+    steps = StepTimes()
+    ai.callbacks.save_to_zip_file = full_disk_save_to_zip_file
+    try:
+        model.learn(total_timesteps=TOTAL_STEPS * 4, callback=CallbackList([checkpoints, steps]))
+        raise AssertionError("learn() finished despite the failed write")
+    except RuntimeError as error:
+        assert isinstance(error.__cause__, OSError), error.__cause__
+    finally:
+        ai.callbacks.save_to_zip_file = save_to_zip_file
+    assert len(steps.times) < TOTAL_STEPS * 4, len(steps.times)
+    assert not checkpoints._writer.is_alive() and checkpoints._write_queue.maxsize == 2
+    assert not [f for f in os.listdir(models) if f.endswith(".zip")]
+    print(f"✓ Failed write stopped training after {len(steps.times)} steps")
+
+    print("\n✓ Checkpoint test passed!")
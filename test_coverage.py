@@ -0,0 +1,73 @@
+"""
+Test the precomputed tower coverage map
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import ai.coverage
+from ai.coverage import CoverageMap, coverage_map, path_samples
+from ai.env import BTD6Env
+from game.entities import Balloon, BalloonType, Vector2
+from game.game import BTD6Game
+
+start = time.perf_counter()
+coverage = coverage_map()
+build_time = time.perf_counter() - start
+print(f"Built {coverage.length.size} tiles in {build_time * 1000:.1f}ms")
+assert coverage.length.shape == (60, 80)
+assert coverage_map() is coverage  # In-process cache
+
+# Track length in range agrees with counting dense path samples
+samples = path_samples(coverage.path, spacing=1.0)
+positions = coverage.tile_positions()
+for action in [0, 2045, 2530, 4799]:
+    inside = (np.linalg.norm(samples - positions[action], axis=1) <= coverage.tower_range).sum()
+    assert abs(coverage.action_length(action) - inside) <= 4, (action, coverage.action_length(action), inside)
+
+# Exposure agrees with a balloon actually walking the track past a tower
+game = BTD6Game()
+x, y = 300, 255
+balloon = Balloon(BalloonType.RED, Vector2(game.balloon_path[0].x, game.balloon_path[0].y), game.balloon_path)
+dt = 1.0 / 60.0
+seconds = 0.0
+while not balloon.update(dt):
+    if balloon.position.distance_to(Vector2(x, y)) <= coverage.tower_range:
+        seconds += dt
+print(f"Exposure at ({x}, {y}): map {coverage.exposure_at(x, y):.2f}s, simulated {seconds:.2f}s")
+assert abs(coverage.exposure_at(x, y) - seconds) < 0.1
+
+# Legal tiles follow BTD6Game.place_tower
+env = BTD6Env()
+for action in range(0, env.num_actions - 1, 97):
+    game = BTD6Game(starting_cash=BTD6Game.TOWER_COST)
+    assert game.place_tower(*env.action_to_position(action)) == bool(coverage.legal.flat[action])
+
+start = time.perf_counter()
+for _ in range(10000):
+    coverage.exposure_at(x, y)
+print(f"Query: {(time.perf_counter() - start) / 10000 * 1e6:.2f}us")
+
+# On-disk cache round trip
+with tempfile.TemporaryDirectory() as tmp:
+    ai.coverage.cache_dir = tmp
+    first = coverage_map(tower_range=100, use_disk=True)
+    assert len(os.listdir(tmp)) == 1
+    ai.coverage._maps.clear()
+    second = coverage_map(tower_range=100, use_disk=True)
+    assert second is not first and np.array_equal(first.length, second.length)
+    assert (second.length <= coverage.length + 1e-3).all()
+
+# Reward shaping rewards placements that cover more track
+env = BTD6Env(coverage_reward_scale=10.0)
+env.reset(seed=0)
+env.game.cash += 2 * BTD6Game.TOWER_COST
+best = int(np.argmax(np.where(coverage.legal, coverage.length, -1)))
+worst = int(np.argmin(np.where(coverage.legal, coverage.length, np.inf)))
+_, good_reward, *_ = env.step(best)
+_, poor_reward, *_ = env.step(worst)
+print(f"Shaped reward: best tile {good_reward:.2f}, worst tile {poor_reward:.2f}")
+assert good_reward > poor_reward
@@ -0,0 +1,46 @@
+"""
+Test expert demonstrations and the behaviour-cloning warm start
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from stable_baselines3 import PPO
+
+from ai.demonstrations import generate_demonstrations, load_demonstrations, pretrain_policy
+from ai.env import BTD6Env
+
+
+def agreement(model, observations, actions) -> float:
+    """Fraction of demonstration states where the greedy policy picks the expert action"""
+    predicted, _ = model.predict(observations, deterministic=True)
+    return float(np.mean(predicted == actions))
+
+
+# Demonstrations are generated in spawned worker processes, which re-import this file
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "demos.npz")
+
+    start = time.perf_counter()
+    stats = generate_demonstrations(path, episodes=16, workers=2)
+    print(f"Expert won {stats['wins']}/{stats['episodes']} episodes, {stats['pairs']} pairs in {time.perf_counter() - start:.1f}s")
+    assert stats["wins"] == stats["episodes"]
+
+    observations, actions = load_demonstrations(path)
+    assert len(observations) == len(actions) == stats["pairs"]
+    placements = actions[actions < BTD6Env().num_actions - 1]
+    print(f"Placement actions: {len(placements)} ({len(np.unique(placements))} distinct tiles)")
+    assert len(placements) > 0
+
+    model = PPO("MlpPolicy", BTD6Env(), seed=0)
+
+    before = agreement(model, observations, actions)
+    losses = pretrain_policy(model, observations, actions, epochs=30)
+    after = agreement(model, observations, actions)
+
+    print(f"Behaviour cloning loss: {losses[0]:.3f} -> {losses[-1]:.3f}")
+    print(f"Greedy agreement with expert: {before:.0%} -> {after:.0%}")
+    assert losses[-1] < losses[0]
+    assert after > before
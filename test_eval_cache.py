@@ -0,0 +1,71 @@
+"""
+Test the on-disk evaluation cache
+"""
+
+import os
+import tempfile
+import time
+
+from stable_baselines3 import PPO
+
+from ai import eval_cache
+from ai.env import BTD6Env
+from ai.train import evaluate_model
+
+tmp_dir = tempfile.mkdtemp()
+eval_cache.cache_dir = os.path.join(tmp_dir, "eval")
+model_path = os.path.join(tmp_dir, "model.zip")
+PPO("MlpPolicy", BTD6Env(), seed=0).save(model_path)
+
+start = time.perf_counter()
+first = evaluate_model(model_path, episodes=3, use_cache=True)
+miss_time = time.perf_counter() - start
+
+start = time.perf_counter()
+second = evaluate_model(model_path, episodes=3, use_cache=True)
+hit_time = time.perf_counter() - start
+
+print(f"Cache miss: {miss_time * 1000:.0f} ms | Cache hit: {hit_time * 1000:.1f} ms")
+assert second == first, "Cached result differs from the evaluated one"
+assert len(os.listdir(eval_cache.cache_dir)) == 1
+
+# Different episode settings are a different entry
+evaluate_model(model_path, episodes=2, use_cache=True)
+assert len(os.listdir(eval_cache.cache_dir)) == 2
+
+# A new model file invalidates the entry
+PPO("MlpPolicy", BTD6Env(), seed=1).save(model_path)
+key_before = eval_cache.cache_key(model_path, 3, True)
+assert eval_cache.load(key_before) is None
+evaluate_model(model_path, episodes=3, use_cache=True)
+assert len(os.listdir(eval_cache.cache_dir)) == 3
+
+# The env settings are read once, not from a new env per key
+assert eval_cache.env_config() is eval_cache.env_config()
+created = []
+init = BTD6Env.__init__
+BTD6Env.__init__ = lambda self, *args, **kwargs: created.append(self) or init(self, *args, **kwargs)
+try:
+    eval_cache.cache_key(model_path, 3, True)
+finally:
+    BTD6Env.__init__ = init
+assert not created
+
+# The NumPy policy and the evaluation loop are part of the fingerprinted
+# source; the policy libraries' versions are part of the key
+assert {"ai.numpy_policy", "ai.train"} <= set(eval_cache.RULE_MODULES)
+versions = eval_cache.library_versions(model_path)
+assert set(versions) == {"numpy", "stable-baselines3", "torch"} and all(versions.values()), versions
+assert set(eval_cache.library_versions("policy.npz")) == {"numpy"}
+library_versions = eval_cache.library_versions
+key = eval_cache.cache_key(model_path, 3, True)
+eval_cache.library_versions = lambda path: dict(library_versions(path), torch="0.0")
+try:
+    assert eval_cache.cache_key(model_path, 3, True) != key
+finally:
+    eval_cache.library_versions = library_versions
+
+# Changed simulator rules invalidate every entry
+eval_cache._rules_digest = "changed-rules"
+assert eval_cache.load(eval_cache.cache_key(model_path, 3, True)) is None
+print("Cache invalidated by model, settings and rule changes")
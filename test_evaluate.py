@@ -0,0 +1,57 @@
+"""
+Test batched evaluation against a plain one-env-at-a-time loop
+"""
+
+import os
+import tempfile
+import time
+
+from stable_baselines3 import PPO
+
+from ai.env import BTD6Env
+from ai.train import evaluate_model
+
+# Save an untrained policy so the test does not depend on a training run
+model_path = os.path.join(tempfile.mkdtemp(), "btd6_eval_test.zip")
+model = PPO("MlpPolicy", BTD6Env(), seed=0)
+model.save(model_path)
+model = PPO.load(model_path)
+
+# Reference: sequential episodes, one predict() per observation
+start = time.perf_counter()
+env = BTD6Env()
+reference_rewards = []
+reference_placements = []
+for episode in range(4):
+    obs, _ = env.reset()
+    done = False
+    episode_reward = 0.0
+    placements = []
+    while not done:
+        action, _ = model.predict(obs, deterministic=True)
+        position = env.action_to_position(action)
+        if position is not None:
+            placements.append(position)
+        obs, reward, terminated, truncated, info = env.step(int(action))
+        episode_reward += reward
+        done = terminated or truncated
+    reference_rewards.append(episode_reward)
+    reference_placements.append(placements)
+sequential_time = time.perf_counter() - start
+
+start = time.perf_counter()
+result = evaluate_model(model_path, episodes=4)
+batched_time = time.perf_counter() - start
+
+print(f"Sequential: {sequential_time:.2f}s | Batched + duplicate skipping: {batched_time:.2f}s")
+print(f"Result: wins={result['wins']}/{result['episodes']}, average_reward={result['average_reward']:.2f}")
+
+assert set(result) == {"wins", "episodes", "placements", "average_reward"}
+assert result["episodes"] == 4
+assert result["placements"] == reference_placements
+assert abs(result["average_reward"] - sum(reference_rewards) / 4) < 1e-6
+
+# Stochastic evaluation runs every episode in lockstep
+result = evaluate_model(model_path, episodes=6, n_envs=3, deterministic=False)
+assert result["episodes"] == 6 and len(result["placements"]) == 6
+print(f"Stochastic: wins={result['wins']}/{result['episodes']}")
@@ -0,0 +1,100 @@
+"""
+Test the per-frame context: derived images (pyramid levels, HSV, masks, frame
+hash) are computed once per frame however many detectors use them
+"""
+
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from integration import BTD6Integration
+from integration.frame import FrameContext, as_frame
+from integration.pyramid import ImagePyramid
+from integration.track_cache import TrackCache, perceptual_hash
+from synthetic_maps import DARK_GRASS, draw_map
+
+# 1080p map with the track, a start button and a few balloons
+screen = draw_map([(0, 540), (960, 360), (1919, 540)], size=(1920, 1080), thickness=70, background=DARK_GRASS)
+cv2.rectangle(screen, (1740, 965), (1860, 1035), (40, 200, 60), -1)
+for x in (300, 900, 1500):
+    y = int(np.interp(x, [0, 960, 1919], [540, 360, 540]))
+    cv2.circle(screen, (x, y), 22, (0, 0, 230), -1)
+
+# Derived images are memoized
+frame = FrameContext(screen)
+assert frame.hsv(0.5) is frame.hsv(0.5) and frame.hsv(0.5).shape == (540, 960, 3)
+assert np.array_equal(frame.hsv(1.0), cv2.cvtColor(screen, cv2.COLOR_BGR2HSV))
+assert np.array_equal(frame.hsv(1.0, (10, 20, 30, 40)), frame.hsv(1.0)[20:60, 10:40])
+assert frame.mask("ones", lambda: np.ones(3)) is frame.mask("ones", lambda: np.zeros(3))
+assert frame.perceptual_hash() == perceptual_hash(screen)
+assert as_frame(frame) is frame
+pyramid = ImagePyramid(screen)
+assert as_frame(pyramid).level(0.5) is pyramid.level(0.5)
+
+# Count full-frame conversions (not small crops) during one frame's detection
+conversions = Counter()
+cvt_color = cv2.cvtColor
+
+
+def counting_cvt_color(image, code, *args, **kwargs):
+    if image.shape[0] * image.shape[1] >= 960 * 540 * 0.9:
+        conversions[(code, image.shape[:2])] += 1
+    return cvt_color(image, code, *args, **kwargs)
+
+
+def run_detectors(integration, screen):
+    """Everything the real-game loop runs on a frame, plus the one-time map setup"""
+    integration.load_track_geometry(screen)
+    integration.calibrate_track_roi(screen)
+    button = integration.detect_start_round_button(screen)
+    path = integration.detect_track_path(screen)
+    balloons = integration.detect_balloons(screen)
+    return button, path, balloons
+
+
+detections, counts, timings = {}, {}, {}
+cv2.cvtColor = counting_cvt_color
+try:
+    for name, wrap in (("raw array", lambda s: s), ("frame context", FrameContext)):
+        conversions.clear()
+        integration = BTD6Integration(track_cache=TrackCache(use_disk=False), detection_scale=0.5)
+        detections[name] = run_detectors(integration, wrap(screen))
+        counts[name] = dict(conversions)
+        best = float("inf")
+        for _ in range(3):
+            integration = BTD6Integration(track_cache=TrackCache(use_disk=False), detection_scale=0.5)
+            start = time.perf_counter()
+            run_detectors(integration, wrap(screen))
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best * 1000
+finally:
+    cv2.cvtColor = cvt_color
+
+start = time.perf_counter()
+for _ in range(10):
+    cv2.cvtColor(screen, cv2.COLOR_BGR2HSV)
+hsv_ms = (time.perf_counter() - start) * 100
+for name in detections:
+    hsv = sum(n for (code, _), n in counts[name].items() if code == cv2.COLOR_BGR2HSV)
+    print(f"{name:>13}: {hsv} HSV conversions, {timings[name]:.0f} ms for map setup + detection")
+print(f"  (one 1920x1080 HSV conversion: {hsv_ms:.1f} ms; thinning the track dominates the total)")
+
+# Same detections either way
+assert detections["raw array"] == detections["frame context"]
+button, path, balloons = detections["frame context"]
+assert button is not None and abs(button[0] - 1800) <= 1 and abs(button[1] - 1000) <= 1
+assert len(balloons) == 3 and path[0][0] == 0 and path[-1][0] == 1919
+
+# With a context: one HSV conversion per pyramid level used (full resolution
+# for the geometry's track mask, detection_scale for the button and the
+# track path) and one hash, however many detectors ran
+assert counts["frame context"] == {
+    (cv2.COLOR_BGR2HSV, (1080, 1920)): 1,
+    (cv2.COLOR_BGR2HSV, (540, 960)): 1,
+    (cv2.COLOR_BGR2GRAY, (1080, 1920)): 1,
+}, counts["frame context"]
+assert sum(counts["raw array"].values()) > sum(counts["frame context"].values())
+
+print("\n✓ Frame context test passed!")
@@ -0,0 +1,103 @@
+"""
+Test the HUD reader: region finding, digit template matching, glyph learning
+and skipping unchanged regions
+"""
+
+import os
+import tempfile
+import time
+
+import cv2
+
+from integration import BTD6Integration
+from integration.hud import GlyphSet, HUDReader, find_hud_regions, parse_field
+from integration.track_cache import TrackCache
+from synthetic_maps import draw_map
+
+
+def outlined(screen, text, origin, font):
+    """White HUD text with a dark outline, like the game's"""
+    cv2.putText(screen, text, origin, font, 1.0, (0, 0, 0), 6)
+    cv2.putText(screen, text, origin, font, 1.0, (255, 255, 255), 2)
+
+
+def make_frame(lives, cash, round_text, font=cv2.FONT_HERSHEY_SIMPLEX):
+    """1280x720 map with the HUD: heart + lives and coin + cash top left, round top right"""
+    screen = draw_map([(0, 360), (640, 240), (1280, 360)], size=(1280, 720), thickness=50)
+    cv2.circle(screen, (40, 35), 15, (0, 0, 230), -1)
+    outlined(screen, str(lives), (65, 50), font)
+    cv2.circle(screen, (230, 35), 15, (0, 200, 250), -1)
+    outlined(screen, f"${cash}", (255, 50), font)
+    outlined(screen, "Round", (1000, 50), font)
+    outlined(screen, round_text, (1120, 50), font)
+    return screen
+
+
+assert parse_field("cash", "$1250") == 1250 and parse_field("round", "12/40") == 12
+assert parse_field("lives", None) is None
+
+# Regions: lives and cash on the left, the round numbers (not the word) on the right
+start = make_frame(150, 650, "1/40")
+regions = find_hud_regions(start)
+assert set(regions) == {"lives", "cash", "round"}, regions
+assert regions["lives"][0] < 70 < regions["lives"][0] + regions["lives"][2] < regions["cash"][0]
+assert regions["round"][0] > 1100
+print(f"✓ HUD regions: {regions}")
+
+# Rendered templates read every digit, however many there are
+reader = HUDReader(GlyphSet.render(), regions)
+assert reader.read(start) == {"lives": 150, "cash": 650, "round": 1}
+for lives, cash, round_text in [(99, 12345, "17/40"), (1, 0, "40/40"), (2468, 97531, "3/80")]:
+    values = reader.read(make_frame(lives, cash, round_text))
+    assert values == {"lives": lives, "cash": cash, "round": parse_field("round", round_text)}, values
+print("✓ Digits read by template matching")
+
+# Unchanged regions are not read again; a changed one is
+frame = make_frame(120, 800, "5/40")
+reader.read(frame)
+counts = dict(reader.counts)
+start_time = time.perf_counter()
+for _ in range(100):
+    reader.read(frame)
+skipped_ms = (time.perf_counter() - start_time) * 10
+assert reader.counts["ocr"] == counts["ocr"] and reader.counts["skipped"] == counts["skipped"] + 300
+changed = make_frame(119, 800, "5/40")
+assert reader.read(changed)["lives"] == 119
+assert reader.counts["ocr"] == counts["ocr"] + 1
+start_time = time.perf_counter()
+for _ in range(100):
+    reader._hashes.clear()
+    reader.read(frame)
+full_ms = (time.perf_counter() - start_time) * 10
+print(f"✓ Unchanged HUD: {skipped_ms:.3f} ms/frame, re-read every region: {full_ms:.3f} ms/frame")
+
+# Unreadable text keeps the last value instead of guessing
+blank = frame.copy()
+x, y, w, h = regions["cash"]
+blank[y + h // 2 : y + h // 2 + 2, x : x + w] = 255  # A white bar joins the glyphs
+assert reader.read(blank)["cash"] == 800 and reader.counts["failed"] >= 1
+
+with tempfile.TemporaryDirectory() as tmp:
+    # Another font: learnt from a frame with known values, then cached on disk
+    glyph_path = os.path.join(tmp, "glyphs.npz")
+    duplex = make_frame(150, 650, "1/40", cv2.FONT_HERSHEY_DUPLEX)
+    learner = HUDReader(GlyphSet(), find_hud_regions(duplex))
+    assert learner.read(duplex)["lives"] is None  # No templates yet
+    assert learner.learn(duplex, {"lives": "150", "cash": "$650", "round": "1/40"}, path=glyph_path) == ["lives", "cash", "round"]
+    cached = HUDReader(GlyphSet.default(glyph_path), learner.regions)
+    assert cached.read(make_frame(165, 1056, "4/40", cv2.FONT_HERSHEY_DUPLEX)) == {"lives": 165, "cash": 1056, "round": 4}
+    print("✓ Glyphs learnt from a known frame and loaded from the cache")
+
+    # The integration finds the regions once and keeps them with the map geometry
+    integration = BTD6Integration(track_cache=TrackCache(tmp))
+    geometry = integration.load_track_geometry(start)
+    assert geometry.hud == regions
+    assert integration.detect_lives(frame) == 120
+    assert integration.detect_cash(frame) == 800
+    assert integration.detect_round(frame) == 5
+    later = BTD6Integration(track_cache=TrackCache(tmp))
+    later.load_track_geometry(make_frame(80, 2000, "9/40"))
+    assert later.locate_hud(frame) == regions
+    assert later.read_hud(frame) == {"lives": 120, "cash": 800, "round": 5}
+
+print("\n✓ HUD test passed!")
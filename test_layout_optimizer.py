@@ -0,0 +1,41 @@
+"""
+Test the genetic layout optimizer
+"""
+
+from ai.layout_optimizer import evaluate_layout, optimize_layout, to_hotkey_actions
+from game.game import BTD6Game
+
+# Optimization runs in spawned workers, which re-import this file
+if __name__ == "__main__":
+    # Evaluation of a known layout
+    result = evaluate_layout([(100, 250), (300, 250)])
+    print(f"Hand-placed layout: {result}")
+    assert result["towers"] == 2 and result["won"]
+
+    empty = evaluate_layout([])
+    assert empty["lives"] < result["lives"]
+
+    result = optimize_layout(n_towers=1, time_budget=5.0, population_size=16, workers=2, seed=0)
+    print(f"{result['generations']} generations, {result['evaluations']} layouts in 5s budget")
+    print(f"First winning layout after {result['first_win_time']:.2f}s")
+    print(f"Best layout: {result['best_layout']} -> {result['best']}")
+    assert result["best"]["won"] and result["best"]["lives"] == 100
+    assert result["history"] == sorted(result["history"])
+
+    # Every returned position is legal (placed in a fresh game) and no layout is repeated
+    for layout, score in result["top_layouts"]:
+        game = BTD6Game(starting_cash=len(layout) * BTD6Game.TOWER_COST)
+        assert all(game.place_tower(x, y) for x, y in layout), layout
+        assert len(layout) == score["towers"]
+    keys = [tuple(layout) for layout, _ in result["top_layouts"]]
+    assert len(keys) == len(set(keys)), keys
+    print(f"{len(keys)} distinct top layouts")
+
+    # Genes on the track are stripped, not kept in the returned layout
+    on_track = evaluate_layout([(100, 250), (800.0, 274.7)])
+    assert on_track["layout"] == [(100.0, 250.0)] and on_track["towers"] == 1
+
+    actions = to_hotkey_actions(result["best_layout"], game_region=(0, 0, 1600, 1200))
+    x, y = result["best_layout"][0]
+    assert actions == [{"type": "dart_monkey", "x": int(x * 2), "y": int(y * 2)}]
+    print(f"Hotkey actions for a 1600x1200 region: {actions}")
@@ -0,0 +1,71 @@
+"""
+Test the NumPy policy export against Stable Baselines3
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+from stable_baselines3 import PPO
+
+from ai.env import BTD6Env
+from ai.numpy_policy import NumpyPolicy, export_policy
+
+env = BTD6Env()
+model = PPO("MlpPolicy", env, seed=0)
+
+# Perturb the action head so logits are not all near zero like a fresh policy
+with torch.no_grad():
+    model.policy.action_net.weight.normal_(0, 0.5)
+
+path = export_policy(model, os.path.join(tempfile.mkdtemp(), "policy.npz"))
+policy = NumpyPolicy.load(path)
+print(f"Exported {os.path.getsize(path) / 1024:.0f} KB to {path}")
+
+# Collect real observations from a few episodes
+observations = []
+obs, _ = env.reset()
+for step in range(200):
+    observations.append(obs)
+    obs, reward, terminated, truncated, info = env.step(env.action_space.sample())
+    if terminated or truncated:
+        obs, _ = env.reset()
+observations = np.array(observations)
+
+# Compare log-probabilities and greedy actions
+with torch.no_grad():
+    obs_tensor, _ = model.policy.obs_to_tensor(observations)
+    sb3_log_probs = model.policy.get_distribution(obs_tensor).distribution.logits.numpy()
+np_logits = policy.action_logits(observations)
+shifted = np_logits - np_logits.max(axis=1, keepdims=True)
+np_log_probs = shifted - np.log(np.exp(shifted).sum(axis=1, keepdims=True))
+
+max_error = np.abs(sb3_log_probs - np_log_probs).max()
+print(f"Max log-probability difference: {max_error:.2e}")
+assert max_error < 1e-3
+
+sb3_actions, _ = model.predict(observations, deterministic=True)
+np_actions, _ = policy.predict(observations, deterministic=True)
+assert np.array_equal(sb3_actions, np_actions), "Greedy actions differ"
+
+single_action, _ = policy.predict(observations[0], deterministic=True)
+assert int(single_action) == int(sb3_actions[0])
+stochastic, _ = policy.predict(observations, deterministic=False)
+assert stochastic.shape == (len(observations),)
+print("Greedy actions match for all observations")
+
+# Single-observation latency
+start = time.perf_counter()
+for obs in observations:
+    model.predict(obs, deterministic=True)
+sb3_time = (time.perf_counter() - start) / len(observations)
+
+start = time.perf_counter()
+for obs in observations:
+    policy.predict(obs, deterministic=True)
+np_time = (time.perf_counter() - start) / len(observations)
+
+print(f"Per-observation predict: SB3 {sb3_time * 1e6:.0f} us | NumPy {np_time * 1e6:.0f} us")
+env.close()
@@ -0,0 +1,97 @@
+"""
+Test the threaded capture/perceive/act pipeline
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from integration.capture import ReplayCapture
+from integration.pipeline import FrameRing, Pipeline, RateLimiter
+
+# Ring: the reader gets the newest frame, stale unread frames count as dropped
+ring = FrameRing(size=3)
+for i in range(5):
+    ring.put(np.full((4, 4, 3), i, dtype=np.uint8))
+slot, frame_id, _, frame = ring.acquire_latest(timeout=0)
+assert frame_id == 4 and (frame == 4).all()
+assert ring.dropped == 4
+# The checked-out slot is never overwritten
+for i in range(5, 10):
+    ring.put(np.full((4, 4, 3), i, dtype=np.uint8))
+assert (frame == 4).all()
+ring.release(slot)
+assert ring.acquire_latest(timeout=0)[1] == 9
+assert ring.acquire_latest(timeout=0.01) is None  # Nothing new
+
+# Rate limiter
+limiter = RateLimiter(100)
+start = time.perf_counter()
+for _ in range(20):
+    limiter.wait()
+elapsed = time.perf_counter() - start
+assert 0.18 <= elapsed < 0.4, elapsed
+
+# Pipeline with slow perception (20ms) and slow actions (50ms): capture keeps
+# running, perception always sees fresh frames, slow input never blocks it
+frames = [np.full((600, 800, 3), i, dtype=np.uint8) for i in range(256)]
+capture = ReplayCapture(frames)
+seen = []
+acted = []
+main_thread = threading.get_ident()
+
+
+def perceive(frame, frame_id, timestamp):
+    seen.append((frame_id, int(frame[0, 0, 0])))
+    time.sleep(0.02)
+    return frame_id
+
+
+def act(action):
+    acted.append((action, threading.get_ident()))
+    time.sleep(0.05)
+
+
+with Pipeline(capture.grab, perceive, act, capture_hz=200, perceive_hz=None, act_hz=None) as pipeline:
+    time.sleep(1.0)
+stats = pipeline.stats()
+print(f"Pipeline stats: {stats}")
+
+assert pipeline.error is None
+assert stats["captured"] > stats["perceived"] > stats["acted"] > 0
+assert stats["dropped_frames"] > 0 and stats["dropped_actions"] > 0
+# Frame ids only move forward and each frame's pixels match its id
+ids = [frame_id for frame_id, _ in seen]
+assert ids == sorted(ids) and len(set(ids)) == len(ids)
+assert all(value == frame_id % 256 for frame_id, value in seen)
+# Perception ran at its own pace (~50 Hz), not capture's plus input's
+assert stats["perceived"] > 30
+assert all(thread != main_thread for _, thread in acted)
+
+# Sequential loop for comparison: every stage in turn
+start = time.perf_counter()
+iterations = 0
+while time.perf_counter() - start < 1.0:
+    frame = capture.grab()
+    act(perceive(frame, iterations, time.perf_counter()))
+    iterations += 1
+print(f"Sequential loop: {iterations} decisions/s; pipelined: {stats['perceived']} perceived, {stats['acted']} acted")
+assert stats["perceived"] > iterations
+
+# Stage rate limits
+with Pipeline(capture.grab, lambda *args: None, act, capture_hz=50, perceive_hz=20) as limited:
+    time.sleep(1.0)
+limited_stats = limited.stats()
+print(f"Rate-limited: {limited_stats['capture_fps']:.0f} captures/s, {limited_stats['perceive_fps']:.0f} perceptions/s")
+assert 40 <= limited_stats["captured"] <= 65 and 15 <= limited_stats["perceived"] <= 28
+
+# A failing stage stops the pipeline and reports the error
+def broken(*args):
+    raise RuntimeError("detector crashed")
+
+
+pipeline = Pipeline(capture.grab, broken, act).start()
+time.sleep(0.3)
+assert not pipeline.running and isinstance(pipeline.error, RuntimeError)
+pipeline.stop()
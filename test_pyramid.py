@@ -0,0 +1,113 @@
+"""
+Test coarse-to-fine detection on an image pyramid: accuracy and latency of the
+balloon, start button and track detectors at each detection scale
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from integration import BTD6Integration
+from integration.frame import FrameContext, as_frame
+from integration.pyramid import ImagePyramid
+from synthetic_maps import DARK_GRASS, distance_to_polyline, draw_map
+
+COLOURS = {
+    "red": (0, 0, 230),
+    "blue": (230, 120, 20),
+    "green": (20, 200, 20),
+    "yellow": (0, 220, 250),
+    "pink": (180, 100, 250),
+    "black": (10, 10, 10),
+    "white": (250, 250, 250),
+}
+SCALES = [1.0, 0.75, 0.5, 0.33, 0.25]
+
+
+def timed(function, repeats=5):
+    """Best wall time in ms and the last result"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+# Pyramid levels are built once per frame and per interpolation
+frame = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+pyramid = ImagePyramid(frame)
+assert pyramid.level(1.0) is frame
+half = pyramid.level(0.5)
+assert half.shape == (540, 960, 3) and pyramid.level(0.5) is half
+assert pyramid.level(0.5, cv2.INTER_NEAREST) is not half
+assert pyramid.size_at(0.33) == (634, 356)
+# Detectors wrap whatever they are given in a FrameContext, keeping built levels
+context = as_frame(pyramid)
+assert isinstance(context, FrameContext) and context.level(0.5) is half and as_frame(context) is context
+
+# 1080p map: the simulator path scaled up and the start button in the
+# bottom-right corner; the track is traced on the empty map, the balloons of
+# every colour along it are detected on the frame
+centreline = [(0, 540), (480, 540), (960, 360), (1440, 540), (1919, 540)]
+empty_map = draw_map(centreline, size=(1920, 1080), thickness=70, background=DARK_GRASS)
+button = (1800, 1000)
+cv2.rectangle(empty_map, (button[0] - 60, button[1] - 35), (button[0] + 60, button[1] + 35), (40, 200, 60), -1)
+screen = empty_map.copy()
+truth = []
+for i, x in enumerate(range(100, 1900, 120)):
+    y = int(np.interp(x, [c[0] for c in centreline], [c[1] for c in centreline]))
+    colour = list(COLOURS)[i % len(COLOURS)]
+    cv2.circle(screen, (x, y), 22, COLOURS[colour], -1)
+    truth.append((x, y, colour))
+
+print(f"{'scale':>6} {'balloons':>9} {'pos err':>8} {'ms':>6} {'button err':>11} {'ms':>6} {'track err':>10} {'ms':>6}")
+reference = None
+for scale in SCALES:
+    integration = BTD6Integration(detection_scale=scale)
+    integration.calibrate_track_roi(screen)
+
+    # A fresh pyramid each call: the latency includes building the level
+    balloon_ms, balloons = timed(lambda: integration.detect_balloons(ImagePyramid(screen)))
+    button_ms, found = timed(lambda: integration.detect_start_round_button(ImagePyramid(screen)))
+    track_ms, path = timed(lambda: integration.detect_track_path(ImagePyramid(empty_map)), repeats=2)
+
+    recall = sum(any(b["type"] == c and abs(b["x"] - x) <= 3 and abs(b["y"] - y) <= 3 for b in balloons) for x, y, c in truth)
+    errors = [min(np.hypot(b["x"] - x, b["y"] - y) for b in balloons) for x, y, _ in truth]
+    button_error = np.hypot(found[0] - button[0], found[1] - button[1])
+    track_error = max(distance_to_polyline(p, centreline) for p in path)
+    print(
+        f"{scale:>6} {recall:>4}/{len(truth):<4} {np.mean(errors):>8.2f} {balloon_ms:>6.1f} "
+        f"{button_error:>11.1f} {button_ms:>6.1f} {track_error:>10.1f} {track_ms:>6.0f}"
+    )
+
+    # Refinement at full resolution: every balloon found, same measurements as
+    # the full-resolution detector
+    assert recall == len(truth), (scale, recall)
+    if reference is None:
+        reference = sorted((b["x"], b["y"], b["type"], b["area"]) for b in balloons)
+    assert sorted((b["x"], b["y"], b["type"], b["area"]) for b in balloons) == reference, scale
+    assert button_error <= 1, (scale, found)
+    # The coarse track is within a few full-resolution pixels of the centreline
+    # and still runs from border to border
+    assert track_error <= 8, (scale, track_error)
+    assert path[0][0] == 0 and path[-1][0] == 1919, (scale, path)
+
+# Recalibrating on another map rebuilds the coarse ROI: balloons on the new
+# (mirrored) track are found
+integration = BTD6Integration(detection_scale=0.5)
+integration.calibrate_track_roi(screen)
+assert len(integration.detect_balloons(screen)) == len(truth)
+mirrored = screen[::-1].copy()
+integration.calibrate_track_roi(mirrored)
+found = integration.detect_balloons(mirrored)
+assert sorted((b["x"], b["y"]) for b in found) == sorted((x, 1079 - y) for x, y, _ in truth), found
+
+# Nothing on screen: no candidates, no refinement windows
+empty = np.zeros((1080, 1920, 3), dtype=np.uint8)
+empty[:] = DARK_GRASS
+assert BTD6Integration().detect_balloons(empty) == []
+assert BTD6Integration().detect_start_round_button(empty) is None
+
+print("\n✓ Image pyramid test passed!")
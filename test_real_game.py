@@ -3,11 +3,20 @@ Autonomous AI BTD6 Player
 The AI observes the game and makes decisions independently
 """
 
+import os
+import threading
 import time
 import pyautogui
 from integration import BTD6Integration
+from integration.pipeline import Pipeline
+from integration.frame import FrameContext
+from integration.tracker import BalloonTracker, TrackPath
 import keyboard
-from stable_baselines3 import PPO
+from ai.coverage import coverage_map
+from ai.numpy_policy import NumpyPolicy
+from game.entities import BalloonType
+from game.game import BTD6Game
+from game.whatif import create_pool
 import numpy as np
 import cv2
 
@@ -49,21 +58,30 @@ game_region = (
 print(f"\n✅ Game region: {game_region}")
 
 # Initialize integration
-integration = BTD6Integration(game_window_region=game_region)
+# Detectors search a half-resolution level, candidates are refined at full resolution
+integration = BTD6Integration(game_window_region=game_region, detection_scale=0.5)
 
 print("\n🤖 LOADING AI MODEL:")
 print("-" * 60)
 
 try:
-    model = PPO.load("models/btd6_test_final.zip")
+    # Prefer the exported NumPy policy: no torch import, microsecond inference
+    if os.path.exists("models/btd6_test_final.npz"):
+        model = NumpyPolicy.load("models/btd6_test_final.npz")
+    else:
+        from stable_baselines3 import PPO
+
+        model = PPO.load("models/btd6_test_final.zip")
     print("✅ Model loaded successfully")
 except FileNotFoundError:
     print("❌ No trained model found. Run: python train_quick.py")
     exit(1)
 
-# Game state tracking
+# Game state tracking: shared by the perception and action threads (and the
+# status line), so read and written under state_lock
+state_lock = threading.Lock()
 placed_towers = []
-current_lives = 100
+current_lives = 100  # Until the HUD is read
 current_money = 650  # Starting money on Easy
 round_number = 1
 round_in_progress = False
@@ -82,6 +100,10 @@ def _on_press(key):
     except AttributeError:
         pass
 
+# What-if workers are forked once, before the listener and pipeline threads start
+# (forking a multithreaded process can deadlock), and reused for every placement
+whatif_pool = create_pool(2)
+
 listener = keyboard.Listener(on_press=_on_press)
 listener.start()
 
@@ -92,35 +114,37 @@ tiles_x = 800 // grid_resolution  # 80 tiles
 tiles_y = 600 // grid_resolution  # 60 tiles
 num_actions = tiles_x * tiles_y + 1  # +1 for do nothing (matches env.py)
 
-def action_to_position(action: int):
-    """Convert action index to screen position"""
+def action_to_sim_position(action: int):
+    """Convert action index to a position in the 800x600 training space"""
     tile_x = action % tiles_x
     tile_y = action // tiles_x
-    # Convert tile to pixel in 800x600 space
-    x = tile_x * grid_resolution + grid_resolution // 2
-    y = tile_y * grid_resolution + grid_resolution // 2
+    return tile_x * grid_resolution + grid_resolution // 2, tile_y * grid_resolution + grid_resolution // 2
+
+def action_to_position(action: int):
+    """Convert action index to screen position"""
+    x, y = action_to_sim_position(action)
     # Scale to actual game region
     scale_x = game_region[2] / 800
     scale_y = game_region[3] / 600
     return int(x * scale_x), int(y * scale_y)
 
-def build_observation(balloons_list, towers_list, lives=100, money=650, game_state=1):
+def build_observation(balloons_list, positions, towers_list, lives=100, money=650, game_state=1, round_index=1):
     """Build observation for the AI model (must match env.py format)"""
     max_balloons = 100
     max_towers = 10
-    # Training env uses 800x600
-    width = 800
-    height = 600
     obs = []
 
-    # Balloon data: x, y, health, type (raw pixel values, not normalized)
+    # Balloon data: x, y, health, type (raw pixel values, not normalized). Tracked
+    # balloons come oldest first, like the simulator's spawn order, and positions
+    # are on the simulator's path at the same track progress (BalloonTracker)
     for i in range(max_balloons):
         if i < len(balloons_list):
             b = balloons_list[i]
-            # Scale detected positions to 800x600 space
-            scale_x = width / game_region[2]
-            scale_y = height / game_region[3]
-            obs.extend([b["x"] * scale_x, b["y"] * scale_y, 1, 1])  # health=1, type=1
+            # Detected colour -> simulator type and health (ceramics take 10 hits)
+            balloon_type = BalloonType[b.type.upper()]
+            health = 10 if balloon_type == BalloonType.CERAMIC else 1
+            x, y = positions[i]
+            obs.extend([x, y, health, balloon_type.value])
         else:
             obs.extend([0, 0, 0, 0])
 
@@ -134,17 +158,74 @@ def build_observation(balloons_list, towers_list, lives=100, money=650, game_sta
             obs.extend([0, 0])
 
     # Game info: lives, round, state (raw values like env.py)
-    obs.extend([lives, round_number, game_state])
+    obs.extend([lives, round_index, game_state])
     return np.array(obs, dtype=np.float32)
 
+# Simulator mirror of the live game: our towers, the tracked balloons at the same
+# track progress and the HUD lives and cash. Before placing, the policy's tile is
+# compared with the best-covering tiles by playing each out in copies of the
+# mirror (whatif_pool), within a budget that fits between frames. Balloons still
+# to come in the real wave are not visible, so the what-if covers the balloons on
+# screen; with none on screen it plays the simulator's next wave instead
+mirror = BTD6Game(starting_cash=10 * BTD6Game.TOWER_COST)
+SIM_PATH = [(p.x, p.y) for p in mirror.balloon_path]
+SIM_TRACK = TrackPath(SIM_PATH)
+coverage = coverage_map(mirror, grid_resolution)
+WHATIF_CANDIDATES = 8
+WHATIF_DEADLINE = 0.08  # Seconds
+DART_MONKEY_COST = 200  # Real-game price; the simulator charges BTD6Game.TOWER_COST
+
+def live_scenario() -> dict:
+    """The real game's current state as a snapshot() dictionary for the mirror"""
+    with state_lock:
+        towers = list(placed_towers)
+        balloons, positions = list(detected_balloons), detected_positions
+        lives, cash = current_lives, current_money
+    scenario = {
+        "lives": lives,
+        # The same number of dart monkeys is affordable in both games
+        "cash": cash * BTD6Game.TOWER_COST // DART_MONKEY_COST,
+        "towers": [{"x": x, "y": y} for x, y in towers],
+        "balloons": [],
+    }
+    if balloons:
+        # Only the balloons on screen: the wave counts as fully spawned
+        scenario["spawn_index"] = len(mirror.round_waves[0])
+        arcs, _ = SIM_TRACK.project(positions)
+        for balloon, (x, y), arc in zip(balloons, positions, arcs):
+            balloon_type = BalloonType[balloon.type.upper()]
+            segment = min(int(np.searchsorted(SIM_TRACK.cumulative, arc, side="right")) - 1, len(SIM_PATH) - 2)
+            scenario["balloons"].append({
+                "type": balloon_type.name,
+                "x": float(x),
+                "y": float(y),
+                "health": 10 if balloon_type == BalloonType.CERAMIC else 1,
+                "path_index": segment,
+                "progress_on_path": float((arc - SIM_TRACK.cumulative[segment]) / SIM_TRACK.segment_lengths[segment]),
+            })
+    return scenario
+
+def choose_placement(action: int) -> int:
+    """Return the candidate action that leaks the fewest lives in the mirror"""
+    mirror.reset(scenario=live_scenario())
+
+    scores = np.where(coverage.legal, coverage.length, -1).ravel()
+    actions = [action] + [int(a) for a in np.argsort(-scores)[:WHATIF_CANDIDATES] if a != action]
+    positions = [action_to_sim_position(a) for a in actions]
+    outcomes = mirror.evaluate_candidates(positions, deadline=WHATIF_DEADLINE, pool=whatif_pool)
+    if not outcomes or not outcomes[0]["legal"]:
+        return action
+    return actions[positions.index(outcomes[0]["candidate"])]
+
 def place_tower_with_keybind(x, y):
     """Place tower using 'z' keybind then click"""
     global current_money, money_spent
     
     # Cost of dart monkey
-    tower_cost = 200
-    if current_money < tower_cost:
-        return False
+    tower_cost = DART_MONKEY_COST
+    with state_lock:
+        if current_money < tower_cost:
+            return False
     
     try:
         # Press 'z' to select dart monkey
@@ -158,36 +239,118 @@ def place_tower_with_keybind(x, y):
         time.sleep(0.2)
         
         # Update money
-        current_money -= tower_cost
-        money_spent += tower_cost
+        with state_lock:
+            current_money -= tower_cost
+            money_spent += tower_cost
         
         return True
     except Exception as e:
         print(f"❌ Tower placement failed: {e}")
         return False
 
-def try_start_round():
+def try_start_round(screen):
     """Attempt to start the next round"""
     global round_in_progress, last_round_start_time, round_number
     
     # Don't spam start
-    if time.time() - last_round_start_time < 5:
-        return False
+    with state_lock:
+        if time.time() - last_round_start_time < 5:
+            return False
     
     try:
         # Try to find and click start button
-        used_click = integration.start_round_auto()
+        used_click = integration.start_round_auto(screen)
         if used_click or True:  # Always attempt
-            round_in_progress = True
-            last_round_start_time = time.time()
-            round_number += 1
-            print(f"▶️ Starting round {round_number}")
+            with state_lock:
+                round_in_progress = True
+                last_round_start_time = time.time()
+                round_number += 1
+                started = round_number
+            print(f"▶️ Starting round {started}")
             return True
     except Exception as e:
         print(f"❌ Failed to start round: {e}")
     
     return False
 
+frame_count = 0
+detected_balloons = []
+detected_positions = np.zeros((0, 2))  # Tracked balloons on the simulator path
+
+def read_hud(screen):
+    """Update lives, cash and round from the HUD; values that could not be read are kept"""
+    global current_lives, current_money, round_number
+    hud = integration.read_hud(screen)
+    with state_lock:
+        if hud["lives"] is not None:
+            current_lives = hud["lives"]
+        if hud["cash"] is not None:
+            current_money = hud["cash"]
+        if hud["round"] is not None:
+            round_number = hud["round"]
+
+def perceive(screen, frame_id, timestamp):
+    """Perception stage: detect, build the observation and decide (runs on the freshest frame)"""
+    global frame_count, detected_balloons, detected_positions, round_in_progress
+    with state_lock:
+        frame_count += 1
+        count = frame_count
+
+    # Conversions of this frame (pyramid levels, HSV, masks) are shared by every detector
+    frame = FrameContext(screen)
+
+    # Only HUD regions whose pixels changed are read again
+    read_hud(frame)
+
+    # Detections matched to tracked balloons: persistent ids and track progress
+    balloons = tracker.update(frame, timestamp)
+    positions = tracker.simulator_positions(SIM_PATH)
+    
+    with state_lock:
+        detected_balloons, detected_positions = balloons, positions
+        # Check if round is still active
+        if round_in_progress and len(balloons) == 0 and count % 30 == 0:
+            # Might be round over (the round reward shows up in the HUD cash)
+            round_in_progress = False
+        
+        # Determine game state: 1 = running, 0 = not started, 2 = won, 3 = lost
+        game_state = 1 if round_in_progress else 0
+        
+        # Build observation (must match training env format)
+        obs = build_observation(
+            balloons, positions, placed_towers, current_lives, current_money, game_state, round_number
+        )
+        waiting = not round_in_progress
+    
+    # Get AI decision
+    action, _ = model.predict(obs, deterministic=True)
+    action = int(action)
+    
+    if action < tiles_x * tiles_y:
+        return ("place", action)
+    # Action == tiles_x * tiles_y is "do nothing" in env.py
+    # Auto-start rounds when not in progress to keep game moving
+    if waiting and count % 50 == 0:
+        # The frame buffer is reused once perception returns
+        return ("start_round", screen.copy())
+    return None
+
+def act(decision):
+    """Action stage: mouse/keyboard input, off the perception thread"""
+    kind, value = decision
+    if kind == "start_round":
+        try_start_round(value)
+        return
+
+    action = choose_placement(value)
+    x, y = action_to_position(action)
+    if place_tower_with_keybind(x, y):
+        # Store tower position in 800x600 space for observation
+        with state_lock:
+            placed_towers.append(action_to_sim_position(action))
+            towers, money = len(placed_towers), current_money
+        print(f"🗼 Placed tower #{towers} at ({x}, {y}) | Money: ${money}")
+
 print("\n🎮 AUTONOMOUS AI GAMEPLAY:")
 print("-" * 60)
 print("The AI will now play autonomously!")
@@ -195,71 +358,74 @@ print("Press 'q' to stop the AI at any time")
 print("\nStarting in 3 seconds...")
 time.sleep(3)
 
-# Main AI loop
-frame_count = 0
+# Map geometry (track, placement mask) is extracted once per map and resolution and
+# cached in cache/tracks, so later sessions on the same map skip it
+first_frame = FrameContext(integration.capture_screen().copy())
+start = time.time()
+geometry = integration.load_track_geometry(first_frame)
+print(f"🗺️ Track: {len(geometry.path)} points ({(time.time() - start) * 1000:.0f} ms)")
+
+# Lives, cash and round come from the HUD (regions are kept with the map geometry)
+hud_regions = integration.locate_hud(first_frame)
+print(f"🔢 HUD regions: {', '.join(hud_regions) or 'none found'}")
+
+# Balloons only appear on the track: find it once on the start screen (no balloons
+# yet) and only scan that part of each frame from now on
+roi_stats = integration.calibrate_track_roi(first_frame).stats()
+print(f"🛤️ Track ROI: scanning {roi_stats['roi_pixels']} of {roi_stats['frame_pixels']} pixels "
+      f"({roi_stats['saved_fraction']:.0%} skipped)")
+tracker = BalloonTracker(geometry.path, integration.detect_balloons)
+
+# Capture, perception and input run in their own threads (integration/pipeline.py):
+# slow clicks no longer delay the next detection, and stale frames are skipped
+pipeline = Pipeline(
+    integration.capture_screen,
+    perceive,
+    act,
+    capture_hz=30,
+    perceive_hz=10,
+    act_hz=5,
+)
+status_time = time.time()
 try:
-    while True:
+    pipeline.start()
+    while pipeline.running:
         # Check for quit
         if quit_flag:
             print("\n⏹️ Stopped by user")
             break
         
-        frame_count += 1
-        
-        # Capture game state
-        screen = integration.capture_screen()
-        detected_balloons = integration.detect_balloons(screen)
-        
-        # Check if round is still active
-        if round_in_progress and len(detected_balloons) == 0 and frame_count % 30 == 0:
-            # Might be round over
-            round_in_progress = False
-            current_money += 100  # Rough estimate of round reward
-        
-        # Determine game state: 1 = running, 0 = not started, 2 = won, 3 = lost
-        game_state = 1 if round_in_progress else 0
-        
-        # Build observation (must match training env format)
-        obs = build_observation(detected_balloons, placed_towers, current_lives, current_money, game_state)
-        
-        # Get AI decision
-        action, _ = model.predict(obs, deterministic=True)
-        action = int(action)
-        
-        # Execute action
-        if action < tiles_x * tiles_y:
-            # Place tower action
-            x, y = action_to_position(action)
-            if place_tower_with_keybind(x, y):
-                # Store tower position in 800x600 space for observation
-                tile_x = action % tiles_x
-                tile_y = action // tiles_x
-                tower_x = tile_x * grid_resolution + grid_resolution // 2
-                tower_y = tile_y * grid_resolution + grid_resolution // 2
-                placed_towers.append((tower_x, tower_y))
-                print(f"🗼 Placed tower #{len(placed_towers)} at ({x}, {y}) | Money: ${current_money}")
-        
-        # Action == tiles_x * tiles_y is "do nothing" in env.py
-        # Auto-start rounds when not in progress to keep game moving
-        if not round_in_progress and frame_count % 50 == 0:
-            try_start_round()
-        
-        # Status update every 50 frames
-        if frame_count % 50 == 0:
-            print(f"📊 Status: Round {round_number} | Towers: {len(placed_towers)} | Balloons: {len(detected_balloons)} | Money: ${current_money}")
-        
-        # Control frame rate
         time.sleep(0.1)
+        if time.time() - status_time < 5:
+            continue
+        status_time = time.time()
+        stats = pipeline.stats()
+        with state_lock:
+            status = (
+                f"📊 Status: Round {round_number} | Towers: {len(placed_towers)} | Balloons: {len(detected_balloons)} "
+                f"| Lives: {current_lives} | Money: ${current_money}"
+            )
+            frames = frame_count
+        print(
+            f"{status} | {stats['perceive_fps']:.1f} fps, "
+            f"{stats['dropped_frames']} dropped frames, {tracker.counts['detections']} detections"
+        )
         
         # Safety limit
-        if frame_count > 10000:
+        if frames > 10000:
             print("\n⏱️ Frame limit reached")
             break
 
 except KeyboardInterrupt:
     print("\n⏹️ Interrupted by user")
 finally:
+    pipeline.stop()
     listener.stop()
+    if whatif_pool is not None:
+        whatif_pool.terminate()
+
+if pipeline.error is not None:
+    print(f"❌ Pipeline stopped: {pipeline.error!r}")
 
 print("\n" + "=" * 60)
 print("📊 GAME SUMMARY:")
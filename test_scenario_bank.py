@@ -0,0 +1,54 @@
+"""
+Test the memory-mapped scenario bank
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ai.env import BTD6Env
+from ai.scenario_bank import ScenarioBank, decode_scenario, encode_scenario, generate_scenario_bank
+from game.game import BTD6Game
+
+path = os.path.join(tempfile.mkdtemp(), "scenarios.npy")
+
+start = time.perf_counter()
+generate_scenario_bank(path, count=200, seed=0)
+print(f"Generated 200 scenarios in {time.perf_counter() - start:.2f}s ({os.path.getsize(path) / 1024:.0f} KB)")
+
+bank = ScenarioBank(path)
+assert len(bank) == 200
+assert isinstance(bank.rows, np.memmap), "Bank is not memory-mapped"
+
+towers = [len(bank.scenario(i)["towers"]) for i in range(len(bank))]
+balloons = [len(bank.scenario(i)["balloons"]) for i in range(len(bank))]
+print(f"Towers per scenario: {min(towers)}-{max(towers)}, balloons in flight: {min(balloons)}-{max(balloons)}")
+assert max(towers) > 0 and max(balloons) > 0
+# Spawn progress varies within the wave; the simulator has round 1 only
+spawned = {bank.scenario(i)["balloons_spawned"] for i in range(len(bank))}
+assert len(spawned) > 3, spawned
+assert {bank.scenario(i)["round"] for i in range(len(bank))} == {1}
+
+# Encoding round-trips through a game restore
+scenario = bank.scenario(int(np.argmax(balloons)))
+game = BTD6Game()
+game.reset(scenario=scenario)
+assert encode_scenario(game.snapshot()).tobytes() == bank.rows[int(np.argmax(balloons))].tobytes()
+assert decode_scenario(encode_scenario(game.snapshot())) == scenario
+
+# Environment samples from the bank on reset
+env = BTD6Env(scenario_bank=path)
+env.reset(seed=0)
+sampled = [env.reset()[0] for _ in range(20)]
+assert len({obs.tobytes() for obs in sampled}) > 1, "Resets did not sample different scenarios"
+
+obs, _ = env.reset(options={"scenario_index": 5})
+assert len(env.game.towers) == len(bank.scenario(5)["towers"])
+
+start = time.perf_counter()
+for _ in range(1000):
+    env.reset()
+print(f"Reset from bank: {(time.perf_counter() - start) * 1000:.0f} us per reset")
+env.close()
@@ -0,0 +1,86 @@
+"""
+Startup budget for the simulation-only path
+
+A headless simulation worker only needs game + ai.env. Importing them must not
+load training, rendering or screen-control dependencies, must not touch the
+filesystem, and must stay within the import-time budget below.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+STARTUP_BUDGET_S = 1.0  # Import time for game + ai.env, best of RUNS
+RUNS = 5
+HEAVY_MODULES = ["torch", "stable_baselines3", "pygame", "pyautogui", "PIL", "cv2"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import game
+from ai.env import BTD6Env
+elapsed = time.perf_counter() - start
+env = BTD6Env()
+env.reset()
+print(elapsed)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+repo_root = os.path.dirname(os.path.abspath(__file__))
+workdir = tempfile.mkdtemp()  # Run elsewhere so stray directories would be noticed
+env = dict(os.environ, PYTHONPATH=repo_root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+timings = []
+for run in range(RUNS):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    timings.append(float(output[0]))
+    loaded = [m for m in output[1].split(",") if m]
+    assert not loaded, f"Simulation path imported heavy modules: {loaded}"
+
+assert os.listdir(workdir) == [], f"Import created files: {os.listdir(workdir)}"
+
+# Show the slowest imports to help when the budget is exceeded
+importtime = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", "import game; from ai.env import BTD6Env"],
+    cwd=workdir,
+    env=env,
+    capture_output=True,
+    text=True,
+).stderr.splitlines()
+cumulative_by_module = {}
+for line in importtime:
+    parts = line.split("|")
+    if len(parts) == 3 and parts[1].strip().isdigit():
+        name = parts[2].strip()
+        cumulative_by_module[name] = max(cumulative_by_module.get(name, 0), int(parts[1]))
+print("Slowest imports (cumulative):")
+for name, cumulative in sorted(cumulative_by_module.items(), key=lambda item: -item[1])[:5]:
+    print(f"  {cumulative / 1e6:.3f}s  {name}")
+
+best = min(timings)
+print(f"\nSimulation-only import time: best {best:.3f}s, worst {max(timings):.3f}s (budget {STARTUP_BUDGET_S:.1f}s)")
+assert best <= STARTUP_BUDGET_S, f"Startup budget exceeded: {best:.3f}s > {STARTUP_BUDGET_S:.1f}s"
+print("No heavy modules loaded, no files created")
+
+# The training entry points are exported lazily, under names that do not clash
+# with the ai.train submodule (from ai import train gives the submodule)
+EXPORTS = """
+import sys
+import ai
+assert "stable_baselines3" not in sys.modules
+from ai import evaluate, evaluate_model, train_model
+import ai.train
+from ai import train
+assert train is ai.train and train_model is ai.train.train
+assert evaluate is ai.train.evaluate and evaluate_model is ai.train.evaluate_model
+"""
+subprocess.run([sys.executable, "-c", EXPORTS], cwd=workdir, env=env, check=True)
+print("Training entry points: ai.train_model, ai.evaluate, ai.evaluate_model")
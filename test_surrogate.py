@@ -0,0 +1,40 @@
+"""
+Test the surrogate outcome model against full simulation
+"""
+
+import time
+
+from ai.layout_optimizer import optimize_layout
+from ai.surrogate import layout_features, precision_recall, sample_layouts, simulate_layouts, train_surrogate
+
+# Rollouts run in spawned workers, which re-import this file
+if __name__ == "__main__":
+    # More coverage means more shots at every balloon
+    near = layout_features([(100, 250)])
+    far = layout_features([(700, 550)])
+    print(f"Near-track features: {near.round(3)}")
+    print(f"Far-from-track features: {far.round(3)}")
+    assert near[2] > far[2] and near[6] > far[6]
+
+    surrogate = train_surrogate(samples=256, workers=2, seed=0)
+
+    layouts = sample_layouts(200, n_towers=2, seed=1000)
+    start = time.perf_counter()
+    results = simulate_layouts(layouts, workers=1)
+    simulate_time = time.perf_counter() - start
+    start = time.perf_counter()
+    surrogate.rank(layouts)
+    rank_time = time.perf_counter() - start
+    print(f"Full simulation: {simulate_time * 1000:.0f}ms, surrogate ranking: {rank_time * 1000:.0f}ms")
+
+    stats = precision_recall(surrogate, layouts, results, keep=0.25)
+    print(
+        f"Kept {stats['kept']}/{len(layouts)}: precision {stats['precision']:.2f} "
+        f"(base rate {stats['base_rate']:.2f}), recall {stats['recall']:.2f}"
+    )
+    assert stats["precision"] > stats["base_rate"]
+    assert rank_time < simulate_time
+
+    result = optimize_layout(n_towers=1, time_budget=3.0, population_size=16, workers=2, surrogate=surrogate)
+    print(f"Prefiltered search: {result['evaluations']} simulations -> {result['best']}")
+    assert result["best"]["won"]
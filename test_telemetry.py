@@ -0,0 +1,84 @@
+"""
+Test the training telemetry: one CSV row per PPO iteration and a Prometheus
+text file with the latest totals
+"""
+
+import csv
+import os
+import tempfile
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from ai.callbacks import TelemetryCallback
+from ai.env import BTD6Env
+
+N_ENVS, N_STEPS, ITERATIONS = 2, 64, 3
+
+logs = tempfile.mkdtemp()
+env = DummyVecEnv([lambda: BTD6Env(render_mode=None)] * N_ENVS)
+model = PPO("MlpPolicy", env, n_steps=N_STEPS, batch_size=64, n_epochs=1, seed=0, verbose=0)
+telemetry = TelemetryCallback(logs, name="run")
+model.learn(total_timesteps=N_ENVS * N_STEPS * ITERATIONS, callback=telemetry)
+
+# CSV: a header, then one row per rollout/update cycle
+assert os.path.exists(telemetry.csv_path) and telemetry.csv_path == os.path.join(logs, "run.csv")
+with open(telemetry.csv_path, newline="") as f:
+    rows = list(csv.DictReader(f))
+assert list(rows[0]) == [
+    "iteration",
+    "timesteps",
+    "wall_time",
+    "sps",
+    "rollout_time",
+    "update_time",
+    "place_time",
+    "simulate_time",
+    "observe_time",
+    "reward_time",
+    "episodes",
+    "episode_length_mean",
+    "episode_length_min",
+    "episode_length_max",
+], list(rows[0])
+assert len(rows) == ITERATIONS and telemetry.iteration == ITERATIONS
+assert [int(r["iteration"]) for r in rows] == list(range(1, ITERATIONS + 1))
+assert [int(r["timesteps"]) for r in rows] == [N_ENVS * N_STEPS * (i + 1) for i in range(ITERATIONS)]
+wall_times = [float(r["wall_time"]) for r in rows]
+assert wall_times == sorted(wall_times)
+for row in rows:
+    assert float(row["sps"]) > 0
+    assert float(row["rollout_time"]) > 0 and float(row["update_time"]) > 0
+    # The engine phases are timed inside the rollout
+    assert 0 < float(row["simulate_time"]) <= float(row["rollout_time"])
+print(f"✓ {len(rows)} CSV rows, {rows[-1]['sps']} steps/s in the last iteration")
+
+# Episodes are counted where they finish and their lengths summarised
+episodes = sum(int(r["episodes"]) for r in rows)
+assert episodes == telemetry.episodes_total
+for row in rows:
+    if int(row["episodes"]):
+        assert int(row["episode_length_min"]) <= float(row["episode_length_mean"]) <= int(row["episode_length_max"])
+    else:
+        assert row["episode_length_mean"] == row["episode_length_min"] == row["episode_length_max"] == ""
+
+# Prometheus text file: the latest totals, no temporary file left behind
+assert os.path.exists(telemetry.prom_path) and not os.path.exists(telemetry.prom_path + ".tmp")
+metrics = {}
+with open(telemetry.prom_path) as f:
+    for line in f:
+        if line.strip() and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            metrics[name] = float(value)
+assert metrics["btd6_env_steps_total"] == N_ENVS * N_STEPS * ITERATIONS
+assert abs(metrics["btd6_steps_per_second"] - float(rows[-1]["sps"])) <= 0.05
+assert metrics["btd6_rollout_seconds_total"] > 0 and metrics["btd6_update_seconds_total"] > 0
+for phase in TelemetryCallback.PHASES:
+    assert f'btd6_env_phase_seconds_total{{phase="{phase}"}}' in metrics, phase
+assert metrics['btd6_env_phase_seconds_total{phase="simulate"}'] > 0
+assert metrics["btd6_episodes_total"] == episodes
+if int(rows[-1]["episodes"]):
+    assert metrics["btd6_episode_length_count"] == int(rows[-1]["episodes"])
+print(f"✓ Prometheus metrics: {len(metrics)} samples, {episodes} episodes finished")
+
+print("\n✓ Telemetry test passed!")
@@ -0,0 +1,80 @@
+"""
+Test the on-disk map geometry cache (track polyline, masks, HUD layout)
+"""
+
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from integration import BTD6Integration
+from integration.track_cache import TrackCache, hash_distance, perceptual_hash
+from synthetic_maps import draw_map
+
+
+def make_map(path, size=(1280, 720)):
+    screen = draw_map(path, size=size, thickness=50)
+    cv2.rectangle(screen, (20, 20), (200, 60), (40, 40, 40), -1)  # HUD panel
+    return screen
+
+
+meadow = make_map([(0, 360), (320, 360), (640, 240), (960, 360), (1280, 360)])
+other_map = make_map([(640, 0), (640, 300), (300, 500), (300, 720)])
+
+# Same map with balloons on the track and different HUD numbers: nearly the same hash
+busy = meadow.copy()
+for x in (100, 400, 900):
+    cv2.circle(busy, (x, 355), 14, (0, 0, 230), -1)
+cv2.putText(busy, "150", (30, 55), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+same, different = hash_distance(perceptual_hash(meadow), perceptual_hash(busy)), hash_distance(
+    perceptual_hash(meadow), perceptual_hash(other_map)
+)
+print(f"Hash distance: same map {same} bits, other map {different} bits")
+assert same < TrackCache().max_distance < different
+
+with tempfile.TemporaryDirectory() as tmp:
+    # First session: geometry is extracted and written
+    integration = BTD6Integration(track_cache=TrackCache(tmp))
+    start = time.perf_counter()
+    geometry = integration.load_track_geometry(meadow)
+    extract_ms = (time.perf_counter() - start) * 1000
+    assert len(os.listdir(tmp)) == 1
+    assert geometry.resolution == (1280, 720) and len(geometry.path) >= 3
+    assert geometry.track_mask[360, 100] and not geometry.placement_mask[360, 100]
+    assert geometry.placement_mask[600, 100] and not geometry.placement_mask[395, 100]
+
+    # Later session, any frame of the same map: loaded from disk
+    later = BTD6Integration(track_cache=TrackCache(tmp))
+    start = time.perf_counter()
+    cached = later.load_track_geometry(busy)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"Extract: {extract_ms:.0f} ms, load from cache: {load_ms:.1f} ms")
+    assert cached.path == geometry.path
+    assert np.array_equal(cached.track_mask, geometry.track_mask)
+    assert np.array_equal(cached.placement_mask, geometry.placement_mask)
+    assert load_ms < extract_ms
+    assert len(os.listdir(tmp)) == 1
+
+    # The ROI can be built from the cached mask
+    roi = later.calibrate_track_roi(busy)
+    assert roi.mask[360, 100] and not roi.mask[650, 100]
+
+    # HUD layout is kept with the entry
+    cached.hud["lives"] = (30, 25, 60, 30)
+    later.track_cache.store(cached)
+    assert BTD6Integration(track_cache=TrackCache(tmp)).load_track_geometry(meadow).hud == {"lives": (30, 25, 60, 30)}
+
+    # Another map or another resolution is a miss
+    assert TrackCache(tmp).lookup(other_map) is None
+    assert TrackCache(tmp).lookup(cv2.resize(meadow, (1920, 1080))) is None
+    integration.load_track_geometry(other_map)
+    assert len(os.listdir(tmp)) == 2
+
+    # Without use_disk, entries only live in memory
+    memory_only = TrackCache(os.path.join(tmp, "unused"), use_disk=False)
+    BTD6Integration(track_cache=memory_only).load_track_geometry(meadow)
+    assert memory_only.lookup(busy) is not None and not os.path.exists(os.path.join(tmp, "unused"))
+
+print("\n✓ Track cache test passed!")
@@ -0,0 +1,80 @@
+"""
+Test track path extraction: thinning, graph tracing and Douglas-Peucker simplification
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from integration import BTD6Integration
+from integration.skeleton import SkeletonGraph, simplify_path, thin, trace_path
+from synthetic_maps import TRACK, distance_to_polyline, draw_map
+
+PATH = [(-50, 300), (200, 300), (400, 200), (600, 300), (800, 300), (850, 300)]
+
+
+# Thinning a thick line leaves a one-pixel-wide line down its middle
+bar = np.zeros((100, 300), np.uint8)
+cv2.line(bar, (50, 50), (250, 50), 1, 21)
+skeleton = thin(bar)
+rows = np.nonzero(skeleton)[0]
+assert skeleton.sum() > 150 and np.all(np.abs(rows - 50) <= 1), (skeleton.sum(), np.unique(rows))
+print(f"✓ Thinned a 21px bar to {skeleton.sum()} pixels")
+
+# A branch: the longest route runs end to end and drops the short spur
+tee = np.zeros((200, 400), np.uint8)
+cv2.line(tee, (20, 100), (380, 100), 1, 9)
+cv2.line(tee, (200, 100), (200, 150), 1, 9)
+graph = SkeletonGraph(thin(tee))
+assert len(graph.endpoints) == 3, graph.endpoints
+route = simplify_path(trace_path(thin(tee)))
+xs = [x for x, _ in route]
+assert min(xs) < 30 and max(xs) > 370 and all(y < 110 for _, y in route), route
+print(f"✓ Spur dropped: {route}")
+
+# 1080p map: the simulator path scaled up, a dead-end spur and grey rocks
+scale = np.array([1920 / 800, 1080 / 600])
+centreline = [tuple(np.array(p) * scale) for p in PATH]
+screen = draw_map(centreline, size=(1920, 1080), thickness=70)
+cv2.line(screen, (1200, 540), (1200, 800), TRACK, 50)
+for centre in ((300, 900), (1600, 150), (800, 950)):
+    cv2.circle(screen, centre, 40, (130, 130, 130), -1)
+
+integration = BTD6Integration()
+start = time.perf_counter()
+path = integration.detect_track_path(screen)
+elapsed = time.perf_counter() - start
+print(f"Traced 1920x1080 track in {elapsed * 1000:.0f} ms: {len(path)} points")
+print(f"  {path}")
+
+assert 4 <= len(path) <= 20, len(path)
+# Starts and ends where the track leaves the screen
+assert path[0][0] == 0 and abs(path[0][1] - 540) <= 3, path[0]
+assert path[-1][0] == 1919 and abs(path[-1][1] - 540) <= 3, path[-1]
+# Every point on the true centreline (the skeleton of a 70px-wide road cuts its
+# bends by a few pixels, like a balloon following the middle of the road would)
+assert all(distance_to_polyline(p, centreline) <= 8 for p in path), path
+# And the polyline follows the whole centreline, not a shortcut
+for p in np.linspace(0, 1, 50):
+    x = 1919 * p
+    y = np.interp(x, [c[0] for c in centreline], [c[1] for c in centreline])
+    assert distance_to_polyline((x, y), path) <= 8, (x, y)
+# Neither the spur nor the rocks end up in the path
+assert all(y < 600 for _, y in path)
+
+# Grey specks everywhere (scenery texture): still one route along the track, no zigzags
+noisy = screen.copy()
+noisy[np.random.default_rng(0).random(noisy.shape[:2]) < 0.02] = (128, 128, 128)
+start = time.perf_counter()
+noisy_path = integration.detect_track_path(noisy)
+print(f"Traced noisy track in {(time.perf_counter() - start) * 1000:.0f} ms: {len(noisy_path)} points")
+assert noisy_path[0][0] == 0 and noisy_path[-1][0] == 1919
+assert all(b[0] >= a[0] for a, b in zip(noisy_path[:-1], noisy_path[1:])), noisy_path
+assert all(distance_to_polyline(p, centreline) <= 12 for p in noisy_path)
+
+# Epsilon controls how closely the polyline follows the traced pixels
+coarse = integration.detect_track_path(screen, epsilon=20.0)
+assert len(coarse) <= len(path)
+
+print("\n✓ Track path test passed!")
@@ -0,0 +1,65 @@
+"""
+Test restricting balloon detection to the track region
+"""
+
+import time
+
+import cv2
+
+from integration import BTD6Integration
+from integration.track_roi import TrackROI
+from synthetic_maps import draw_map
+
+PATH = [(-50, 300), (200, 300), (400, 200), (600, 300), (800, 300), (850, 300)]
+
+# Grass with a brown track along the simulator path
+background = draw_map(PATH)
+
+integration = BTD6Integration()
+roi = integration.calibrate_track_roi(background)
+stats = roi.stats()
+print(f"Track ROI: {stats['rects']} rects, {stats['roi_pixels']} of {stats['frame_pixels']} pixels "
+      f"({stats['saved_fraction']:.0%} skipped)")
+assert 0.5 < stats["saved_fraction"] < 0.9, stats
+assert roi.mask[300, 100] and roi.mask[200, 400] and not roi.mask[500, 100]
+for x, y, w, h in roi.rects:
+    assert 0 <= x and 0 <= y and x + w <= 800 and y + h <= 600
+
+# Balloons along the track (including the bends, where rectangles meet) and two on the grass
+screen = background.copy()
+on_track = [(30, 300, (0, 0, 230)), (150, 300, (230, 120, 20)), (300, 250, (0, 220, 250)),
+            (400, 205, (0, 0, 230)), (500, 250, (20, 200, 20)), (700, 300, (0, 0, 230))]
+off_track = [(300, 500, (0, 0, 230)), (650, 80, (230, 120, 20))]
+for x, y, colour in on_track + off_track:
+    cv2.circle(screen, (x, y), 12, colour, -1)
+
+roi_balloons = integration.detect_balloons(screen)
+full_balloons = BTD6Integration().detect_balloons(screen)
+print(f"Full frame: {len(full_balloons)} balloons, track ROI: {len(roi_balloons)} balloons")
+assert len(full_balloons) == len(on_track) + len(off_track)
+# Same detections on the track, nothing off it
+expected = [b for b in full_balloons if roi.mask[b["y"], b["x"]]]
+assert sorted(roi_balloons, key=lambda b: b["x"]) == sorted(expected, key=lambda b: b["x"]), roi_balloons
+assert len(roi_balloons) == len(on_track)
+
+# A ROI from the traced polyline covers the same track
+path_roi = TrackROI.from_path(PATH, background.shape, track_width=40)
+assert path_roi.mask[300, 100] and path_roi.mask[200, 400]
+assert abs(path_roi.stats()["saved_fraction"] - stats["saved_fraction"]) < 0.1
+print(f"Polyline ROI: {path_roi.stats()['saved_fraction']:.0%} skipped")
+
+# Timing
+full = BTD6Integration()
+for name, detector in (("full frame", full), ("track ROI", integration)):
+    detector.detect_balloons(screen)
+    start = time.perf_counter()
+    for _ in range(50):
+        detector.detect_balloons(screen)
+    print(f"  {name}: {(time.perf_counter() - start) / 50 * 1000:.2f} ms/frame")
+
+# A frame of another size drops the ROI and falls back to the full frame
+small = cv2.resize(screen, (400, 300))
+integration.detect_balloons(small)
+assert integration.track_roi is None
+
+print("\n✓ Track ROI test passed!")
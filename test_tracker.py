@@ -0,0 +1,132 @@
+"""
+Test the balloon tracker: Hungarian matching, track-progress prediction and
+sparse full detections
+"""
+
+import itertools
+import time
+
+import cv2
+import numpy as np
+
+from game.game import BTD6Game
+from integration import BTD6Integration
+from integration.tracker import BalloonTracker, TrackPath, linear_assignment
+from synthetic_maps import draw_map
+
+PATH = [(0, 300), (200, 300), (400, 200), (600, 300), (800, 300)]
+COLOURS = {"red": (0, 0, 230), "blue": (230, 120, 20), "yellow": (0, 220, 250)}
+
+
+def brute_force(cost):
+    """Lowest total cost over every assignment"""
+    if cost.shape[0] > cost.shape[1]:
+        return brute_force(cost.T)
+    return min(sum(cost[r, c] for r, c in enumerate(cols)) for cols in itertools.permutations(range(cost.shape[1]), cost.shape[0]))
+
+
+# Hungarian algorithm: same total cost as brute force, square and rectangular
+rng = np.random.default_rng(0)
+for shape in [(1, 1), (3, 3), (4, 6), (6, 4), (5, 5)]:
+    cost = rng.random(shape) * 100
+    pairs = linear_assignment(cost)
+    assert len(pairs) == min(shape)
+    assert len({r for r, _ in pairs}) == len({c for _, c in pairs}) == len(pairs)
+    assert abs(sum(cost[r, c] for r, c in pairs) - brute_force(cost)) < 1e-9, (shape, pairs)
+# Well-separated rows (distinct cheapest columns) take the shortcut
+separated = rng.random((4, 6)) * 100
+separated[np.arange(4), [5, 0, 3, 1]] = 0
+assert linear_assignment(separated) == [(0, 5), (1, 0), (2, 3), (3, 1)]
+print("✓ Hungarian matching agrees with brute force")
+
+# Arc-length path: projecting a point on the path gives its arc length back
+track = TrackPath(PATH)
+arcs = np.linspace(0, track.length, 37)
+projected, offsets = track.project(track.point_at(arcs))
+assert np.allclose(projected, arcs, atol=1e-6) and np.allclose(offsets, 0, atol=1e-6)
+
+# A synthetic run: balloons enter every 0.5 s and move along the track at 120 px/s
+background = draw_map(PATH)
+SPEED, FPS, FRAMES = 120.0, 10.0, 80
+spawns = [(0.5 * i, list(COLOURS)[i % 3]) for i in range(8)]
+
+
+def render(t):
+    frame = background.copy()
+    truth = []
+    for k, (spawn, colour) in enumerate(spawns):
+        arc = 15 + SPEED * (t - spawn)
+        if spawn <= t and arc < track.length - 15:
+            x, y = track.point_at(arc)
+            cv2.circle(frame, (int(x), int(y)), 12, COLOURS[colour], -1)
+            truth.append((k, arc, colour))
+    return frame, truth
+
+
+integration = BTD6Integration()
+integration.calibrate_track_roi(background)
+detect_time = 0.0
+
+
+def timed_detect(screen):
+    global detect_time
+    start = time.perf_counter()
+    detections = integration.detect_balloons(screen)
+    detect_time += time.perf_counter() - start
+    return detections
+
+
+tracker = BalloonTracker(PATH, timed_detect)
+identities = {}  # true balloon -> tracker ids seen
+tracked_time = 0.0
+arc_errors = []
+for i in range(FRAMES):
+    t = i / FPS
+    frame, truth = render(t)
+
+    start = time.perf_counter()
+    balloons = tracker.update(frame, t)
+    tracked_time += time.perf_counter() - start
+
+    # Every visible balloon is tracked, with the right colour and progress; a
+    # balloon that just left the screen coasts on its prediction for a few frames
+    seen = [b for b in balloons if b.misses == 0]
+    assert len(seen) == len(truth), (i, len(seen), len(truth))
+    assert len(balloons) - len(seen) <= 1
+    for k, arc, colour in truth:
+        match = min(seen, key=lambda b: abs(b.arc - arc))
+        arc_errors.append(abs(match.arc - arc))
+        assert match.type == colour, (i, k, match)
+        identities.setdefault(k, set()).add(match.id)
+
+# Persistent ids: one id per balloon over its whole life
+assert all(len(ids) == 1 for ids in identities.values()), identities
+assert len({next(iter(ids)) for ids in identities.values()}) == len(identities)
+print(f"✓ {len(identities)} balloons kept their ids over {FRAMES} frames, "
+      f"mean progress error {np.mean(arc_errors):.1f} px")
+# Tracked balloons are reported oldest first, like the simulator's spawn order
+assert [b.id for b in balloons] == sorted(b.id for b in balloons)
+# Speed is estimated along the track
+moving = [b for b in balloons if b.hits > 5]
+assert moving and all(abs(b.speed - SPEED) < 15 for b in moving), [b.speed for b in moving]
+
+# Balloons that reach the exit leave the tracker
+assert tracker.counts["exited"] >= 1, tracker.counts
+assert tracker.counts["detections"] == FRAMES
+# Ids, progress and speed cost well under a millisecond on top of the detection
+matching_ms = (tracked_time - detect_time) / FRAMES * 1000
+print(f"  detection: {detect_time / FRAMES * 1000:.2f} ms/frame, "
+      f"matching: {matching_ms:.2f} ms/frame ({tracker.counts})")
+assert matching_ms < 1.0, matching_ms
+
+# Progress maps onto the simulator's path at the same fraction of its length
+sim_path = [(p.x, p.y) for p in BTD6Game().balloon_path]
+sim_track = TrackPath(sim_path)
+positions = tracker.simulator_positions(sim_path)
+assert positions.shape == (len(balloons), 2)
+for balloon, position in zip(balloons, positions):
+    expected = sim_track.point_at(balloon.progress(track.length) * sim_track.length)
+    assert np.allclose(position, expected)
+    assert sim_track.project(position)[1][0] < 1e-6  # On the simulator path
+
+print("\n✓ Tracker test passed!")
@@ -0,0 +1,59 @@
+"""
+Test the streaming trajectory store
+"""
+
+import os
+import tempfile
+
+import numpy as np
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from ai.callbacks import TrajectoryRecorderCallback
+from ai.env import BTD6Env
+from ai.trajectory_store import TrajectoryDataset, TrajectoryWriter
+
+root = tempfile.mkdtemp()
+
+# Env-side recording, compressed and raw chunks
+for compress in (True, False):
+    directory = os.path.join(root, f"env_{'npz' if compress else 'npy'}")
+    writer = TrajectoryWriter(directory, chunk_size=100, compress=compress)
+    env = BTD6Env(trajectory_writer=writer)
+
+    observations, actions = [], []
+    for episode in range(2):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            action = env.action_space.sample()
+            observations.append(obs)
+            actions.append(action)
+            obs, reward, terminated, truncated, info = env.step(action)
+            done = terminated or truncated
+    writer.close()
+
+    dataset = TrajectoryDataset(directory)
+    size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+    print(f"{'Compressed' if compress else 'Raw'}: {len(dataset)} transitions in {len(dataset.chunks)} chunks, {size / 1024:.0f} KB")
+    assert len(dataset) == len(actions)
+
+    ordered = list(dataset.iter_minibatches(batch_size=64, shuffle=False))
+    assert np.array_equal(np.concatenate([b["obs"] for b in ordered]), np.array(observations))
+    assert np.array_equal(np.concatenate([b["actions"] for b in ordered]), np.array(actions))
+    assert np.concatenate([b["dones"] for b in ordered]).sum() == 2
+
+    shuffled = list(dataset.iter_minibatches(batch_size=64, shuffle=True, seed=0))
+    assert all(len(b["actions"]) == 64 for b in shuffled[:-1])
+    assert sorted(np.concatenate([b["actions"] for b in shuffled])) == sorted(actions)
+
+    if not compress:
+        assert isinstance(dataset.load_chunk(0)["obs"], np.memmap)
+
+# Training-side recording through the callback
+directory = os.path.join(root, "ppo")
+model = PPO("MlpPolicy", DummyVecEnv([BTD6Env, BTD6Env]), n_steps=128, batch_size=64, n_epochs=1)
+model.learn(256, callback=TrajectoryRecorderCallback(TrajectoryWriter(directory, chunk_size=100)))
+dataset = TrajectoryDataset(directory)
+print(f"PPO rollouts: {len(dataset)} transitions recorded")
+assert len(dataset) == 256
@@ -0,0 +1,94 @@
+"""
+Test the transposition table for wave outcomes
+"""
+
+import os
+import tempfile
+import time
+
+from ai.layout_optimizer import evaluate_layout
+from game.game import BTD6Game, GameState
+from game.transposition import TranspositionTable, at_wave_start, play_to_end, run_wave, wave_key
+
+
+def make_game(layout):
+    game = BTD6Game(starting_cash=len(layout) * BTD6Game.TOWER_COST)
+    for x, y in layout:
+        game.place_tower(x, y)
+    return game
+
+
+layout = [(100, 250), (300, 250), (500, 200)]
+table = TranspositionTable()
+
+# Placement order does not change the key
+assert wave_key(make_game(layout)) == wave_key(make_game(layout[::-1]))
+assert wave_key(make_game(layout)) != wave_key(make_game(layout[:2]))
+
+# A miss simulates and stores; a hit restores the same end-of-wave state
+game = make_game(layout)
+assert at_wave_start(game)
+start = time.perf_counter()
+assert not run_wave(game, table)
+miss_time = time.perf_counter() - start
+simulated = game.snapshot()
+
+game = make_game(layout[::-1])
+start = time.perf_counter()
+assert run_wave(game, table)
+hit_time = time.perf_counter() - start
+# Same end state, towers still in the caller's (placement) order
+restored = game.snapshot()
+assert [(t["x"], t["y"]) for t in restored["towers"]] == [(float(x), float(y)) for x, y in layout[::-1]]
+restored["towers"] = restored["towers"][::-1]
+assert restored == simulated
+assert game.state == GameState.WON
+print(f"Wave simulated in {miss_time * 1000:.1f}ms, answered from the table in {hit_time * 1000:.2f}ms")
+print(f"Hits: {table.hits}, misses: {table.misses}")
+
+# Table results match plain simulation
+for candidate in ([], [(100, 250)], [(300, 250), (700, 350)]):
+    plain = evaluate_layout(candidate)
+    assert evaluate_layout(candidate, table=table) == plain
+    assert evaluate_layout(candidate, table=table) == plain
+print(f"After repeated layouts: {table.hits} hits, {table.misses} misses, {len(table)} entries")
+assert table.hits == 4 and len(table) == 4
+
+# Mid-wave games are simulated without touching the table
+game = make_game(layout)
+game.update(1.0)
+assert not at_wave_start(game)
+play_to_end(game, table)
+assert game.state == GameState.WON and len(table) == 4
+
+# A miss keeps the caller's tower order too
+game = make_game(layout[::-1])
+assert not run_wave(game, TranspositionTable())
+assert [(t.position.x, t.position.y) for t in game.towers] == [(float(x), float(y)) for x, y in layout[::-1]]
+
+# Changed rules (waves, path) give different keys
+game = make_game(layout)
+key = wave_key(game)
+game.round_waves = game.round_waves + game.round_waves
+assert wave_key(game) != key
+game = make_game(layout)
+game.balloon_path = game.balloon_path[:-1]
+assert wave_key(game) != key
+
+# LRU eviction keeps the most recently used entries
+small = TranspositionTable(max_entries=2)
+small.put("a", {})
+small.put("b", {})
+small.get("a")
+small.put("c", {})
+assert "a" in small and "c" in small and "b" not in small
+
+# Persistence
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "waves.pkl")
+    table.path = path
+    table.save()
+    loaded = TranspositionTable(path=path)
+    game = make_game(layout)
+    assert run_wave(game, loaded) and game.snapshot() == simulated
+    print(f"Reloaded {len(loaded)} entries from disk")
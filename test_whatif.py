@@ -0,0 +1,86 @@
+"""
+Test parallel what-if evaluation of placements from a live game state
+"""
+
+import threading
+import time
+
+from game.game import BTD6Game, GameState
+from game.whatif import create_pool, play_candidate
+
+game = BTD6Game(starting_cash=BTD6Game.TOWER_COST)
+# Mid-wave: some balloons are already on the track
+for _ in range(120):
+    game.update(1.0 / 60.0)
+before = game.snapshot()
+print(f"Live state: {len(game.balloons)} balloons in flight, {game.lives} lives")
+
+candidates = [None, (200, 300), (700, 550), (300, 250), (500, 200), (100, 250)]
+start = time.perf_counter()
+outcomes = game.evaluate_candidates(candidates, deadline=10.0, workers=4)
+elapsed = time.perf_counter() - start
+print(f"Evaluated {len(outcomes)} candidates in {elapsed * 1000:.0f}ms")
+for outcome in outcomes:
+    print(f"  {outcome}")
+
+# The live game is untouched
+assert game.snapshot() == before
+
+assert len(outcomes) == len(candidates)
+assert outcomes[0]["legal"] and outcomes[0]["candidate"] is not None
+assert not outcomes[-1]["legal"] and outcomes[-1]["candidate"] == (200, 300)  # On the track
+lives_lost = [o["lives_lost"] for o in outcomes if o["legal"]]
+assert lives_lost == sorted(lives_lost)
+nothing = next(o for o in outcomes if o["candidate"] is None)
+assert outcomes[0]["lives_lost"] < nothing["lives_lost"]
+
+# Forked results match in-process play-outs
+for outcome in outcomes:
+    assert play_candidate(game, outcome["candidate"]) == outcome
+
+# Sequential fallback gives the same ranking
+sequential = game.evaluate_candidates(candidates, deadline=10.0, workers=1)
+assert [o["lives_lost"] for o in sequential] == [o["lives_lost"] for o in outcomes]
+
+# A deadline returns only what finished in time
+many = [(x, 450) for x in range(20, 780, 5)]
+start = time.perf_counter()
+partial = game.evaluate_candidates(many, deadline=0.2, workers=2)
+elapsed = time.perf_counter() - start
+print(f"Deadline 200ms: {len(partial)}/{len(many)} candidates in {elapsed * 1000:.0f}ms")
+assert len(partial) < len(many) and elapsed < 0.5
+
+# Persistent pool, created before any thread starts and reused from a thread
+pool = create_pool(2)
+stop = threading.Event()
+busy = threading.Thread(target=stop.wait)  # Stands in for the capture/perceive threads
+busy.start()
+try:
+    pooled = game.evaluate_candidates(candidates, deadline=10.0, pool=pool)
+    assert [o["lives_lost"] for o in pooled] == [o["lives_lost"] for o in outcomes]
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        game.evaluate_candidates(candidates[:2], deadline=10.0, pool=pool)
+        times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    threaded = game.evaluate_candidates(candidates[:2], deadline=10.0, workers=2)  # No fork while threads run
+    sequential_ms = (time.perf_counter() - start) * 1000
+    assert sorted(o["lives_lost"] for o in threaded) == sorted(o["lives_lost"] for o in pooled if o["candidate"] in candidates[:2])
+
+    # Short deadlines in a row, as in the real-game loop: candidates left over
+    # from one call are abandoned, so every call still gets outcomes and the
+    # pool is free again afterwards
+    counts = [len(game.evaluate_candidates(many[:9], deadline=0.08, pool=pool)) for _ in range(8)]
+    start = time.perf_counter()
+    complete = game.evaluate_candidates(many[:9], deadline=10.0, pool=pool)
+    backlog_ms = (time.perf_counter() - start) * 1000
+    assert all(counts), counts
+    assert len(complete) == 9 and backlog_ms < 2000, backlog_ms
+finally:
+    stop.set()
+    busy.join()
+    pool.terminate()
+print(f"Persistent pool: {min(times) * 1000:.0f}ms per 2-candidate call; "
+      f"without a pool while threads run (sequential): {sequential_ms:.0f}ms")
+print(f"80ms deadlines on one pool: {counts} outcomes per call, then all 9 in {backlog_ms:.0f}ms")